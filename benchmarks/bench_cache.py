@@ -0,0 +1,49 @@
+"""
+Benchmark of reloading the same file with `comma.load()`: Compares the
+detection of the format on every load with a detection cache (see
+`comma.cache.set_cache()`), from which the format is retrieved after the
+first load.
+
+Usage: python -m benchmarks.bench_cache [LOADS] [ROWS]
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+
+import comma
+import comma.cache
+
+
+def make_csv(rows: int) -> str:
+    lines = ["id,name,value"]
+    lines += ["{i},name{i},{v}".format(i=i, v=i * 7 % 13) for i in range(rows)]
+    return "\n".join(lines) + "\n"
+
+
+def main(loads: int = 50, rows: int = 2000):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "data.csv")
+        with open(path, "w") as f:
+            f.write(make_csv(rows))
+
+        def load_repeatedly():
+            for _ in range(loads):
+                comma.load(path)
+
+        for name, cache in [
+                ("no cache", None),
+                ("cache", comma.cache.DetectionCache()),
+                ("cache (on disk)", comma.cache.DetectionCache(
+                    path=os.path.join(directory, "cache.json")))]:
+            comma.cache.set_cache(cache)
+            elapsed = min(timeit.repeat(load_repeatedly, number=1, repeat=3))
+            print("{:<16} {:>10.3f} ms/load  ({} loads, {} rows)".format(
+                name, elapsed * 1000 / loads, loads, rows))
+
+        comma.cache.set_cache(None)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:3]))
@@ -0,0 +1,68 @@
+"""
+Benchmark of the dictionary encoding of low-cardinality columns: Reports,
+for each column, the memory used with plain columnar storage (one string
+per cell, the previous behavior) and with dictionary encoding, as well as
+the time taken to load the table and to count a value of a column.
+
+Usage: python -m benchmarks.bench_dictionary_encoding [ROWS]
+"""
+
+import sys
+import timeit
+
+import comma
+
+
+COUNTRIES = ["FR", "US", "DE", "JP", "BR", "IN", "GB", "CA"]
+STATUSES = ["active", "suspended", "closed"]
+PLANS = ["free", "basic", "premium", "enterprise"]
+
+
+def make_csv(rows: int) -> str:
+    lines = ["id,country,status,plan,email"]
+    lines += [
+        "{i},{c},{s},{p},user{i}@example.com".format(
+            i=i,
+            c=COUNTRIES[i * 7 % len(COUNTRIES)],
+            s=STATUSES[i * 5 % len(STATUSES)],
+            p=PLANS[i * 3 % len(PLANS)])
+        for i in range(rows)
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def main(rows: int = 200000):
+    source = make_csv(rows)
+
+    tables = {}
+    for name, kwargs in [("plain", dict(storage="columnar")),
+                         ("encoded", dict(dictionary_encoding=True))]:
+        elapsed = min(timeit.repeat(
+            lambda: tables.__setitem__(name, comma.load(source, **kwargs)),
+            number=1, repeat=3))
+        print("{:<8} {:>10.1f} ms to load      ({} rows)".format(
+            name, elapsed * 1000, rows))
+
+    for name, table in tables.items():
+        column = table["country"]
+        elapsed = min(timeit.repeat(
+            lambda: column.count("FR"), number=10, repeat=3))
+        print("{:<8} {:>10.3f} ms to count     (country == 'FR')".format(
+            name, elapsed * 100))
+
+    plain_usage = tables["plain"].memory_usage()
+    encoded_usage = tables["encoded"].memory_usage()
+
+    print()
+    print("{:<8} {:>12} {:>12} {:>8}".format(
+        "column", "plain", "encoded", "ratio"))
+    for column in plain_usage:
+        print("{:<8} {:>12,} {:>12,} {:>7.1f}x".format(
+            column,
+            plain_usage[column],
+            encoded_usage[column],
+            plain_usage[column] / encoded_usage[column]))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:2]))
@@ -0,0 +1,73 @@
+"""
+Benchmark of the serialization of a table with `comma.dumps()`, for each of
+the header scenarios: Compares writing plain lists (following a column plan
+computed once) with building a dictionary per row for `csv.DictWriter`,
+which was the previous behavior.
+
+Usage: python -m benchmarks.bench_dump [ROWS]
+"""
+
+import csv
+import io
+import sys
+import timeit
+
+import comma
+
+
+def make_table(rows: int) -> comma.classes.table.CommaTable:
+    lines = ["id,name,value"]
+    lines += ["{i},name{i},{v}".format(i=i, v=i * 7 % 13) for i in range(rows)]
+    return comma.load("\n".join(lines) + "\n")
+
+
+def dumps_dict_per_row(records, header, existing_header):
+    # emulates the previous behavior
+    output_stream = io.StringIO()
+    writer = csv.DictWriter(
+        output_stream,
+        fieldnames=header or existing_header,
+        dialect=comma.helpers.DefaultDialect())
+    writer.writeheader()
+    for record in records:
+        if existing_header is None:
+            record = {header[i]: record[i] for i in range(len(record))}
+        elif existing_header != header:
+            record = {renamed: record[orig]
+                      for orig, renamed in zip(existing_header, header)}
+        writer.writerow(record)
+    return output_stream.getvalue()
+
+
+def main(rows: int = 20000):
+    table = make_table(rows)
+    table_header = table.header
+    renamed_header = ["key", "label", "amount"]
+    raw_rows = [list(row) for row in table]
+
+    scenarios = [
+        ("parent header", table, None, table_header),
+        ("renamed header", table, renamed_header, table_header),
+        ("user header only", raw_rows, renamed_header, None),
+    ]
+
+    for name, records, header, existing_header in scenarios:
+
+        def dumps_plan():
+            comma.dumps(records, header=header)
+
+        def dumps_reference():
+            dumps_dict_per_row(
+                records,
+                header=header or existing_header,
+                existing_header=existing_header)
+
+        for variant, func in [("dict per row", dumps_reference),
+                              ("column plan", dumps_plan)]:
+            elapsed = min(timeit.repeat(func, number=1, repeat=3))
+            print("{:<18} {:<14} {:>10.1f} rows/s  ({} rows)".format(
+                name, variant, rows / elapsed, rows))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:2]))
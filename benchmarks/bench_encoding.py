@@ -0,0 +1,49 @@
+"""
+Benchmark of the detection of the encoding of a sample: Compares running
+`chardet` on the whole sample (the previous behavior) with the incremental
+detection of `comma.extras.detect_encoding()`, on ASCII, UTF-8 and Latin-1
+samples.
+
+Usage: python -m benchmarks.bench_encoding [NUMBER]
+"""
+
+import sys
+import timeit
+
+import chardet
+
+import comma.extras
+import comma.helpers
+
+
+def detect_encoding_chardet(sample: bytes) -> str:
+    """
+    Emulates the previous behavior: `chardet` looks at the whole sample.
+    """
+    return chardet.detect(sample).get("encoding") or "utf-8"
+
+
+def make_sample(text: str, encoding: str) -> bytes:
+    data = text.encode(encoding)
+    data *= comma.helpers.MAX_SAMPLE_CHUNKSIZE // len(data) + 1
+    return data[:comma.helpers.MAX_SAMPLE_CHUNKSIZE]
+
+
+def main(number: int = 20):
+    samples = [
+        ("ascii", make_sample("id,name,city\n1,Person,Paris\n", "ascii")),
+        ("utf-8", make_sample("id,name,city\n1,Jérémie,Orléans\n", "utf-8")),
+        ("latin-1", make_sample("id,name,city\n1,Jérémie,Orléans\n", "latin-1")),
+    ]
+
+    for sample_name, sample in samples:
+        for name, func in [("chardet", detect_encoding_chardet),
+                           ("incremental", comma.extras.detect_encoding)]:
+            elapsed = min(timeit.repeat(
+                lambda: func(sample), number=number, repeat=3))
+            print("{:<8} {:<12} {:>10.3f} ms/sample  ({})".format(
+                sample_name, name, elapsed * 1000 / number, func(sample)))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:2]))
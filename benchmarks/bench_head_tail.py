@@ -0,0 +1,58 @@
+"""
+Benchmark of the functions that only read part of a file: Reports the time
+taken to count the rows of a local file, and to get its first and last
+rows, by loading the whole file (the previous behavior) and with
+`comma.count_rows()`, `comma.head()` and `comma.tail()`.
+
+Usage: python -m benchmarks.bench_head_tail [ROWS] [N]
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+
+import comma
+
+
+def make_csv(rows: int) -> str:
+    lines = ["id,name,comment,amount"]
+    lines += [
+        '{i},name{i},"a comment,\nover two lines",{a}'.format(
+            i=i, a=i * 7 % 1000)
+        for i in range(rows)
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def main(rows: int = 500000, n: int = 20):
+    kwargs = dict(dialect="excel", has_header=True)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "data.csv")
+        with open(path, "w") as f:
+            f.write(make_csv(rows))
+
+        for name, previous, function in [
+                ("count",
+                 lambda: len(comma.load(path, **kwargs)),
+                 lambda: comma.count_rows(path, **kwargs)),
+                ("head",
+                 lambda: comma.load(path, **kwargs)[:n],
+                 lambda: comma.head(path, n, **kwargs)),
+                ("tail",
+                 lambda: comma.load(path, **kwargs)[-n:],
+                 lambda: comma.tail(path, n, **kwargs))]:
+
+            # (both methods have the same result)
+            assert previous() == function()
+
+            elapsed_previous = min(timeit.repeat(previous, number=1, repeat=3))
+            elapsed = min(timeit.repeat(function, number=1, repeat=3))
+            print("{:<6} {:>10.1f} ms with load(), {:>10.1f} ms "
+                  "({} rows)".format(
+                      name, elapsed_previous * 1000, elapsed * 1000, rows))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:3]))
@@ -0,0 +1,78 @@
+"""
+Benchmark of loading many small CSV files from a local HTTP server (a
+stand-in for a file server): Compares fresh connections with a HEAD request
+for each file, which was the previous behavior, with the pooled session
+(with and without the HEAD request, see the `URL_HEAD_REQUEST` setting).
+
+Usage: python -m benchmarks.bench_http [FILES]
+"""
+
+import functools
+import http.server
+import os
+import sys
+import tempfile
+import threading
+import timeit
+
+import requests
+
+import comma
+
+
+class KeepAliveHandler(http.server.SimpleHTTPRequestHandler):
+    # (HTTP/1.1 is required for the connections to be kept alive, and
+    # Nagle's algorithm must be disabled to avoid delayed acknowledgments)
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+
+class FreshConnections:
+    # emulates the previous behavior, with a new connection per request
+    head = staticmethod(requests.head)
+    get = staticmethod(requests.get)
+
+
+def main(files: int = 200):
+    directory = tempfile.mkdtemp()
+    for i in range(files):
+        with open(os.path.join(directory, "{}.csv".format(i)), "w") as f:
+            f.write("id,name\n{i},name{i}\n".format(i=i))
+
+    server = http.server.ThreadingHTTPServer(
+        ("127.0.0.1", 0),
+        functools.partial(KeepAliveHandler, directory=directory))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    urls = ["http://127.0.0.1:{}/{}.csv".format(server.server_port, i)
+            for i in range(files)]
+
+    def load_all():
+        for url in urls:
+            comma.load(url)
+
+    scenarios = [
+        ("fresh connections + HEAD", FreshConnections, True),
+        ("pooled session + HEAD", None, True),
+        ("pooled session, no HEAD", None, False),
+    ]
+
+    try:
+        for name, session, head_request in scenarios:
+            comma.helpers.set_session(session)
+            comma.settings.URL_HEAD_REQUEST = head_request
+            elapsed = min(timeit.repeat(load_all, number=1, repeat=3))
+            print("{:<26} {:>10.1f} files/s  ({} files)".format(
+                name, files / elapsed, files))
+    finally:
+        comma.helpers.set_session(None)
+        comma.settings.URL_HEAD_REQUEST = True
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:2]))
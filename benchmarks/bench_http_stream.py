@@ -0,0 +1,83 @@
+"""
+Benchmark of loading a large CSV file from a local HTTP server: Compares
+downloading (and decoding) the whole file before parsing it, which was the
+previous behavior, with parsing the rows as they are downloaded. Reports
+the time to the first row, the total time, and the peak memory (measured
+with `tracemalloc`) when iterating over all the rows.
+
+Usage: python -m benchmarks.bench_http_stream [ROWS]
+"""
+
+import functools
+import http.server
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import comma
+
+from benchmarks.bench_http import KeepAliveHandler
+
+
+def iterate_buffered(url: str):
+    # emulates the previous behavior, with a seekable stream in memory
+    return comma.iterload(comma.helpers.open_stream(url, seekable=True))
+
+
+def iterate_streamed(url: str):
+    return comma.iterload(url)
+
+
+def measure(func, url: str):
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    rows = func(url)
+    next(rows)
+    first_row = time.perf_counter() - start
+
+    for _ in rows:
+        pass
+    total = time.perf_counter() - start
+
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return first_row, total, peak
+
+
+def main(rows: int = 200000):
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "data.csv")
+    with open(path, "w") as f:
+        f.write("id,name,comment,value\n")
+        for i in range(rows):
+            f.write('{i},name{i},"a comment, with a comma",{v}\n'.format(
+                i=i, v=i * 7 % 13))
+
+    server = http.server.ThreadingHTTPServer(
+        ("127.0.0.1", 0),
+        functools.partial(KeepAliveHandler, directory=directory))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    url = "http://127.0.0.1:{}/data.csv".format(server.server_port)
+
+    try:
+        for name, func in [("buffered download", iterate_buffered),
+                           ("streamed download", iterate_streamed)]:
+            first_row, total, peak = measure(func, url)
+            print("{:<18} first row {:>8.1f} ms  total {:>8.1f} ms  "
+                  "peak {:>8.1f} MB  ({} rows)".format(
+                    name, first_row * 1000, total * 1000, peak / 2**20, rows))
+    finally:
+        server.shutdown()
+        os.remove(path)
+        os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:2]))
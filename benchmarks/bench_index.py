@@ -0,0 +1,65 @@
+"""
+Benchmark of the sidecar index of records: Reports the time taken to load
+a local file and access a few rows spread over the file, by parsing the
+whole file (the previous behavior), by reading it lazily, and with the
+index (both when it is built, and when it is reused from its sidecar
+file), as well as the time taken to count the rows.
+
+Usage: python -m benchmarks.bench_index [ROWS] [ACCESSED]
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+
+import comma
+import comma.index
+
+
+def make_csv(rows: int) -> str:
+    lines = ["id,name,comment,amount"]
+    lines += [
+        '{i},name{i},"a comment, with a comma",{a}'.format(i=i, a=i * 7 % 1000)
+        for i in range(rows)
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def main(rows: int = 500000, accessed: int = 10):
+    kwargs = dict(dialect="excel", has_header=True)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "data.csv")
+        with open(path, "w") as f:
+            f.write(make_csv(rows))
+
+        def load_and_access(**load_kwargs):
+            table = comma.load(path, **kwargs, **load_kwargs)
+            for i in range(0, rows, max(1, rows // accessed)):
+                _ = table[i]["amount"]
+            return len(table)
+
+        def build():
+            if os.path.exists(comma.index.index_path(path)):
+                os.remove(comma.index.index_path(path))
+            return load_and_access(index=True)
+
+        for name, function in [
+                ("eager", load_and_access),
+                ("lazy", lambda: load_and_access(storage="lazy")),
+                ("indexing", build),
+                ("indexed", lambda: load_and_access(index=True))]:
+            elapsed = min(timeit.repeat(function, number=1, repeat=3))
+            print("{:<9} {:>10.1f} ms to load and access {} rows "
+                  "({} rows)".format(name, elapsed * 1000, accessed, rows))
+
+        elapsed = min(timeit.repeat(
+            lambda: len(comma.index.open_index(path, **kwargs)),
+            number=1, repeat=3))
+        print("{:<9} {:>10.1f} ms to count the rows".format(
+            "indexed", elapsed * 1000))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:3]))
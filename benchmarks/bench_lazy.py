@@ -0,0 +1,54 @@
+"""
+Benchmark of lazy row materialization: Reports the time taken to load a
+table and access a few of its rows, when all the rows are parsed as the
+table is loaded (the previous behavior) and when the rows are only parsed
+as they are accessed (`storage="lazy"`), as well as the time taken to go
+through all the rows.
+
+Usage: python -m benchmarks.bench_lazy [ROWS] [ACCESSED]
+"""
+
+import sys
+import timeit
+
+import comma
+
+
+def make_csv(rows: int) -> str:
+    lines = ["id,name,comment,amount"]
+    lines += [
+        '{i},name{i},"a comment, with a comma",{a}'.format(i=i, a=i * 7 % 1000)
+        for i in range(rows)
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def main(rows: int = 200000, accessed: int = 10):
+    source = make_csv(rows)
+    kwargs = dict(dialect="excel", has_header=True)
+
+    def load_and_access(storage):
+        table = comma.load(source, storage=storage, **kwargs)
+        for i in range(0, rows, max(1, rows // accessed)):
+            _ = table[i]["amount"]
+
+    def load_and_scan(storage):
+        table = comma.load(source, storage=storage, **kwargs)
+        for row in table:
+            _ = row["amount"]
+
+    for storage in ["rows", "lazy"]:
+        elapsed = min(timeit.repeat(
+            lambda: load_and_access(storage), number=1, repeat=3))
+        print("{:<6} {:>10.1f} ms to load and access {} rows ({} rows)".format(
+            storage, elapsed * 1000, accessed, rows))
+
+    for storage in ["rows", "lazy"]:
+        elapsed = min(timeit.repeat(
+            lambda: load_and_scan(storage), number=1, repeat=3))
+        print("{:<6} {:>10.1f} ms to load and access all rows".format(
+            storage, elapsed * 1000))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:3]))
@@ -0,0 +1,49 @@
+"""
+Benchmark of the parallel parsing of a local file with `comma.load()`: Reports
+the time taken to load the same file with 1, 2, 4 and 8 worker processes,
+relative to the time taken with a single process. Parallel parsing has a cost
+(starting the processes, and sending the parsed rows back), so it can only be
+faster on a machine with several cores: On a single core, it is slower (the
+number of available cores is reported first).
+
+Usage: python -m benchmarks.bench_parallel [ROWS]
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+
+import comma
+
+
+def make_file(rows: int) -> str:
+    handle, path = tempfile.mkstemp(suffix=".csv")
+    with os.fdopen(handle, "w") as f:
+        f.write("id,name,comment,value\n")
+        for i in range(rows):
+            f.write('{i},name{i},"a comment, with a comma",{v}\n'.format(
+                i=i, v=i * 7 % 13))
+    return path
+
+
+def main(rows: int = 1000000):
+    path = make_file(rows)
+    print("{} core(s) available".format(os.cpu_count()))
+    try:
+        baseline = None
+        for workers in [1, 2, 4, 8]:
+
+            def load():
+                comma.load(path, workers=workers)
+
+            elapsed = min(timeit.repeat(load, number=1, repeat=3))
+            baseline = baseline or elapsed
+            print("{} worker(s)  {:>10.1f} rows/s  (speedup {:.2f}x, {} rows)".format(
+                workers, rows / elapsed, baseline / elapsed, rows))
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:2]))
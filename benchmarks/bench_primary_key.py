@@ -0,0 +1,46 @@
+"""
+Benchmark of primary key lookups on a `CommaTable`: Compares the persistent
+index (built once and kept up to date) with rebuilding the index at every
+access, which was the previous behavior.
+
+Usage: python -m benchmarks.bench_primary_key [ROWS] [LOOKUPS]
+"""
+
+import random
+import sys
+import timeit
+
+import comma
+
+
+def make_table(rows: int) -> comma.classes.table.CommaTable:
+    lines = ["id,name,value"]
+    lines += ["id{i},name{i},{v}".format(i=i, v=i * 7 % 13) for i in range(rows)]
+    table = comma.load("\n".join(lines) + "\n")
+    table.primary_key = "id"
+    return table
+
+
+def main(rows: int = 10000, lookups: int = 200):
+    table = make_table(rows)
+    keys = ["id{}".format(random.randrange(rows)) for _ in range(lookups)]
+
+    def lookup_persistent():
+        for key in keys:
+            table[key]
+
+    def lookup_rebuild():
+        for key in keys:
+            # emulates the previous behavior
+            table._update_primary_key_dict()
+            table[key]
+
+    for name, func in [("rebuild per access", lookup_rebuild),
+                       ("persistent index", lookup_persistent)]:
+        elapsed = min(timeit.repeat(func, number=1, repeat=3))
+        print("{:<20} {:>10.1f} lookups/s  ({} rows, {} lookups)".format(
+            name, lookups / elapsed, rows, lookups))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:3]))
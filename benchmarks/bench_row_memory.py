@@ -0,0 +1,73 @@
+"""
+Benchmark of the memory used by the rows of a `CommaTable`: Measures, with
+`tracemalloc`, the bytes per row (excluding the cells, which are shared)
+of the slotted `CommaRow` and of a row class emulating the previous
+representation (based on `collections.UserList` and `collections.UserDict`,
+with an instance dictionary).
+
+Usage: python -m benchmarks.bench_row_memory [ROWS]
+"""
+
+import collections
+import sys
+import tracemalloc
+
+import comma
+import comma.classes.row
+
+
+# noinspection PyUnresolvedReferences
+class PreviousCommaRow(collections.UserList, list, collections.UserDict):
+    """
+    Emulates the previous behavior: The same bases and attributes as the
+    row class used to have.
+    """
+
+    def __init__(self, initlist=None, parent=None):
+        self._parent = parent
+        self._slice_list = list()
+        self._original = self
+        super().__init__(initlist)
+
+
+def make_rows(rows: int, width: int = 5) -> list:
+    cells = ["cell{}".format(i) for i in range(width)]
+    return [list(cells) for _ in range(rows)]
+
+
+def measure(make_row, rows: int) -> float:
+    rows_data = make_rows(rows)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        table = [make_row(row_data) for row_data in rows_data]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    assert len(table) == rows
+    return (after - before) / rows
+
+
+def main(rows: int = 100000):
+    parent = comma.classes.file.CommaFile(
+        header=["col{}".format(i) for i in range(5)])
+
+    def make_row_previous(row_data):
+        # (the previous constructor also copied the list of cells)
+        return PreviousCommaRow(row_data, parent=parent)
+
+    def make_row(row_data):
+        row = comma.classes.row.CommaRow(parent=parent)
+        row.data = row_data
+        return row
+
+    for name, func in [("previous row", make_row_previous),
+                       ("slotted row", make_row)]:
+        print("{:<16} {:>10.1f} bytes/row  ({} rows of 5 cells)".format(
+            name, measure(func, rows), rows))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:2]))
@@ -0,0 +1,53 @@
+"""
+Benchmark of slice operations on a `CommaTable`, which read the global
+settings each time: Compares cached settings with resolving them from the
+environment at every read, which was the previous behavior.
+
+Usage: python -m benchmarks.bench_settings [ROWS] [OPERATIONS]
+"""
+
+import sys
+import timeit
+
+import comma
+
+
+def make_table(rows: int) -> comma.classes.table.CommaTable:
+    lines = ["id,name,value"]
+    lines += ["{i},name{i},{v}".format(i=i, v=i * 7 % 13) for i in range(rows)]
+    return comma.load("\n".join(lines) + "\n")
+
+
+def main(rows: int = 100, operations: int = 20000):
+    table = make_table(rows)
+    settings = comma.config.settings
+
+    def slice_operations():
+        for i in range(operations):
+            table[1:3]
+            table[i % rows][0:2]
+
+    def slice_operations_uncached():
+        # emulates the previous behavior, by discarding the cache every time
+        # a setting is read (each operation reads two settings)
+        cls = type(settings)
+        saved = {name: getattr(cls, name)
+                 for name in ("SLICE_DEEP_COPY_DATA", "SLICE_DEEP_COPY_PARENT")}
+        try:
+            for name, prop in saved.items():
+                setattr(cls, name, property(
+                    lambda self, prop=prop: (self.reload(), prop.fget(self))[1]))
+            slice_operations()
+        finally:
+            for name, prop in saved.items():
+                setattr(cls, name, prop)
+
+    for name, func in [("uncached settings", slice_operations_uncached),
+                       ("cached settings", slice_operations)]:
+        elapsed = min(timeit.repeat(func, number=1, repeat=3))
+        print("{:<20} {:>10.1f} operations/s  ({} rows, {} operations)".format(
+            name, operations / elapsed, rows, operations))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:3]))
@@ -0,0 +1,41 @@
+"""
+Benchmark of the per-file overhead of `comma.load()` on small files: Compares
+the detection of the format (dialect and header) with providing the format
+explicitly, which skips the detection.
+
+Usage: python -m benchmarks.bench_sniffing [FILES] [ROWS]
+"""
+
+import sys
+import timeit
+
+import comma
+
+
+def make_csv(rows: int, seed: int) -> str:
+    lines = ["id,name,value"]
+    lines += ["{i},name{i},{v}".format(i=i, v=(i + seed) * 7 % 13)
+              for i in range(rows)]
+    return "\n".join(lines) + "\n"
+
+
+def main(files: int = 200, rows: int = 50):
+    sources = [make_csv(rows, seed) for seed in range(files)]
+
+    def load_sniffed():
+        for source in sources:
+            comma.load(source)
+
+    def load_known_format():
+        for source in sources:
+            comma.load(source, dialect="excel", has_header=True)
+
+    for name, func in [("sniffed format", load_sniffed),
+                       ("known format", load_known_format)]:
+        elapsed = min(timeit.repeat(func, number=1, repeat=3))
+        print("{:<16} {:>10.3f} ms/file  ({} files, {} rows each)".format(
+            name, elapsed * 1000 / files, files, rows))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:3]))
@@ -5,7 +5,8 @@ Library to make CSV reading/writing fun and enjoyable!
 
 from comma.config import settings as settings
 from comma.methods import dump, dumps
-from comma.methods import load
+from comma.methods import load, iterload
+from comma.methods import count_rows, head, tail
 __version__ = "0.5.4"
 __author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
 
@@ -0,0 +1,331 @@
+import atexit
+import collections
+import hashlib
+import json
+import os
+import threading
+import typing
+import warnings
+import weakref
+
+import comma.extras
+import comma.helpers
+import comma.parallel
+import comma.typing
+
+
+__author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
+
+__all__ = [
+    "CACHE_MAXSIZE",
+    "CACHE_SAVE_INTERVAL",
+
+    "CacheInfo",
+    "DetectionCache",
+
+    "get_cache",
+    "set_cache",
+    "fingerprint",
+    "detect_encoding",
+    "detect_csv_type",
+]
+
+
+# default number of entries kept by a `DetectionCache`
+CACHE_MAXSIZE = 1024
+
+# number of entries added to a `DetectionCache` after which its JSON file is
+# written (the file is also written when the cache is replaced, and at exit)
+CACHE_SAVE_INTERVAL = 64
+
+
+CacheInfo = collections.namedtuple(
+    "CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class DetectionCache:
+    """
+    A cache of the results of the (relatively expensive) detection of the
+    encoding and the format of CSV files, keyed by a fingerprint of the
+    sample on which the detection is made (see `fingerprint()`): This way,
+    loading the same file again (or any file starting with the same data)
+    skips the detection.
+
+    At most `maxsize` entries are kept, the least recently used ones being
+    evicted first. If a `path` is provided (`~` is expanded), the cache is
+    stored in that JSON file, so that it persists across processes: It is
+    read when the cache is created (after the other caches of the process
+    sharing the file have written it), and written in batches of
+    `CACHE_SAVE_INTERVAL` added entries, when the cache is replaced (see
+    `set_cache()`), and at exit; `flush()` writes it on demand. A file that
+    cannot be written only triggers a warning.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = CACHE_MAXSIZE,
+        path: typing.Optional[str] = None,
+    ):
+        self._maxsize = maxsize
+        self._path = os.path.expanduser(path) if path is not None else None
+        self._entries = collections.OrderedDict()
+        self._lock = threading.RLock()
+        self._unsaved = 0
+
+        self.hits = 0
+        self.misses = 0
+
+        if self._path is not None:
+            # entries of other caches of this process sharing the file
+            for cache in list(_persistent_caches):
+                if cache.path == self._path:
+                    cache.flush()
+            self.load()
+            _persistent_caches.add(self)
+
+    @property
+    def path(self) -> typing.Optional[str]:
+        return self._path
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key: str) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        """
+        Returns the entry stored for `key` (and marks it as the most recently
+        used), or `None` if there is no such entry; the hit and miss counters
+        are updated accordingly.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, entry: typing.Dict[str, typing.Any]):
+        """
+        Stores the `entry` (a dictionary that can be serialized to JSON)
+        for `key`, evicting the least recently used entries if needed.
+        """
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+            self._unsaved += 1
+            if self._path is not None and self._unsaved >= CACHE_SAVE_INTERVAL:
+                self.save()
+
+    def clear(self):
+        """
+        Removes all the entries, and resets the hit and miss counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+            if self._path is not None:
+                self.save()
+
+    def cache_info(self) -> CacheInfo:
+        """
+        Returns the statistics of the cache (as `functools.lru_cache` does).
+        """
+        return CacheInfo(
+            hits=self.hits,
+            misses=self.misses,
+            maxsize=self._maxsize,
+            currsize=len(self._entries))
+
+    def load(self):
+        """
+        Reads the entries stored in the JSON file of the cache, if it exists
+        (entries that are already in the cache are kept, and are considered
+        more recently used than the entries read, which keep the order in
+        which they were saved); a file that cannot be read is ignored.
+        """
+        try:
+            with open(self._path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if not isinstance(entries, dict):
+            return
+
+        with self._lock:
+            loaded_entries = collections.OrderedDict(
+                (key, entry) for key, entry in entries.items()
+                if key not in self._entries)
+            loaded_entries.update(self._entries)
+            self._entries = loaded_entries
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def save(self):
+        """
+        Writes the entries to the JSON file of the cache (atomically, so that
+        concurrent readers never see a partially written file); if the file
+        cannot be written, a warning is issued and the entries are only kept
+        in memory.
+        """
+        with self._lock:
+            self._unsaved = 0
+            temporary_path = "{}.{}.tmp".format(self._path, os.getpid())
+            try:
+                with open(temporary_path, "w", encoding="utf-8") as f:
+                    json.dump(self._entries, f)
+                os.replace(temporary_path, self._path)
+            except OSError as exc:
+                warnings.warn(
+                    "DetectionCache.save():\n cannot write the cache "
+                    "to `{path}`: {exc}".format(path=self._path, exc=exc))
+                try:
+                    os.remove(temporary_path)
+                except OSError:
+                    pass
+
+    def flush(self):
+        """
+        Writes the entries to the JSON file of the cache (see `save()`), if
+        there is one and some entries have not been written yet.
+        """
+        with self._lock:
+            if self._path is not None and self._unsaved > 0:
+                self.save()
+
+
+# the caches stored in a file, which are flushed at exit
+_persistent_caches = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_persistent_caches():
+    for cache in list(_persistent_caches):
+        cache.flush()
+
+
+# the cache used by the detection helpers (see `set_cache()`)
+_cache = None
+
+
+def get_cache() -> typing.Optional[DetectionCache]:
+    """
+    Returns the cache used to store the results of detections, or `None`
+    if the results are not cached (the default).
+    """
+    return _cache
+
+
+def set_cache(cache: typing.Optional[DetectionCache]):
+    """
+    Sets the `cache` used to store the results of detections (for instance,
+    `DetectionCache(path="~/.comma-cache.json")`); if `cache` is `None`,
+    results are no longer cached. The entries of the cache that is replaced
+    are written to its file (see `DetectionCache.flush()`).
+    """
+    global _cache
+    if _cache is not None and _cache is not cache:
+        _cache.flush()
+    _cache = cache
+
+
+def fingerprint(kind: str, sample: typing.AnyStr, *args) -> str:
+    """
+    Returns the key identifying a detection of `kind` on a `sample` (with
+    possible additional parameters `args`), which is based on a hash of
+    the sample.
+    """
+    if isinstance(sample, str):
+        sample = sample.encode("utf-8", errors="surrogatepass")
+
+    digest = hashlib.sha256(bytes(sample))
+    for arg in args:
+        digest.update(repr(arg).encode("utf-8"))
+
+    return "{}:{}".format(kind, digest.hexdigest())
+
+
+def detect_encoding(
+    sample: bytes,
+    source: typing.Optional[typing.BinaryIO] = None,
+) -> typing.Optional[str]:
+    """
+    Detects the encoding of a `sample`, as `comma.extras.detect_encoding()`
+    does, using the cache (see `set_cache()`) if one is set. If the seekable
+    binary stream `source` from which the sample was taken is provided, the
+    detection can look past the sample when it is inconclusive (see
+    `comma.extras.detect_stream_encoding()`): Since the cache is keyed by
+    the sample, such a result is not cached.
+    """
+    cache = get_cache()
+    if cache is None:
+        if source is not None:
+            return comma.extras.detect_stream_encoding(source)
+        return comma.extras.detect_encoding(sample)
+
+    key = fingerprint("encoding", sample)
+    entry = cache.get(key)
+    if entry is not None:
+        return entry["encoding"]
+
+    if source is not None:
+        encoding, size_read = comma.extras._detect_stream_encoding(source)
+        if size_read > len(sample):
+            return encoding
+    else:
+        encoding = comma.extras.detect_encoding(sample)
+
+    cache.put(key, {"encoding": encoding})
+    return encoding
+
+
+def detect_csv_type(
+    sample: str,
+    delimiters: typing.Optional[typing.Iterable[str]] = None,
+) -> comma.typing.CommaInfoParamsType:
+    """
+    Detects the format of a CSV file from a `sample`, as
+    `comma.extras.detect_csv_type()` does, using the cache (see
+    `set_cache()`) if one is set. (When the result comes from the cache,
+    the `"simple_dialect"` entry is `None`.)
+    """
+    cache = get_cache()
+    if cache is None:
+        return comma.extras.detect_csv_type(
+            sample=sample,
+            delimiters=delimiters)
+
+    if delimiters is not None:
+        delimiters = sorted(delimiters)
+
+    key = fingerprint("csv", sample, delimiters)
+    entry = cache.get(key)
+    if entry is not None:
+        return {
+            "dialect": comma.helpers.DefaultDialect.override(
+                **entry["dialect"]),
+            "simple_dialect": None,
+            "has_header": entry["has_header"],
+            "line_terminator": entry["line_terminator"],
+        }
+
+    csv_params = comma.extras.detect_csv_type(
+        sample=sample,
+        delimiters=delimiters)
+
+    cache.put(key, {
+        "dialect": comma.parallel.dialect_to_dict(csv_params["dialect"]),
+        "has_header": csv_params["has_header"],
+        "line_terminator": csv_params["line_terminator"],
+    })
+
+    return csv_params
@@ -0,0 +1,745 @@
+import array
+import collections.abc
+import copy
+import itertools
+import sys
+import typing
+
+import comma.classes.row
+import comma.exceptions
+import comma.inference
+
+
+__author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
+
+__all__ = [
+    "CommaSequenceView",
+    "CommaTypedColumn",
+    "CommaEncodedColumn",
+    "CommaColumnarRowData",
+    "CommaColumnarRows",
+
+    "column_memory_usage",
+]
+
+
+# the value used to fill in the missing fields of rows that are shorter
+# than the others, since in columnar storage all rows have the same width
+# (typed columns, which cannot store it, are converted back to strings)
+MISSING_FIELD_VALUE = ""
+
+# the typecodes of the `array.array` storing the codes of a dictionary
+# encoded column, by increasing size (the smallest that fits is used)
+CODE_TYPECODES = ["B", "H", "I", "Q"]
+
+# number of rows that are stored at a time when building columnar storage
+COLUMNAR_BATCH_SIZE = 10000
+
+
+class _ListLikeMixin(object):
+    """
+    Comparison and representation helpers for the list-like views of this
+    module, which behave as the list of the items they contain.
+    """
+
+    __slots__ = ()
+
+    def __eq__(self, other):
+        # noinspection PyBroadException
+        try:
+            return list(self) == list(other)
+        except:
+            return False
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        return list(self).__repr__()
+
+    def __deepcopy__(self, memodict=None):
+        # a deep copy of a view is a list of (deep copies of) its items,
+        # rather than a copy of the whole underlying storage
+        return copy.deepcopy(list(self), memodict)
+
+    __hash__ = None
+
+
+class CommaSequenceView(_ListLikeMixin, collections.abc.MutableSequence):
+    """
+    A list-like view of a subset of the items of a `sequence`, selected by
+    a `range` of indexes. Items can be read and modified through the view,
+    but since it does not own the items, its size cannot be changed.
+    """
+
+    __slots__ = ("_sequence", "_range")
+
+    def __init__(
+        self,
+        sequence: typing.MutableSequence,
+        index_range: typing.Optional[range] = None,
+    ):
+        self._sequence = sequence
+        self._range = (index_range if index_range is not None
+                       else range(len(sequence)))
+
+    def __len__(self):
+        return len(self._range)
+
+    def __iter__(self):
+        sequence = self._sequence
+        for i in self._range:
+            yield sequence[i]
+
+    def __getitem__(self, key):
+        if type(key) is slice:
+            return CommaSequenceView(self._sequence, self._range[key])
+        return self._sequence[self._range[key]]
+
+    def __setitem__(self, key, value):
+        if type(key) is slice:
+            index_range = self._range[key]
+            value = list(value)
+            if len(index_range) != len(value):
+                raise comma.exceptions.CommaBatchException(
+                    "attempting to assign a slice of different size")
+            for i, item in zip(index_range, value):
+                self._sequence[i] = item
+            return
+        self._sequence[self._range[key]] = value
+
+    def __delitem__(self, key):
+        raise comma.exceptions.CommaBatchException(
+            "cannot change the size of a view")
+
+    def insert(self, index, value):
+        raise comma.exceptions.CommaBatchException(
+            "cannot change the size of a view")
+
+
+class CommaTypedColumn(_ListLikeMixin, collections.abc.MutableSequence):
+    """
+    A column of values of a single type `dtype`, stored in a `buffer` which,
+    for numeric types, is a compact `array.array` (see
+    `comma.inference.make_buffer()`). Strings written to the column are
+    parsed to its type.
+    """
+
+    __slots__ = ("buffer", "dtype")
+
+    def __init__(self, buffer: typing.MutableSequence, dtype: type):
+        self.buffer = buffer
+        self.dtype = dtype
+
+    @classmethod
+    def from_values(
+        cls,
+        values: typing.Iterable[typing.Any],
+        dtype: type,
+    ) -> "CommaTypedColumn":
+        """
+        Creates a typed column by converting the `values` to type `dtype`.
+        """
+        return cls(
+            buffer=comma.inference.make_buffer(values, dtype),
+            dtype=dtype)
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def __iter__(self):
+        return iter(self.buffer)
+
+    def __getitem__(self, key):
+        if type(key) is slice:
+            return CommaTypedColumn(self.buffer[key], self.dtype)
+        return self.buffer[key]
+
+    def __setitem__(self, key, value):
+        if type(key) is slice:
+            value = [comma.inference.parse_value(item, self.dtype)
+                     for item in value]
+            if isinstance(self.buffer, array.array):
+                value = array.array(self.buffer.typecode, value)
+        else:
+            value = comma.inference.parse_value(value, self.dtype)
+        self.buffer[key] = value
+
+    def __delitem__(self, key):
+        del self.buffer[key]
+
+    def insert(self, index, value):
+        self.buffer.insert(
+            index, comma.inference.parse_value(value, self.dtype))
+
+    def append(self, value):
+        self.buffer.append(comma.inference.parse_value(value, self.dtype))
+
+
+def _code_typecode(count: int) -> str:
+    """
+    Returns the typecode of the smallest `array.array` that can store
+    `count` distinct codes.
+    """
+    for typecode in CODE_TYPECODES:
+        if count <= 1 << (8 * array.array(typecode).itemsize):
+            return typecode
+    raise OverflowError("too many distinct values to encode")
+
+
+class CommaEncodedColumn(_ListLikeMixin, collections.abc.MutableSequence):
+    """
+    A dictionary-encoded column, for columns that take few distinct values
+    (such as a country or a status): Each distinct value is stored once, in
+    the `vocabulary`, and the column is stored as a compact `array.array`
+    of `codes` (the positions of the values in the vocabulary), which uses
+    one or two bytes per row rather than a reference to a string.
+
+    The column behaves as the list of its values; counting, looking up or
+    comparing values is done directly on the codes.
+    """
+
+    __slots__ = ("codes", "vocabulary", "_code_of")
+
+    def __init__(
+        self,
+        codes: typing.Optional[array.array] = None,
+        vocabulary: typing.Optional[typing.List[typing.Any]] = None,
+        code_of: typing.Optional[typing.Dict[typing.Any, int]] = None,
+    ):
+        self.vocabulary = vocabulary if vocabulary is not None else list()
+        self._code_of = (code_of if code_of is not None else {
+            value: code for code, value in enumerate(self.vocabulary)})
+        self.codes = (codes if codes is not None
+                      else array.array(_code_typecode(len(self.vocabulary))))
+
+    @classmethod
+    def from_values(
+        cls,
+        values: typing.Iterable[typing.Any],
+    ) -> "CommaEncodedColumn":
+        """
+        Creates a dictionary-encoded column containing the `values`.
+        """
+        code_of = dict()
+        codes = [code_of.setdefault(value, len(code_of)) for value in values]
+        return cls(
+            codes=array.array(_code_typecode(len(code_of)), codes),
+            vocabulary=list(code_of),
+            code_of=code_of)
+
+    def code(self, value: typing.Any) -> typing.Optional[int]:
+        """
+        Returns the code of `value`, or `None` if the column has never
+        contained that value.
+        """
+        return self._code_of.get(value)
+
+    def encode(self, value: typing.Any) -> int:
+        """
+        Returns the code of `value`, adding the value to the vocabulary if
+        needed (in which case the codes may be moved to a larger array, so
+        that the code fits).
+        """
+        code = self._code_of.get(value)
+
+        if code is None:
+            code = len(self.vocabulary)
+            self.vocabulary.append(value)
+            self._code_of[value] = code
+
+        if code >> (8 * self.codes.itemsize):
+            self.codes = array.array(_code_typecode(code + 1), self.codes)
+
+        return code
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __iter__(self):
+        return map(self.vocabulary.__getitem__, self.codes)
+
+    def __getitem__(self, key):
+        if type(key) is slice:
+            # (the slice shares the vocabulary of the column)
+            return CommaEncodedColumn(
+                codes=self.codes[key],
+                vocabulary=self.vocabulary,
+                code_of=self._code_of)
+        return self.vocabulary[self.codes[key]]
+
+    # (the codes are computed before the array is accessed, since encoding
+    # a value may replace the array)
+
+    def __setitem__(self, key, value):
+        if type(key) is slice:
+            codes = [self.encode(item) for item in value]
+            self.codes[key] = array.array(self.codes.typecode, codes)
+            return
+        code = self.encode(value)
+        self.codes[key] = code
+
+    def __delitem__(self, key):
+        del self.codes[key]
+
+    def insert(self, index, value):
+        code = self.encode(value)
+        self.codes.insert(index, code)
+
+    def append(self, value):
+        code = self.encode(value)
+        self.codes.append(code)
+
+    def extend(self, values):
+        code_of = self._code_of
+        codes = [code_of[value] if value in code_of else self.encode(value)
+                 for value in values]
+        self.codes.extend(codes)
+
+    def __contains__(self, value):
+        code = self._code_of.get(value)
+        return code is not None and code in self.codes
+
+    def count(self, value) -> int:
+        code = self._code_of.get(value)
+        if code is None:
+            return 0
+        return self.codes.count(code)
+
+    def index(self, value, start=0, stop=None) -> int:
+        code = self._code_of.get(value)
+        if code is not None and start == 0 and stop is None:
+            return self.codes.index(code)
+        return super().index(value, start, stop)
+
+    def indexes(self, value) -> typing.List[int]:
+        """
+        Returns the positions of the cells of the column equal to `value`.
+        """
+        code = self._code_of.get(value)
+        if code is None:
+            return list()
+        return [index for index, item in enumerate(self.codes) if item == code]
+
+    def __eq__(self, other):
+        # columns sharing a vocabulary are compared by their codes
+        if (isinstance(other, CommaEncodedColumn) and
+                other.vocabulary is self.vocabulary):
+            return self.codes == other.codes
+        return super().__eq__(other)
+
+    __hash__ = None
+
+
+def column_memory_usage(column: typing.Sequence) -> int:
+    """
+    Returns an estimate of the number of bytes used by a `column` (a list,
+    a `CommaTypedColumn` or a `CommaEncodedColumn`), including the values
+    it contains (each distinct object is counted once).
+    """
+    if isinstance(column, CommaEncodedColumn):
+        return (sys.getsizeof(column.codes) +
+                sys.getsizeof(column.vocabulary) +
+                sys.getsizeof(column._code_of) +
+                sum(map(sys.getsizeof, column.vocabulary)))
+
+    if isinstance(column, CommaTypedColumn):
+        column = column.buffer
+        if isinstance(column, array.array):
+            return sys.getsizeof(column)
+
+    objects = {id(value): value for value in column}
+    return sys.getsizeof(column) + sum(map(sys.getsizeof, objects.values()))
+
+
+class CommaColumnarRowData(_ListLikeMixin, collections.abc.MutableSequence):
+    """
+    The underlying data of a row that is stored in columnar storage: This
+    list-like view reads and writes the cells of row `index` directly in
+    the `columns`. (It is used as the `data` of a `CommaRow`, so that the
+    row keeps all its usual list/dict semantics.)
+    """
+
+    __slots__ = ("_columns", "_index")
+
+    def __init__(self, columns: typing.List[typing.MutableSequence], index: int):
+        self._columns = columns
+        self._index = index
+
+    def __len__(self):
+        return len(self._columns)
+
+    def __iter__(self):
+        index = self._index
+        for column in self._columns:
+            yield column[index]
+
+    def __getitem__(self, key):
+        if type(key) is slice:
+            index = self._index
+            return [column[index] for column in self._columns[key]]
+        return self._columns[key][self._index]
+
+    def __setitem__(self, key, value):
+        if type(key) is slice:
+            columns = self._columns[key]
+            value = list(value)
+            if len(columns) != len(value):
+                raise comma.exceptions.CommaBatchException(
+                    "attempting to assign a slice of different size")
+            for column, item in zip(columns, value):
+                column[self._index] = item
+            return
+        self._columns[key][self._index] = value
+
+    def __delitem__(self, key):
+        raise comma.exceptions.CommaBatchException(
+            "cannot change the width of a row in columnar storage")
+
+    def insert(self, index, value):
+        raise comma.exceptions.CommaBatchException(
+            "cannot change the width of a row in columnar storage")
+
+
+class CommaColumnarRows(_ListLikeMixin, collections.abc.MutableSequence):
+    """
+    Contains the rows of a table stored by columns, that is, with one
+    list per column rather than one list per row. This list-like object is
+    used as the `data` of a `CommaTable`: Accessing a row returns a
+    lightweight `CommaRow` view, through which the cells are read and
+    written directly in the columns, and accessing a column is free.
+
+    Because of this storage, all rows have the same width: Missing fields
+    of shorter rows are filled in with an empty string.
+    """
+
+    # the list of columns (each a list, or any mutable sequence)
+    _columns = None
+
+    # the parent `CommaFile` of the rows
+    _parent = None
+
+    def __init__(
+        self,
+        columns: typing.Optional[typing.List[typing.MutableSequence]] = None,
+        parent: typing.Optional[object] = None,
+    ):
+        self._columns = columns if columns is not None else list()
+        self._parent = parent
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: typing.Iterable[typing.Iterable[typing.Any]],
+        parent: typing.Optional[object] = None,
+        column_count: typing.Optional[int] = None,
+        dictionary_encoding: bool = False,
+        sample_size: typing.Optional[int] = comma.inference.INFERENCE_SAMPLE_SIZE,
+    ) -> "CommaColumnarRows":
+        """
+        Creates columnar storage from the (possibly lazily produced) `rows`;
+        since the rows are consumed one at a time, they never all need to
+        be in memory at once.
+
+        If `dictionary_encoding` is `True`, the columns that have a low
+        cardinality in the first `sample_size` rows are dictionary-encoded
+        (see `encode_columns()`) before the remaining rows are stored.
+        """
+        obj = cls(
+            columns=[list() for _ in range(column_count or 0)],
+            parent=parent)
+
+        rows = iter(rows)
+
+        if dictionary_encoding:
+            obj.extend(itertools.islice(rows, sample_size))
+            obj.encode_columns(sample_size=sample_size)
+
+        # (the rows are stored by batches, each column being extended at
+        # once, rather than one cell at a time)
+        while True:
+            batch = list(itertools.islice(rows, COLUMNAR_BATCH_SIZE))
+            if len(batch) == 0:
+                break
+            obj.extend(batch)
+
+        return obj
+
+    @property
+    def columns(self) -> typing.List[typing.MutableSequence]:
+        """
+        The list of columns of this storage (each being the sequence of the
+        values of that field, for all rows).
+        """
+        return self._columns
+
+    def column(self, index: int) -> typing.MutableSequence:
+        """
+        Returns the column at position `index` (without making a copy).
+        """
+        return self._columns[index]
+
+    @property
+    def dtypes(self) -> typing.List[type]:
+        """
+        The type of the values of each column: Typed columns (see
+        `CommaTypedColumn`) have their own type, others contain strings.
+        """
+        return [
+            column.dtype if isinstance(column, CommaTypedColumn) else str
+            for column in self._columns
+        ]
+
+    def infer_types(
+        self,
+        sample_size: typing.Optional[int] = comma.inference.INFERENCE_SAMPLE_SIZE,
+    ):
+        """
+        Infers the type of each column from (a sample of `sample_size` of)
+        its values, see `comma.inference.infer_type()`, and converts the
+        columns that are not strings into `CommaTypedColumn` objects. If
+        any value of the column is not of the inferred type, the column is
+        kept as strings.
+        """
+        for index, column in enumerate(self._columns):
+
+            if isinstance(column, CommaTypedColumn):
+                continue
+
+            dtype = comma.inference.infer_type(column, sample_size=sample_size)
+            if dtype is str:
+                continue
+
+            # check the values beyond the sample are also of that type
+            remaining_values = itertools.islice(column, sample_size, None)
+            if not all(comma.inference.is_type(value, dtype)
+                       for value in remaining_values):
+                continue
+
+            try:
+                self._columns[index] = CommaTypedColumn.from_values(
+                    values=column,
+                    dtype=dtype)
+            except (ValueError, OverflowError, TypeError):
+                # some value beyond the sample is not of the inferred type
+                continue
+
+    def encode_columns(
+        self,
+        sample_size: typing.Optional[int] = comma.inference.INFERENCE_SAMPLE_SIZE,
+    ):
+        """
+        Converts the columns of strings that have a low cardinality (see
+        `comma.inference.is_low_cardinality()`) in (a sample of `sample_size`
+        of) their values into dictionary-encoded `CommaEncodedColumn`
+        objects.
+        """
+        for index, column in enumerate(self._columns):
+
+            if isinstance(column, (CommaTypedColumn, CommaEncodedColumn)):
+                continue
+
+            if comma.inference.is_low_cardinality(
+                    column, sample_size=sample_size):
+                self._columns[index] = CommaEncodedColumn.from_values(column)
+
+    def memory_usage(self) -> typing.List[int]:
+        """
+        Returns an estimate of the number of bytes used by each column (see
+        `column_memory_usage()`).
+        """
+        return [column_memory_usage(column) for column in self._columns]
+
+    def __len__(self):
+        if len(self._columns) == 0:
+            return 0
+        return len(self._columns[0])
+
+    def _make_row(self, index: int) -> "comma.classes.row.CommaRow":
+        """
+        Returns a `CommaRow` view of the row at position `index`.
+        """
+        row = comma.classes.row.CommaRow(parent=self._parent)
+        row.data = CommaColumnarRowData(self._columns, index)
+        return row
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self._make_row(index)
+
+    def __getitem__(self, key):
+        if type(key) is slice:
+            return [self._make_row(index) for index in range(len(self))[key]]
+        if key < 0:
+            key += len(self)
+        if key < 0 or key >= len(self):
+            raise IndexError("list index out of range")
+        return self._make_row(key)
+
+    def _untype_columns(self, start: int):
+        """
+        Converts the typed columns from position `start` onwards back to
+        lists of strings (the inverse of type inference), so that they can
+        store missing fields (see `MISSING_FIELD_VALUE`).
+        """
+        for index in range(start, len(self._columns)):
+            if isinstance(self._columns[index], CommaTypedColumn):
+                self._columns[index] = list(map(str, self._columns[index]))
+
+    def _row_values(self, row: typing.Iterable[typing.Any]) -> typing.List:
+        """
+        Returns the values of `row` as a list of the width of the storage;
+        if the row is wider than the storage, the storage is widened.
+        """
+        values = list(row)
+        width = len(self._columns)
+
+        if len(values) > width:
+            size = len(self)
+            for _ in range(len(values) - width):
+                self._columns.append([MISSING_FIELD_VALUE] * size)
+
+        elif len(values) < width:
+            self._untype_columns(start=len(values))
+            values += [MISSING_FIELD_VALUE] * (width - len(values))
+
+        return values
+
+    def __setitem__(self, key, value):
+        if type(key) is slice:
+            indexes = range(len(self))[key]
+            value = list(value)
+            if len(indexes) != len(value):
+                raise comma.exceptions.CommaBatchException(
+                    "attempting to assign a slice of different size")
+            for index, row in zip(indexes, value):
+                self.__setitem__(index, row)
+            return
+
+        if key < 0:
+            key += len(self)
+        if key < 0 or key >= len(self):
+            raise IndexError("list assignment index out of range")
+
+        values = self._row_values(value)
+        for column, item in zip(self._columns, values):
+            column[key] = item
+
+    def __delitem__(self, key):
+        for column in self._columns:
+            del column[key]
+
+    # The following methods move or remove whole rows: Since a row is a
+    # view of its position in the columns, the values of the rows are
+    # copied out of the columns before they are changed (the inherited
+    # implementations would move the views, rather than the values).
+
+    def _detached_row(self, index: int) -> "comma.classes.row.CommaRow":
+        """
+        Returns a `CommaRow` containing a copy of the values of the row at
+        position `index`, which is not tied to the storage.
+        """
+        return comma.classes.row.CommaRow(
+            [column[index] for column in self._columns],
+            parent=self._parent)
+
+    def pop(self, index=-1):
+        if len(self) == 0:
+            raise IndexError("pop from empty list")
+        row = self._detached_row(index)
+        del self[index]
+        return row
+
+    def clear(self):
+        for column in self._columns:
+            del column[:]
+
+    def reverse(self):
+        for column in self._columns:
+            column[:] = column[::-1]
+
+    def sort(self, key=None, reverse=False):
+        rows = [self._detached_row(index) for index in range(len(self))]
+
+        if key is None:
+            order = sorted(range(len(rows)), key=rows.__getitem__,
+                           reverse=reverse)
+        else:
+            order = sorted(range(len(rows)), key=lambda i: key(rows[i]),
+                           reverse=reverse)
+
+        for column_index, column in enumerate(self._columns):
+            column[:] = [rows[i].data[column_index] for i in order]
+
+    def __add__(self, other):
+        # (the columns are copied, and so keep their types)
+        obj = CommaColumnarRows(
+            columns=[column[:] for column in self._columns],
+            parent=self._parent)
+        obj.extend(other)
+        return obj
+
+    def __radd__(self, other):
+        obj = CommaColumnarRows(parent=self._parent)
+        obj.extend(itertools.chain(other, self))
+        return obj
+
+    def _grow_columns(self, grow: typing.Callable, values, added: slice):
+        """
+        Calls `grow(column, value)` for each column and its `values`, which
+        adds to the column the positions of the slice `added`. If this fails
+        (for instance, because a typed column cannot store a value, or has
+        its buffer exported, see `comma.extras.to_numpy()`), the columns
+        that were already grown, as well as the column that failed if it was
+        partially grown, are restored, so that all the columns keep the same
+        length.
+        """
+        size = len(self)
+        for index, (column, item) in enumerate(zip(self._columns, values)):
+            try:
+                grow(column, item)
+            except Exception:
+                if len(column) > size:
+                    del column[added]
+                for grown_column in self._columns[:index]:
+                    del grown_column[added]
+                raise
+
+    def insert(self, index, value):
+        values = self._row_values(value)
+        position = slice(index, None).indices(len(self))[0]
+        self._grow_columns(
+            lambda column, item: column.insert(position, item),
+            values,
+            added=slice(position, position + 1))
+
+    def append(self, value):
+        values = self._row_values(value)
+        size = len(self)
+        self._grow_columns(
+            lambda column, item: column.append(item),
+            values,
+            added=slice(size, size + 1))
+
+    def extend(self, values):
+        rows = [list(row) for row in values]
+        if len(rows) == 0:
+            return
+
+        # widen the storage to the widest row, and pad the shorter rows
+        width = max(map(len, rows))
+        if width > len(self._columns):
+            size = len(self)
+            for _ in range(width - len(self._columns)):
+                self._columns.append([MISSING_FIELD_VALUE] * size)
+        width = len(self._columns)
+        self._untype_columns(start=min(map(len, rows)))
+        for row in rows:
+            if len(row) < width:
+                row += [MISSING_FIELD_VALUE] * (width - len(row))
+
+        size = len(self)
+        self._grow_columns(
+            lambda column, column_values: column.extend(column_values),
+            zip(*rows),
+            added=slice(size, None))
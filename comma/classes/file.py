@@ -26,12 +26,19 @@ class CommaFile(object):
     # Internal instance variable containing header
     _header = None
 
+    # Internal cache mapping each column name of the header to its index
+    _header_index = None
+
     # Internal instance variable with params
     _params = None
 
     # "Primary key" through which to access the records
     _primary_key = None
 
+    # Number of modifications of the fields of the rows tied to this object
+    # (so that indexes built on these fields know when they may be stale)
+    _modifications = 0
+
     def __init__(
         self,
         header: comma.typing.OptionalHeaderType = None,
@@ -52,7 +59,7 @@ class CommaFile(object):
 
         if header is not None:
             try:
-                self._header = list(map(str, header))
+                self._set_header(list(map(str, header)))
             except Exception as exc:
                 raise comma.exceptions.CommaInvalidHeaderException(
                     "`header` does not seem to be an iterable of strings"
@@ -84,7 +91,7 @@ class CommaFile(object):
         # equivalent to a delete
 
         if value is None:
-            self._header = None
+            self._set_header(None)
             return
 
         validated_header = comma.helpers.validate_header(value)
@@ -103,7 +110,7 @@ class CommaFile(object):
                         old=old_length,
                         new=new_length))
 
-        self._header = validated_header
+        self._set_header(validated_header)
 
     @header.deleter
     def header(self):
@@ -112,7 +119,69 @@ class CommaFile(object):
         only affects the metadata, but does not modify any of the underlying
         rows.
         """
-        self._header = None
+        self._set_header(None)
+
+    def _set_header(self, header: typing.Optional[typing.List[str]]):
+        """
+        Internal setter for the header, which also rebuilds the cached
+        mapping from column names to indexes (when there are duplicate
+        column names, the first occurrence is used, as with `list.index()`).
+        """
+        self._header = header
+
+        if header is None:
+            self._header_index = None
+            return
+
+        header_index = dict()
+        for index, field_name in enumerate(header):
+            header_index.setdefault(field_name, index)
+
+        self._header_index = header_index
+
+    def column_index(self, key: str) -> int:
+        """
+        Returns the index of the column named `key` in the `header`,
+        in constant time. Raises a `CommaNoHeaderException` if there is
+        no header, and a `CommaKeyError` if `key` is not a column name.
+        """
+        if self._header_index is None:
+            raise comma.exceptions.CommaNoHeaderException(
+                "CSV file does not appear to have a header and "
+                "none was provided; key-based access not possible")
+
+        try:
+            return self._header_index[key]
+        except (KeyError, TypeError):
+            raise comma.exceptions.CommaKeyError(
+                "{key} is not in header: {header}".format(
+                    key=key,
+                    header=self._header))
+
+    def has_column(self, key: str) -> bool:
+        """
+        Returns `True` if `key` is the name of a column of the `header`,
+        in constant time.
+        """
+        try:
+            return self._header_index is not None and key in self._header_index
+        except TypeError:
+            return False
+
+    @property
+    def modifications(self) -> int:
+        """
+        The number of modifications of the fields of the rows tied to this
+        `CommaFile` (see `mark_modified()`).
+        """
+        return self._modifications
+
+    def mark_modified(self):
+        """
+        Records that a field of one of the rows tied to this `CommaFile` has
+        been modified; this is called by the rows and column slices.
+        """
+        self._modifications += 1
 
     @property
     def primary_key(self) -> str:
@@ -145,7 +214,7 @@ class CommaFile(object):
             )
 
         # next check if proposed header belongs to headers
-        if value not in self.header:
+        if not self.has_column(value):
             # Try to get a string representation of headers for diagnostic
             # purposes for user; yes, the exception is too broad because
             # we don't really care why the headers couldn't be converted
@@ -0,0 +1,311 @@
+import collections
+import collections.abc
+import csv
+import sys
+import typing
+
+import comma.classes.row
+import comma.config
+import comma.helpers
+
+# (imported by name, as the class is defined while `comma.classes` is being
+# initialized, see `comma.classes.table`)
+from comma.classes.columns import _ListLikeMixin
+
+
+__author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
+
+__all__ = [
+    "CommaLazyRows",
+    "CommaIndexedRows",
+]
+
+
+# the reference count of a row that is only referenced by the cache (once
+# its entry is removed from the cache: the references are from the entry,
+# from a local variable, and from the argument of `sys.getrefcount()`)
+_UNREFERENCED_ROW_REFCOUNT = 3
+
+# largest number of rows looked at to evict a row from the cache (so that
+# rows which are still referenced elsewhere do not make eviction costly)
+_EVICTION_SCAN_LIMIT = 8
+
+
+class CommaLazyRows(_ListLikeMixin, collections.abc.MutableSequence):
+    """
+    Contains the rows of a table that are only parsed when they are
+    accessed: This list-like object keeps the decoded `text` of the CSV
+    file and the `offsets` of its records (see
+    `comma.helpers.index_records()`), and parses a record into a `CommaRow`
+    the first time it is accessed. It is used as the `data` of a
+    `CommaTable`, so that a table of which only a few rows are ever used
+    can be loaded quickly.
+
+    At most `maxsize` parsed rows (by default, the global setting
+    `LAZY_CACHE_SIZE`) are kept, the least recently accessed ones being
+    discarded first; rows that have been modified, or that are still
+    referenced elsewhere, are kept. Adding rows at the end of the table
+    keeps the rows lazy, but other changes to the structure of the table
+    (inserting, removing or reordering rows) parse all the rows first.
+    """
+
+    def __init__(
+        self,
+        text: str,
+        offsets: typing.Sequence[int],
+        dialect: typing.Union[csv.Dialect, typing.Type[csv.Dialect]],
+        parent: typing.Optional[object] = None,
+        maxsize: typing.Optional[int] = None,
+    ):
+        self._text = text
+        self._offsets = offsets
+        self._dialect = dialect
+        self._parent = parent
+        self._maxsize = (maxsize if maxsize is not None
+                         else comma.config.settings.LAZY_CACHE_SIZE)
+
+        # the parsed rows (with the tuple of fields they were parsed with,
+        # which the row shares until it is modified), by index, in order
+        # of last access
+        self._cache = collections.OrderedDict()
+
+        # the rows that were modified (and so cannot be parsed again)
+        self._pinned = dict()
+
+        # the rows added at the end of the table
+        self._appended = list()
+
+        # all the rows, once the structure of the table has been changed
+        self._rows = None
+
+    @property
+    def maxsize(self) -> int:
+        """
+        The largest number of parsed rows that are kept in memory.
+        """
+        return self._maxsize
+
+    @property
+    def materialized_count(self) -> int:
+        """
+        The number of rows that are currently parsed (and kept in memory).
+        """
+        if self._rows is not None:
+            return len(self._rows)
+        return len(self._cache) + len(self._pinned) + len(self._appended)
+
+    def _record_count(self) -> int:
+        return len(self._offsets) - 1
+
+    def _parse(self, index: int) -> typing.List[str]:
+        """
+        Parses the record at position `index` of the text.
+        """
+        return comma.helpers.parse_record(
+            self._text[self._offsets[index]:self._offsets[index + 1]],
+            self._dialect)
+
+    def _evict(self):
+        """
+        Discards the least recently accessed rows, until there are at most
+        `maxsize` of them; a row that was modified is pinned instead, and a
+        row that is still referenced elsewhere is kept.
+        """
+        cache = self._cache
+
+        for _ in range(min(len(cache), _EVICTION_SCAN_LIMIT)):
+            if len(cache) <= self._maxsize:
+                break
+
+            index, entry = cache.popitem(last=False)
+            row, fields = entry
+
+            if sys.getrefcount(row) > _UNREFERENCED_ROW_REFCOUNT:
+                # (looked at again once it is the least recently used)
+                cache[index] = entry
+
+            elif row.data is not fields and tuple(row.data) != fields:
+                self._pinned[index] = row
+
+    def _get_row(self, index: int) -> "comma.classes.row.CommaRow":
+        """
+        Returns the row at (non-negative) position `index`, parsing it if
+        it is not in memory.
+        """
+        record_count = self._record_count()
+        if index >= record_count:
+            return self._appended[index - record_count]
+
+        row = self._pinned.get(index)
+        if row is not None:
+            return row
+
+        entry = self._cache.get(index)
+        if entry is not None:
+            self._cache.move_to_end(index)
+            return entry[0]
+
+        fields = tuple(self._parse(index))
+        row = comma.classes.row.CommaRow(parent=self._parent)
+        row.data = fields
+
+        self._cache[index] = (row, fields)
+        if len(self._cache) > self._maxsize:
+            self._evict()
+
+        return row
+
+    def _materialize(self) -> typing.List:
+        """
+        Parses all the rows, and from then on stores them in a list (the
+        text of the source is no longer needed).
+        """
+        if self._rows is None:
+            rows = list()
+            for index in range(self._record_count()):
+                row = self._pinned.get(index)
+                if row is None and index in self._cache:
+                    row = self._cache[index][0]
+                if row is None:
+                    row = comma.classes.row.CommaRow(parent=self._parent)
+                    row.data = tuple(self._parse(index))
+                rows.append(row)
+            rows.extend(self._appended)
+
+            self._rows = rows
+            self._text = None
+            self._offsets = None
+            self._cache = None
+            self._pinned = None
+            self._appended = None
+        return self._rows
+
+    def __len__(self):
+        if self._rows is not None:
+            return len(self._rows)
+        return self._record_count() + len(self._appended)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            if self._rows is not None:
+                yield self._rows[index]
+            else:
+                yield self._get_row(index)
+
+    def __getitem__(self, key):
+        if self._rows is not None:
+            return self._rows[key]
+
+        if type(key) is slice:
+            return [self._get_row(index) for index in range(len(self))[key]]
+
+        if key < 0:
+            key += len(self)
+        if key < 0 or key >= len(self):
+            raise IndexError("list index out of range")
+
+        return self._get_row(key)
+
+    def __setitem__(self, key, value):
+        if self._rows is not None or type(key) is slice:
+            self._materialize()[key] = value
+            return
+
+        if key < 0:
+            key += len(self)
+        if key < 0 or key >= len(self):
+            raise IndexError("list assignment index out of range")
+
+        record_count = self._record_count()
+        if key >= record_count:
+            self._appended[key - record_count] = value
+            return
+
+        self._cache.pop(key, None)
+        self._pinned[key] = value
+
+    def __delitem__(self, key):
+        del self._materialize()[key]
+
+    def insert(self, index, value):
+        self._materialize().insert(index, value)
+
+    def append(self, value):
+        if self._rows is not None:
+            self._rows.append(value)
+        else:
+            self._appended.append(value)
+
+    def extend(self, values):
+        for value in values:
+            self.append(value)
+
+    def reverse(self):
+        self._materialize().reverse()
+
+    def sort(self, *args, **kwargs):
+        self._materialize().sort(*args, **kwargs)
+
+
+class CommaIndexedRows(CommaLazyRows):
+    """
+    Contains the rows of a local CSV file that has been indexed (see
+    `comma.index.RecordIndex`): As with `CommaLazyRows`, a row is only
+    parsed when it is accessed, but the file is not read into memory;
+    instead, the block of records containing the row is read from the file
+    (at the offset stored in the index) and parsed.
+
+    The first `start` records of the file (following its header) are
+    skipped.
+    """
+
+    def __init__(
+        self,
+        index: "comma.index.RecordIndex",
+        parent: typing.Optional[object] = None,
+        maxsize: typing.Optional[int] = None,
+        start: int = 0,
+    ):
+        super().__init__(
+            text=None,
+            offsets=None,
+            dialect=index.dialect,
+            parent=parent,
+            maxsize=maxsize)
+
+        self._index = index
+        self._start = start
+
+        # the last block of records that was read from the file
+        self._block = None
+        self._block_rows = None
+
+    @property
+    def index(self) -> "comma.index.RecordIndex":
+        """
+        The index of the file from which the rows are read.
+        """
+        return self._index
+
+    def _record_count(self) -> int:
+        return max(0, len(self._index) - self._start)
+
+    def _parse(self, index: int) -> typing.List[str]:
+        """
+        Parses the record at position `index`, reading its block of records
+        from the file if it is not the last one that was read.
+        """
+        index += self._start
+        block = index // self._index.stride
+
+        if block != self._block:
+            self._block_rows = self._index.read_block(block)
+            self._block = block
+
+        return self._block_rows[index - block * self._index.stride]
+
+    def _materialize(self) -> typing.List:
+        rows = super()._materialize()
+        self._block = None
+        self._block_rows = None
+        return rows
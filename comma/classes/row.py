@@ -15,22 +15,58 @@ __all__ = [
 ]
 
 
+# the slicing operations of a row that has not been sliced (shared by all
+# such rows, rather than an empty list per row)
+_NO_SLICES = ()
+
+
 # noinspection PyUnresolvedReferences
-class CommaRow(collections.UserList, list, collections.UserDict):
+class CommaRow(
+    collections.abc.MutableSequence,
+    collections.abc.MutableMapping,
+    list,
+):
     """
     Contains a single row of a CSV file; the row contains only data
     stored in the row, and a pointer to a parent file structure (which
     stores all the extraneous information, such as dialect and header).
+
+    Since a table may contain millions of rows, a row is kept as compact
+    as possible: Its attributes are stored in slots (rather than in an
+    instance dictionary), and the cells of a row that has not been
+    modified are stored in a tuple (rather than in a list, which is
+    larger). A row is still an instance of `list`, so that it can be
+    passed to code that expects one (such as `json.dumps()`), but the
+    methods of the abstract base classes, which come first, apply to the
+    underlying data: The row behaves both as a list (like
+    `collections.UserList`) and as a dictionary (like
+    `collections.UserDict`).
+
+    The tuple is replaced by a list the first time the row is modified
+    in place, or sliced (so that the slice and the row share the same
+    cells, and a change to either is visible in the other).
     """
 
-    # parent CSV file
-    _parent = None  # type: comma.classes.file.CommaFile
+    __slots__ = (
+        # the underlying data (a tuple, a list once modified, or a view of
+        # columnar storage)
+        "data",
+
+        # parent CSV file
+        "_parent",
+
+        # (optionally) sequence of slicing operations
+        "_slice_list",
 
-    # (optionally) sequence of slicing operations
-    _slice_list = None
+        # (optionally) original row reference (`None` if this row is the
+        # original row)
+        "_original",
 
-    # (optionally) original row reference
-    _original = None
+        # cached composition of `_slice_list`, as the size of `data` for
+        # which it was computed and a `range` of the indexes of `data` that
+        # are visible in this row (only for sliced rows)
+        "_index_map",
+    )
 
     def __init__(
         self,
@@ -51,11 +87,23 @@ class CommaRow(collections.UserList, list, collections.UserDict):
         """
         # initialize internal attributes
         self._parent = typing.cast(comma.classes.file.CommaFile, parent)
-        self._slice_list = slice_list if slice_list is not None else list()
-        self._original = self if original is None else original
+        self._slice_list = (tuple(slice_list) if slice_list
+                            else _NO_SLICES)
+        self._original = original
+        self._index_map = None
 
-        # call base constructor for lists
-        super().__init__(initlist)
+        # (as `collections.UserList`, the data is copied)
+        self.data = tuple(initlist) if initlist is not None else ()
+
+    def __mutable_data(self):
+        """
+        Returns the underlying data, after replacing it by a list if it
+        is (still) a tuple, so that it can be modified in place.
+        """
+        data = self.data
+        if type(data) is tuple:
+            data = self.data = list(data)
+        return data
 
     def __deepcopy__(
         self,
@@ -71,11 +119,32 @@ class CommaRow(collections.UserList, list, collections.UserDict):
             initlist=copy.deepcopy(list(self.__iter__())),
             parent=copy.deepcopy(self._parent),
             slice_list=copy.deepcopy(self._slice_list),
-            original=self._original
+            original=self._original if self._original is not None else self
         )
         memodict[id_self] = obj
         return obj
 
+    def __get_index_map(self) -> range:
+        """
+        Returns the indexes of the underlying data that are visible in
+        this row, once all the slicing operations of `_slice_list` have
+        been applied. Since the slice of a `range` is a `range`, this
+        is composed once (and then only recomputed if the size of the
+        underlying data changes), and supports constant-time `len()`,
+        indexing and reverse lookup.
+        """
+        size = len(self.data)
+        if not self._slice_list:
+            return range(size)
+
+        index_map = self._index_map
+        if index_map is None or index_map[0] != size:
+            index_map = (size, comma.helpers.multislice_range(
+                size=size,
+                slice_list=self._slice_list))
+            self._index_map = index_map
+        return index_map[1]
+
     def __sliced_data(self, data: typing.Sequence = None, enum: bool = False):
         """
         Returns the data (by default, the self's data) sliced
@@ -83,13 +152,19 @@ class CommaRow(collections.UserList, list, collections.UserDict):
         of slices.
         """
 
-        # default to the internal data
+        # if enumerate == True, return indices rather than objects
+        if enum and data is None:
+            return self.__get_index_map()
+
+        # default to the internal data, using the cached index map
         if data is None:
+            if not self._slice_list:
+                return self.data
             data = self.data
+            return [data[i] for i in self.__get_index_map()]
 
-        # if enumerate == True, return indices rather than objects
         if enum:
-            data = list(range(len(data)))
+            data = range(len(data))
 
         return comma.helpers.multislice_sequence(
             sequence=data,
@@ -99,7 +174,9 @@ class CommaRow(collections.UserList, list, collections.UserDict):
         """
         Returns the number of fields stored in this `CommaRow`.
         """
-        return len(self.__sliced_data(enum=True))
+        if not self._slice_list:
+            return len(self.data)
+        return len(self.__get_index_map())
 
     def __sliced_dict(self):
         """
@@ -151,14 +228,9 @@ class CommaRow(collections.UserList, list, collections.UserDict):
         if type(index) is not int:
             raise TypeError("expected an integer index")
 
-        index_map = self.__sliced_data(enum=True)
-        for i in range(len(self.data)):
-            try:
-                reverse_i = index_map[i]
-                if reverse_i == index:
-                    return i
-            except IndexError:
-                continue
+        index_map = self.__get_index_map()
+        if index in index_map:
+            return index_map.index(index)
 
         raise IndexError("index out of range")
 
@@ -171,8 +243,7 @@ class CommaRow(collections.UserList, list, collections.UserDict):
         if type(key) is int:
             # convert from regular index to index after
             # applying multislice operations
-            sliced_range = self.__sliced_data(enum=True)
-            return sliced_range[key]
+            return self.__get_index_map()[key]
 
         # CASE 2: a slice
         if type(key) is slice:
@@ -210,6 +281,11 @@ class CommaRow(collections.UserList, list, collections.UserDict):
         # index of original header (since we are accessing
         # original rows in self.data)
 
+        # a `CommaFile` caches the index of each column name
+
+        if isinstance(self._parent, comma.classes.file.CommaFile):
+            return self._parent.column_index(key)
+
         header = self._parent.header
 
         if key not in header:
@@ -257,9 +333,10 @@ class CommaRow(collections.UserList, list, collections.UserDict):
     # =================================================================
 
     def __iter__(self):
-        ids = range(len(self))
-        for i in ids:
-            yield self[i]
+        data = self.data
+        if not self._slice_list:
+            return iter(data)
+        return (data[i] for i in self.__get_index_map())
 
     def __setitem__(self, key, value):
         ###print("CommaRow.__setitem__", hex(id(self)), key, type(key), value, type(value))
@@ -279,7 +356,9 @@ class CommaRow(collections.UserList, list, collections.UserDict):
 
         else:
             key_index = self.__key_to_column_id(key)
-            super().__setitem__(key_index, value)
+            self.__mutable_data()[key_index] = value
+            if isinstance(self._parent, comma.classes.file.CommaFile):
+                self._parent.mark_modified()
         # key_index = self.__key_to_column_id(key)
         # if type(key) is str and self._original != self:
         #     ##print(type(key) is str and self._original != self)
@@ -321,20 +400,19 @@ class CommaRow(collections.UserList, list, collections.UserDict):
             if comma.settings.SLICE_DEEP_COPY_DATA:
                 data = copy.deepcopy(self.data)
             else:
-                data = self.data
+                data = self.__mutable_data()
 
             ret = CommaRow(
-                list(),  # placeholder value replaced in next line
                 parent=self._parent,
-                slice_list=self._slice_list[:] + [key_index],
-                original=self._original or self
+                slice_list=self._slice_list + (key_index,),
+                original=self._original if self._original is not None else self
             )
             # change after instantiation to ensure we control reference
             ret.data = data
 
         else:
             # get, using access to underlying data, i.e., self.data
-            ret = super().__getitem__(key_index)
+            ret = self.data[key_index]
 
         return ret
 
@@ -351,8 +429,60 @@ class CommaRow(collections.UserList, list, collections.UserDict):
         try:
             self.keys()
         except comma.exceptions.CommaException:
-            return super().__repr__()
+            return list(self).__repr__()
 
         # display as a dict
         dict_repr = dict([(key, self.get(key)) for key in self.header])
         return dict_repr.__repr__()
+
+    # =================================================================
+
+    # The methods of `collections.UserList` that modify the row, which
+    # (as in `collections.UserList`) apply to the underlying data
+
+    def __delitem__(self, key):
+        del self.__mutable_data()[key]
+
+    def insert(self, index, value):
+        self.__mutable_data().insert(index, value)
+
+    def append(self, value):
+        self.__mutable_data().append(value)
+
+    def extend(self, other):
+        self.__mutable_data().extend(other)
+
+    def pop(self, index=-1):
+        return self.__mutable_data().pop(index)
+
+    def remove(self, value):
+        self.__mutable_data().remove(value)
+
+    def clear(self):
+        self.__mutable_data().clear()
+
+    def reverse(self):
+        self.__mutable_data().reverse()
+
+    def sort(self, *args, **kwargs):
+        self.__mutable_data().sort(*args, **kwargs)
+
+    def __iadd__(self, other):
+        self.__mutable_data().extend(other)
+        return self
+
+    def __mul__(self, n):
+        return list(self).__mul__(n)
+
+    __rmul__ = __mul__
+
+    def __imul__(self, n):
+        data = self.__mutable_data()
+        data *= n
+        return self
+
+    def copy(self):
+        return CommaRow(
+            self.data,
+            parent=self._parent,
+            slice_list=self._slice_list)
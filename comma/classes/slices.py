@@ -1,8 +1,13 @@
 
 import collections
 import copy
+import typing
 
+import comma.classes.columns
+import comma.classes.file
+import comma.classes.row
 import comma.exceptions
+import comma.extras
 
 
 __author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
@@ -15,6 +20,12 @@ __all__ = [
 class CommaFieldSlice(list, collections.UserList):
     """
     Contains a column of a CSV file.
+
+    This is a view: It references the rows of the table it was obtained
+    from (or, with columnar storage, the column itself) rather than a copy
+    of them, so that reading or modifying a cell of the column slice reads
+    or modifies the cell of the table. (A copy is only made when the global
+    setting `SLICE_DEEP_COPY_DATA` is set.)
     """
 
     # parent CSV file
@@ -26,15 +37,33 @@ class CommaFieldSlice(list, collections.UserList):
     # index of field name among _parent.header
     _field_index = None
 
-    def __init__(self, initlist=None, parent=None, field_name=None, *args, **kwargs):
+    # the (referenced) sequence of rows from which the column is sliced
+    _rows = None
+
+    # (optionally) the column itself, when the table uses columnar storage
+    _column = None
+
+    def __init__(self, initlist=None, parent=None, field_name=None, column=None, rows=None, *args, **kwargs):
+        """
+        Creates a column slice, either from a list of rows `initlist` (of
+        which a copy is made), from a sequence of `rows` (which is
+        referenced, not copied), or from the `column` itself.
+        """
 
         self._parent = parent
         self._field_name = field_name
+        self._column = column
+
+        if rows is not None:
+            self._rows = rows
+        elif column is None:
+            self._rows = list(initlist) if initlist is not None else list()
 
         # obtain the _field_index corresponding to the name
         self._recompute_field_index()
 
-        super().__init__(initlist, *args, **kwargs)
+        # the underlying `list` is not used
+        super().__init__(*args, **kwargs)
 
     def _recompute_field_index(self):
         """
@@ -57,8 +86,11 @@ class CommaFieldSlice(list, collections.UserList):
 
         try:
             # FIXME: handle duplicate names (warning?)
-            self._field_index = self._parent.header.index(self._field_name)
-        except ValueError:
+            if isinstance(self._parent, comma.classes.file.CommaFile):
+                self._field_index = self._parent.column_index(self._field_name)
+            else:
+                self._field_index = self._parent.header.index(self._field_name)
+        except (ValueError, comma.exceptions.CommaKeyError):
             raise comma.exceptions.CommaKeyError(
                 "the field '{}' does not exist among the header: {}".format(
                     self._field_name,
@@ -66,25 +98,206 @@ class CommaFieldSlice(list, collections.UserList):
                 )
             )
 
+    def __len__(self):
+        if self._column is not None:
+            return len(self._column)
+        return len(self._rows)
+
     def __iter__(self):
-        for row in super().__iter__():
-            yield row[self._field_index]
+        if self._column is not None:
+            yield from self._column
+            return
+        field_index = self._field_index
+        for row in self._rows:
+            yield row[field_index]
+
+    def __reversed__(self):
+        return reversed(list(self))
+
+    def _encoded_column(self):
+        """
+        Returns the column, if it is dictionary-encoded (see the
+        `dictionary_encoding` option of `comma.load()`), in which case
+        values are looked up by their code; otherwise returns `None`.
+        """
+        if isinstance(self._column, comma.classes.columns.CommaEncodedColumn):
+            return self._column
+
+    def __contains__(self, value):
+        encoded_column = self._encoded_column()
+        if encoded_column is not None:
+            return value in encoded_column
+        return any(item == value for item in self)
+
+    def index(self, value, *args):
+        encoded_column = self._encoded_column()
+        if encoded_column is not None:
+            return encoded_column.index(value, *args)
+        return list(self).index(value, *args)
+
+    def count(self, value):
+        encoded_column = self._encoded_column()
+        if encoded_column is not None:
+            return encoded_column.count(value)
+        return sum(1 for item in self if item == value)
+
+    def indexes(self, value) -> typing.List[int]:
+        """
+        Returns the positions of the cells of this column equal to `value`,
+        which can be used to filter the rows of the table.
+        """
+        encoded_column = self._encoded_column()
+        if encoded_column is not None:
+            return encoded_column.indexes(value)
+        return [index for index, item in enumerate(self) if item == value]
+
+    def _iter_values(self):
+        """
+        Iterates over the values of the column; this reads the cells
+        directly from the underlying data of the rows when possible,
+        rather than through `CommaRow.__getitem__()`.
+        """
+        if self._column is not None:
+            yield from self._column
+            return
+
+        field_index = self._field_index
+        for row in self._rows:
+            if type(row) is comma.classes.row.CommaRow and not row._slice_list:
+                yield row.data[field_index]
+            else:
+                yield row[field_index]
+
+    def to_numpy(self, dtype=None, copy: bool = True):
+        """
+        Returns the values of this column as a one-dimensional NumPy array
+        of type `dtype` (if unspecified, NumPy determines the type). When
+        the column is stored in a typed numeric buffer (see the
+        `infer_types` option of `comma.load()`) and `copy` is `False`, the
+        array shares its memory, and rows cannot be added to the table as
+        long as the array exists (see `comma.extras.to_numpy()`). This
+        requires the optional `numpy` package.
+        """
+        if self._column is not None:
+            return comma.extras.to_numpy(self._column, dtype=dtype, copy=copy)
+
+        return comma.extras.to_numpy(
+            self._iter_values(),
+            dtype=dtype,
+            count=len(self))
+
+    def __eq__(self, other):
+        # dictionary-encoded columns are compared by their codes
+        if isinstance(other, CommaFieldSlice):
+            encoded_column = self._encoded_column()
+            if encoded_column is not None and other._encoded_column() is not None:
+                return encoded_column == other._encoded_column()
+
+        # noinspection PyBroadException
+        try:
+            return list(self) == list(other)
+        except:
+            return False
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __mul__(self, n):
+        return list(self) * n
+
+    __rmul__ = __mul__
+
+    def __lt__(self, other):
+        return list(self) < list(other)
+
+    def __le__(self, other):
+        return list(self) <= list(other)
+
+    def __gt__(self, other):
+        return list(self) > list(other)
+
+    def __ge__(self, other):
+        return list(self) >= list(other)
+
+    def copy(self) -> typing.List:
+        """
+        Returns a list containing (a shallow copy of) the values of this
+        column, which is not tied to the table.
+        """
+        return list(self)
+
+    def __repr__(self):
+        return list(self).__repr__()
+
+    # The following methods would change the size or the order of the
+    # column alone, which would misalign it with the other fields of the
+    # rows: Since a column slice is a view, they are not supported (the
+    # rows of the table, or a copy of the column, can be changed instead).
+
+    def _unsupported(self, *args, **kwargs):
+        raise comma.exceptions.CommaTypeError(
+            "cannot change the size or order of a column slice, which is a "
+            "view of the rows of the table (change the table, or a copy of "
+            "the column)")
+
+    append = _unsupported
+    extend = _unsupported
+    insert = _unsupported
+    remove = _unsupported
+    pop = _unsupported
+    clear = _unsupported
+    sort = _unsupported
+    reverse = _unsupported
+    __iadd__ = _unsupported
+    __imul__ = _unsupported
+    __delitem__ = _unsupported
+
+    def _mark_modified(self):
+        """
+        Records a modification of the underlying column with the parent
+        `CommaFile` (see `comma.classes.file.CommaFile.mark_modified()`).
+        """
+        if isinstance(self._parent, comma.classes.file.CommaFile):
+            self._parent.mark_modified()
+
+    def _slice_source(self, key: slice):
+        """
+        Returns a view of the slice `key` of the underlying column or rows
+        (a copy if the global setting `SLICE_DEEP_COPY_DATA` is set).
+        """
+        source = self._column if self._column is not None else self._rows
+        ret_slice = comma.classes.columns.CommaSequenceView(source)[key]
+
+        if comma.settings.SLICE_DEEP_COPY_DATA:
+            ret_slice = copy.deepcopy(ret_slice)
+
+        return ret_slice
 
     def __getitem__(self, key):
         if type(key) is int:
-            ret_val = super().__getitem__(key)
-            return ret_val[self._field_index]
+            if self._column is not None:
+                return self._column[key]
+            return self._rows[key][self._field_index]
 
         elif type(key) is slice:
-            ret_slice = super().__getitem__(key)
-
-            if comma.settings.SLICE_DEEP_COPY_DATA:
-                ret_slice = copy.deepcopy(ret_slice)
+            if self._column is not None:
+                return CommaFieldSlice(
+                    parent=self._parent,
+                    field_name=self._field_name,
+                    column=self._slice_source(key))
 
             return CommaFieldSlice(
-                initlist=ret_slice,
                 parent=self._parent,
-                field_name=self._field_name)
+                field_name=self._field_name,
+                rows=self._slice_source(key))
 
         raise comma.exceptions.CommaTypeError(
             "list indices must be integers or slices, not {}".format(str(type(key)))
@@ -92,13 +305,17 @@ class CommaFieldSlice(list, collections.UserList):
 
     def __setitem__(self, key, value):
         if type(key) is int:
-            row = super().__getitem__(key)
+            if self._column is not None:
+                self._column[key] = value
+                self._mark_modified()
+                return
+            row = self._rows[key]
             row[self._field_index] = value
             return row
 
         elif type(key) is slice:
-            # slice of the underlying CommaRow objects
-            ret_slice = super().__getitem__(key)
+            source = self._column if self._column is not None else self._rows
+            ret_slice = comma.classes.columns.CommaSequenceView(source)[key]
 
             if len(ret_slice) != len(value):
                 raise comma.exceptions.CommaBatchException(
@@ -108,6 +325,11 @@ class CommaFieldSlice(list, collections.UserList):
                         len(value),
                     ))
 
+            if self._column is not None:
+                ret_slice[:] = value
+                self._mark_modified()
+                return ret_slice
+
             for i in range(len(ret_slice)):
                 ret_slice[i][self._field_index] = value[i]
 
@@ -5,9 +5,14 @@ import typing
 import warnings
 
 import comma.abstract
+import comma.classes.columns
+import comma.classes.file
+import comma.classes.lazy
 import comma.classes.slices
 import comma.config
+import comma.classes.row
 import comma.exceptions
+import comma.extras
 import comma.helpers
 import comma.methods
 
@@ -65,6 +70,13 @@ class CommaTable(collections.UserList, list, collections.UserDict, comma.abstrac
     # local cache for lookups { primary key value -> row number }
     _primary_key_dict = None
 
+    # name of the primary key for which the local cache was computed
+    _primary_key_dict_field = None
+
+    # number of modifications of the fields of the rows (as counted by the
+    # parent `CommaFile`) when the local cache was computed
+    _primary_key_dict_modifications = None
+
     def __init__(
         self,
         initlist=None,  #: typing.List[comma.classes.row.CommaRow] = None,
@@ -83,8 +95,26 @@ class CommaTable(collections.UserList, list, collections.UserDict, comma.abstrac
         and some other parameters.
         """
         self._parent = parent
+
+        # columnar and lazy storage are used as is (rather than being
+        # converted to a list of rows)
+        if isinstance(initlist, (comma.classes.columns.CommaColumnarRows,
+                                 comma.classes.lazy.CommaLazyRows)):
+            super().__init__(None, *args, **kwargs)
+            self.data = initlist
+            return
+
         super().__init__(initlist, *args, **kwargs)
 
+    @property
+    def is_columnar(self) -> bool:
+        """
+        Checks whether the rows of this `CommaTable` are stored by columns
+        (see `comma.classes.columns.CommaColumnarRows`), in which case the
+        rows are views, and accessing a column does not make any copy.
+        """
+        return isinstance(self.data, comma.classes.columns.CommaColumnarRows)
+
     def to_html(self):
         """
         Returns an HTML string representation of the table data.
@@ -105,6 +135,87 @@ class CommaTable(collections.UserList, list, collections.UserDict, comma.abstrac
 
         return table_html
 
+    def _column_values(self, column: typing.Union[str, int]):
+        """
+        Returns the values of a column, specified by name or by index, as
+        a sequence (for columnar storage, the column itself) or an iterator
+        reading the cells directly from the rows.
+        """
+        if type(column) is not int:
+            if self._local_header is None and isinstance(
+                    self._parent, comma.classes.file.CommaFile):
+                column = self._parent.column_index(column)
+            elif self.header is not None and column in self.header:
+                column = self.header.index(column)
+            else:
+                raise comma.exceptions.CommaKeyError(
+                    "{key} is not in header: {header}".format(
+                        key=column,
+                        header=self.header))
+
+        if self.is_columnar:
+            return self.data.column(column)
+
+        def _iter_values():
+            for row in self.data:
+                if type(row) is comma.classes.row.CommaRow and not row._slice_list:
+                    yield row.data[column]
+                else:
+                    yield row[column]
+
+        return _iter_values()
+
+    def to_numpy(self, columns=None, dtype=None, copy: bool = True):
+        """
+        Returns the data of this table as a NumPy array of type `dtype`
+        (if unspecified, NumPy determines the type). If `columns` is a
+        single column name (or index), the array is one-dimensional; if
+        `copy` is `False`, it shares its memory with the column when it is
+        stored in a typed numeric buffer (see the `infer_types` option of
+        `comma.load()`), and rows cannot be added to the table as long as
+        the array exists (see `comma.extras.to_numpy()`). Otherwise,
+        `columns` is a list of columns (by default, all of them) and the
+        array is two-dimensional, with one column per column.
+
+        This requires the optional `numpy` package.
+        """
+        comma.extras.require_numpy()
+
+        row_count = len(self)
+
+        # one-dimensional export
+        if type(columns) in (str, int):
+            return comma.extras.to_numpy(
+                self._column_values(columns),
+                dtype=dtype,
+                count=row_count,
+                copy=copy)
+
+        if columns is None:
+            if self.header is not None:
+                columns = self.header
+            else:
+                columns = range(max(map(len, self.data), default=0))
+        columns = list(columns)
+
+        ndarrays = [
+            comma.extras.to_numpy(
+                self._column_values(column),
+                dtype=dtype,
+                count=row_count)
+            for column in columns
+        ]
+
+        if len(ndarrays) > 0 and (
+                dtype is None or comma.extras.is_flexible_dtype(dtype)):
+            return comma.extras.numpy.column_stack(ndarrays)
+
+        ndarray = comma.extras.numpy.empty((row_count, len(columns)), dtype=dtype)
+        for index, column_ndarray in enumerate(ndarrays):
+            ndarray[:, index] = column_ndarray
+
+        return ndarray
+
     def _repr_html_(self):
         """
         Returns an HTML string representation of the table data, this is a magic
@@ -116,13 +227,59 @@ class CommaTable(collections.UserList, list, collections.UserDict, comma.abstrac
         self,
         filename: typing.Optional[str] = None,
         fp: typing.Optional[typing.IO] = None,
-    ) -> str:
+        no_echo: typing.Optional[bool] = None,
+    ) -> typing.Optional[str]:
         """
         Outputs a serialization of this `CommaTable` object to a string, either
         as a return value, or written to a local file path `filename`, or a
-        stream `fp`.
+        stream `fp` (in which case the string is not returned if `no_echo` is
+        `True`, see `comma.methods.dump()`).
+        """
+        if no_echo is None:
+            return comma.methods.dump(self, filename=filename, fp=fp)
+        return comma.methods.dump(
+            self, filename=filename, fp=fp, no_echo=no_echo)
+
+    @property
+    def dtypes(self) -> typing.Dict[typing.Union[str, int], type]:
+        """
+        Reports the type of the values stored in each column, as a
+        dictionary indexed by column name (or by column index, if there
+        is no header). Unless the table was loaded with type inference
+        (see `comma.load()`), all columns contain strings.
+        """
+        if self.is_columnar:
+            dtypes = self.data.dtypes
+        else:
+            column_count = max(map(len, self.data), default=0)
+            if self.header is not None:
+                column_count = max(column_count, len(self.header))
+            dtypes = [str] * column_count
+
+        keys = self.header if self.header is not None else range(len(dtypes))
+        return dict(zip(keys, dtypes))
+
+    def memory_usage(self) -> typing.Dict[typing.Union[str, int], int]:
         """
-        return comma.methods.dump(self, filename=filename, fp=fp)
+        Reports an estimate of the number of bytes used by each column, as
+        a dictionary indexed by column name (or by column index, if there
+        is no header), including the values stored (see
+        `comma.classes.columns.column_memory_usage()`). This shows, for
+        instance, the savings of type inference and dictionary encoding
+        (see `comma.load()`).
+        """
+        if self.is_columnar:
+            usages = self.data.memory_usage()
+        else:
+            column_count = max(map(len, self.data), default=0)
+            usages = [
+                comma.classes.columns.column_memory_usage(
+                    list(self._column_values(index)))
+                for index in range(column_count)
+            ]
+
+        keys = self.header if self.header is not None else range(len(usages))
+        return dict(zip(keys, usages))
 
     @property
     def has_header(self):
@@ -212,6 +369,19 @@ class CommaTable(collections.UserList, list, collections.UserDict, comma.abstrac
 
         self._local_header = None
 
+    def _has_column(self, key) -> bool:
+        """
+        Returns `True` if `key` is the name of one of the columns of the
+        `header`; this is a constant-time check when the header comes from
+        the parent `CommaFile`.
+        """
+        if self._local_header is None and isinstance(
+                self._parent, comma.classes.file.CommaFile):
+            return self._parent.has_column(key)
+
+        header = self.header
+        return header is not None and key in header
+
     @property
     def primary_key(self):
         """
@@ -225,6 +395,33 @@ class CommaTable(collections.UserList, list, collections.UserDict, comma.abstrac
 
         return self._local_primary_key
 
+    def _primary_key_value(self, row, warn: bool = True):
+        """
+        Returns the value of the primary key field in `row`, or `None`
+        if the row does not contain such a field.
+        """
+        pk = self.primary_key
+
+        if pk in row:  # pragma: no cover
+            return row[pk]
+
+        # so the "pk in row" does not work
+        # check if it quacks...
+        try:
+            return row[pk]
+        except IndexError:
+            pass
+        except KeyError:  # pragma: no cover
+            pass
+
+        if warn:
+            # raise comma.exceptions.CommaPrimaryKeyMissing(
+            #     "primary key `{pk}` not found in :\n{row}".format(
+            #         pk=pk, row=row))
+            warnings.warn(
+                "CommaTable._update_primary_key_dict():\n " +
+                "primary key `{pk}` not found in row".format(pk=pk))
+
     def _update_primary_key_dict(self):
         """
         Updates the internal mapping that associated an index value
@@ -235,36 +432,90 @@ class CommaTable(collections.UserList, list, collections.UserDict, comma.abstrac
         if self.primary_key is None:
             return
 
-        pk = self.primary_key
-
         primary_key_dict = dict()
-        for i, row in enumerate(self):
-
-            if pk in row:  # pragma: no cover
-                key_val_in_row = row[pk]
-
-            else:
-                # so the "pk in row" does not work
-                # check if it quacks...
-                try:
-                    key_val_in_row = row[pk]
-                except IndexError:
-                    key_val_in_row = None
-                except KeyError:  # pragma: no cover
-                    key_val_in_row = None
-
+        for i, row in enumerate(self.data):
+            key_val_in_row = self._primary_key_value(row)
             if key_val_in_row is None:
-                # raise comma.exceptions.CommaPrimaryKeyMissing(
-                #     "primary key `{pk}` not found in :\n{row}".format(
-                #         pk=pk, row=row))
-                warnings.warn(
-                    "CommaTable._update_primary_key_dict():\n " +
-                    "primary key `{pk}` not found in row".format(pk=pk))
                 continue
 
             primary_key_dict[key_val_in_row] = i
 
         self._primary_key_dict = primary_key_dict
+        self._primary_key_dict_field = self.primary_key
+        self._primary_key_dict_modifications = self._field_modifications()
+
+    def _invalidate_primary_key_dict(self):
+        """
+        Discards the internal primary key mapping, so that it is rebuilt
+        the next time it is needed; this is called when the rows are
+        structurally modified in a way that shifts their indexes.
+        """
+        self._primary_key_dict = None
+        self._primary_key_dict_field = None
+        self._primary_key_dict_modifications = None
+
+    def _field_modifications(self) -> typing.Optional[int]:
+        """
+        Returns the number of modifications of the fields of the rows, as
+        counted by the parent `CommaFile`, or `None` if there is no such
+        parent (in which case modifications cannot be tracked).
+        """
+        if isinstance(self._parent, comma.classes.file.CommaFile):
+            return self._parent.modifications
+        return None
+
+    def _primary_key_dict_is_dirty(self) -> bool:
+        """
+        Checks whether fields of the rows may have been modified directly
+        (rather than through the methods of this class) since the internal
+        primary key mapping was built.
+        """
+        modifications = self._field_modifications()
+        return (modifications is None or
+                modifications != self._primary_key_dict_modifications)
+
+    def _index_primary_key_rows(self, start: int):
+        """
+        Incrementally adds the rows starting at index `start` to the
+        internal primary key mapping, if that mapping has been built
+        (this is the case after an `append()` or an `extend()`).
+        """
+        if self._primary_key_dict is None:
+            return
+
+        for i in range(start, len(self.data)):
+            key_val_in_row = self._primary_key_value(self.data[i], warn=False)
+            if key_val_in_row is not None:
+                self._primary_key_dict[key_val_in_row] = i
+
+    def _lookup_primary_key(self, key) -> typing.Optional[int]:
+        """
+        Returns the index of the row of which the primary key value is
+        `key`, or `None` if there is no such row. The mapping is only built
+        once, and then maintained by the methods that modify the table; but
+        since rows can also be modified directly, the result of a lookup is
+        checked against the row, and the mapping is rebuilt (once) if it is
+        stale, or if the key is missing and fields of the rows have been
+        modified since it was built (see `_primary_key_dict_is_dirty()`).
+        """
+
+        if (self._primary_key_dict is None or
+                self._primary_key_dict_field != self.primary_key):
+            self._update_primary_key_dict()
+
+        id_of_key_row = self._primary_key_dict.get(key)
+        if id_of_key_row is not None and id_of_key_row < len(self.data):
+            row = self.data[id_of_key_row]
+            if self._primary_key_value(row, warn=False) == key:
+                return id_of_key_row
+
+        # cache miss: the key is missing, unless the rows were modified
+        elif id_of_key_row is None and not self._primary_key_dict_is_dirty():
+            return None
+
+        # stale entry or possibly stale mapping: rebuild and try again
+        self._update_primary_key_dict()
+        return self._primary_key_dict.get(key)
 
     @primary_key.setter
     def primary_key(self, value):
@@ -305,10 +556,9 @@ class CommaTable(collections.UserList, list, collections.UserDict, comma.abstrac
         table["column1"]  # => ["row1col1", "row2col1", "row3col1", "row4col3"]
 
         If `primary_key` is set, then it is also possible to access a record
-        by the value of its primary key. This operation is slightly costly
-        as, for accuracy reasons, a cache is recomputed at every access;
-        but it can sometimes be convenient. (This will be improved if there
-        is demand.)
+        by the value of its primary key. The underlying index is built on
+        the first such access, and then kept up to date, so that subsequent
+        lookups are constant time.
         """
         ##print("CommaTable.__getitem__", hex(id(self)), key, type(key))
 
@@ -337,7 +587,14 @@ class CommaTable(collections.UserList, list, collections.UserDict, comma.abstrac
             if comma.config.settings.SLICE_DEEP_COPY_DATA:
                 data_subset = copy.deepcopy(data_subset)
 
-            obj = self.clone(newdata=data_subset, _parent=parent_ref)
+            # the primary key index of the original table does not
+            # apply to the slice (the row indexes are different)
+            obj = self.clone(
+                newdata=data_subset,
+                _parent=parent_ref,
+                _primary_key_dict=None,
+                _primary_key_dict_field=None,
+                _primary_key_dict_modifications=None)
 
             return obj
 
@@ -345,21 +602,34 @@ class CommaTable(collections.UserList, list, collections.UserDict, comma.abstrac
         if type(key) is str:
 
             # field-slice, i.e. csv_table["street"]
-            if self.header is not None and key in self.header:
-
-                data_subset = self.data[:]
+            if self._has_column(key):
+
+                # columnar storage: the column itself is sliced
+                if self.is_columnar and isinstance(
+                        self._parent, comma.classes.file.CommaFile):
+                    column = self.data.column(self._parent.column_index(key))
+                    if comma.config.settings.SLICE_DEEP_COPY_DATA:
+                        column = copy.deepcopy(column)
+
+                    return comma.classes.slices.CommaFieldSlice(
+                        parent=parent_ref,
+                        field_name=key,
+                        column=column)
+
+                # the column slice is a view of the rows (a copy is
+                # only made if the global settings require it)
+                data_subset = self.data
                 if comma.config.settings.SLICE_DEEP_COPY_DATA:
-                    data_subset = copy.deepcopy(data_subset)
+                    data_subset = copy.deepcopy(data_subset[:])
 
                 return comma.classes.slices.CommaFieldSlice(
-                    initlist=data_subset,
+                    rows=data_subset,
                     parent=parent_ref,
                     field_name=key)
 
             # primary key query, i.e., csv_table["someperson@marcopolo.me"]
             elif self.primary_key is not None:
-                self._update_primary_key_dict()
-                id_of_key_row = self._primary_key_dict.get(key)
+                id_of_key_row = self._lookup_primary_key(key)
                 if id_of_key_row is not None:
                     # recursive call, but change of type
                     return self.__getitem__(id_of_key_row)
@@ -375,18 +645,32 @@ class CommaTable(collections.UserList, list, collections.UserDict, comma.abstrac
         if type(key) is int:
 
             value._parent = self._parent
+
+            # keep the primary key index up to date
+            if self._primary_key_dict is not None:
+                old_key_val = self._primary_key_value(self.data[key], warn=False)
+                ret = super().__setitem__(key, value)
+                index = key if key >= 0 else key + len(self.data)
+                if self._primary_key_dict.get(old_key_val) == index:
+                    del self._primary_key_dict[old_key_val]
+                new_key_val = self._primary_key_value(value, warn=False)
+                if new_key_val is not None:
+                    self._primary_key_dict[new_key_val] = index
+                return ret
+
             return super().__setitem__(key, value)
 
         if type(key) is slice:
             for row in value:
                 row._parent = self._parent
+            self._invalidate_primary_key_dict()
             return super().__setitem__(key, value)
 
         # field-slice, i.e. csv_table["street"]
         if type(key) is str:
 
             # is this field slicing
-            if key in self.header:
+            if self._has_column(key):
                 # check size:
                 if len(value) != len(self):
                     raise comma.exceptions.CommaBatchException(
@@ -400,12 +684,65 @@ class CommaTable(collections.UserList, list, collections.UserDict, comma.abstrac
 
             # is this primary key indexing
             elif self.primary_key is not None:
-                self._update_primary_key_dict()
-                id_of_key_row = self._primary_key_dict.get(key)
+                id_of_key_row = self._lookup_primary_key(key)
                 if id_of_key_row is not None:
                     # recursive call, but change of type
                     return self.__setitem__(id_of_key_row, value)
                 raise comma.exceptions.CommaKeyError(
                     "no record with that primary key: '{}'".format(key))
 
-        raise comma.exceptions.CommaKeyError("invalid key")
\ No newline at end of file
+        raise comma.exceptions.CommaKeyError("invalid key")
+
+    # =================================================================
+
+    # The following methods modify the list of rows, and so must keep the
+    # primary key index (see `_lookup_primary_key()`) consistent.
+
+    def append(self, item):
+        super().append(item)
+        self._index_primary_key_rows(start=len(self.data) - 1)
+
+    def extend(self, other):
+        start = len(self.data)
+        super().extend(other)
+        self._index_primary_key_rows(start=start)
+
+    def __iadd__(self, other):
+        start = len(self.data)
+        ret = super().__iadd__(other)
+        self._index_primary_key_rows(start=start)
+        return ret
+
+    def insert(self, i, item):
+        super().insert(i, item)
+        self._invalidate_primary_key_dict()
+
+    def pop(self, i=-1):
+        ret = super().pop(i)
+        self._invalidate_primary_key_dict()
+        return ret
+
+    def remove(self, item):
+        super().remove(item)
+        self._invalidate_primary_key_dict()
+
+    def clear(self):
+        super().clear()
+        self._invalidate_primary_key_dict()
+
+    def reverse(self):
+        super().reverse()
+        self._invalidate_primary_key_dict()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._invalidate_primary_key_dict()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._invalidate_primary_key_dict()
+
+    def __imul__(self, n):
+        ret = super().__imul__(n)
+        self._invalidate_primary_key_dict()
+        return ret
@@ -25,6 +25,18 @@ class ConfigMetaclass(type):
         # initialize metadata
         setattr(self, "_metadata", dict())
 
+        # initialize the cache of resolved values
+        setattr(self, "_cache", dict())
+
+    @staticmethod
+    def __bound_reload(self):
+        """
+        Discards the resolved values of the settings, so that they are read
+        again from the environment (settings that were explicitly assigned
+        keep their value).
+        """
+        self._cache.clear()
+
     @staticmethod
     def __bound_get(
             self,
@@ -36,12 +48,22 @@ class ConfigMetaclass(type):
             field_doc: str,
             field_default: typing.Any,
     ):
-        return ConfigHelper.parse(
+        # settings are read on every slice operation, so the value is only
+        # resolved (from the environment) once, see `reload()`
+        try:
+            return self._cache[field_name]
+        except KeyError:
+            pass
+
+        value = ConfigHelper.parse(
             value=self._metadata.get(
                 field_name,
                 os.environ.get(field_env_name, field_default)),
             typ=field_type)
 
+        self._cache[field_name] = value
+        return value
+
     @staticmethod
     def __bound_set(
             self,
@@ -55,6 +77,7 @@ class ConfigMetaclass(type):
             field_default: typing.Any,
     ):
         self._metadata[field_name] = value
+        self._cache.pop(field_name, None)
 
     # ===================================================================
 
@@ -95,6 +118,9 @@ class ConfigMetaclass(type):
                     field_default=field_default,
                     field_doc=field_doc))
 
+        # method to re-read the settings from the environment
+        setattr(cls, "reload", ConfigMetaclass.__bound_reload)
+
 
 class ConfigHelper:
 
@@ -210,5 +236,18 @@ class ConfigClass(metaclass=ConfigMetaclass):
         the original dataset or not.
         """
 
+    URL_HEAD_REQUEST = True, """
+        Determines whether a URL is first checked with a HEAD request before
+        its data is downloaded. Disabling this saves a round trip when
+        loading many small files from a server; a URL that cannot be loaded
+        is then detected by the GET request itself.
+        """
+
+    LAZY_CACHE_SIZE = 10000, """
+        Determines the largest number of rows of a table loaded with the
+        `"lazy"` storage that are kept parsed in memory (the least recently
+        accessed rows are discarded first, unless they have been modified).
+        """
+
 
 settings = ConfigClass()
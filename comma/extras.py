@@ -1,6 +1,9 @@
 
+import array
 import codecs
 import csv
+import itertools
+import re
 import typing
 
 import comma.helpers
@@ -12,11 +15,20 @@ __all__ = [
     "detect_csv_type",
     "is_binary_string",
     "detect_encoding",
+    "detect_stream_encoding",
+    "is_flexible_dtype",
+    "to_numpy",
 ]
 
 
 DEFAULT_DELIMITER = u","
 
+# size of the chunks that the encoding detection looks at, one at a time
+ENCODING_DETECTION_CHUNKSIZE = 1 << 12
+
+# largest number of bytes of a stream looked at to detect its encoding
+ENCODING_DETECTION_MAX_SIZE = 1 << 20
+
 
 # Better CSV dialect detection, thanks to clevercsv
 
@@ -225,46 +237,304 @@ def _detect_encoding_by_bom(
     return default
 
 
-detect_encoding = _detect_encoding_by_bom
+# Fast validation of the most common encodings: ASCII and UTF-8 (a chunk
+# containing non-ASCII characters that is valid UTF-8 is very unlikely to
+# be in any other encoding)
+
+# bytes which, although they are ASCII, hint at another encoding: nulls (of
+# UTF-16 and UTF-32) and escape sequences (of ISO-2022 and HZ)
+_ASCII_AMBIGUOUS_BYTES = re.compile(b"[\\x00\\x1b]|~{")
+
+
+def _iter_chunks(
+    sample: bytes,
+    chunksize: int = ENCODING_DETECTION_CHUNKSIZE,
+) -> typing.Iterator[bytes]:
+    """
+    Splits a `sample` into chunks of (at most) `chunksize` bytes.
+    """
+    for start in range(0, len(sample), chunksize):
+        yield sample[start:start + chunksize]
+
+
+def _detect_encoding_by_validation(
+    chunks: typing.Iterator[bytes],
+) -> typing.Tuple[typing.Optional[str], typing.Optional[bytes]]:
+    """
+    Validates the `chunks` as UTF-8, one at a time, and stops at the first
+    chunk that is conclusive: Returns `("utf-8", None)` as soon as a chunk
+    contains valid non-ASCII UTF-8 characters, and `("ascii", None)` if all
+    chunks are plain ASCII. Otherwise, returns `(None, chunk)`, where `chunk`
+    is the first chunk which is not UTF-8 (the following chunks are left in
+    the iterator).
+    """
+
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    encoding = None
+
+    for chunk in chunks:
+
+        if _ASCII_AMBIGUOUS_BYTES.search(chunk) is not None:
+            return None, chunk
+
+        try:
+            text = decoder.decode(chunk)
+        except UnicodeDecodeError:
+            return None, chunk
+
+        # (a plain ASCII chunk decodes to as many characters as bytes)
+        if len(text) != len(chunk):
+            return "utf-8", None
+
+        encoding = "ascii"
+
+    return encoding, None
+
+
+def _detect_encoding_by_chardet(
+    chunks: typing.Iterator[bytes],
+) -> typing.Optional[str]:
+    """
+    Detects the encoding of the `chunks` with a statistical heuristic,
+    if `chardet` is available (otherwise returns `None`).
+    """
+    return None
+
 
 # If chardet is available, use it as a second round of guessing
-# if the previous method was unsuccessful
+# if the previous methods were unsuccessful
 
 try:
     import chardet
 
-    def detect_encoding(
-        sample: typing.AnyStr,
-        default: typing.Optional[str] = "utf-8"
+    def _detect_encoding_by_chardet(
+        chunks: typing.Iterator[bytes],
     ) -> typing.Optional[str]:
         """
-        Detects the encoding of a `sample` string, using the following
-        heuristics in this sequential order:
+        Detects the encoding of the `chunks` with `chardet`, which is fed
+        one chunk at a time, until it is confident about its result.
+        """
 
-        1. Check to see if we can find a BOM (Byte Order Mark) that may
-        suggest one variant of Unicode as an encoding. The BOMs are
-        defined in the `codecs` standard module.
+        detector = chardet.UniversalDetector()
 
-        2. If unsuccessful, and if `chardet` is available, use `chardet`
-        to statistically determine the most likely encoding based on the
-        composition of the `sample` (the longer the sample, the more
-        reliable this method).
+        for chunk in chunks:
+            detector.feed(chunk)
+            if detector.done:
+                break
 
-        3. If unsuccessful, return the value of the `default` parameter;
-        this will be `"utf-8"` if unchanged.
-        """
+        result = detector.close()
+        if result is not None:
+            return result.get("encoding")
+
+except ImportError:  # pragma: no cover
+    chardet = None
+
+
+def _detect_encoding_of_chunks(
+    chunks: typing.Iterable[bytes],
+    default: typing.Optional[str] = None,
+) -> typing.Optional[str]:
+    """
+    Detects the encoding of data provided as a sequence of `chunks` (see
+    `detect_encoding()`), looking at as few chunks as possible.
+    """
+
+    chunks = iter(chunks)
+    first_chunk = next(chunks, None)
 
-        # First try a fool-proof deterministic method
-        encoding = _detect_encoding_by_bom(sample)
+    if not first_chunk:
+        return default
+
+    # First try a fool-proof deterministic method
+    encoding = _detect_encoding_by_bom(first_chunk)
+    if encoding is not None:
+        return encoding
+
+    # Then check the most common encodings
+    encoding, chunk = _detect_encoding_by_validation(
+        itertools.chain([first_chunk], chunks))
+    if encoding is not None:
+        return encoding
+
+    # If that doesn't work, try a heuristic (on the remaining chunks)
+    if chunk is not None:
+        encoding = _detect_encoding_by_chardet(
+            itertools.chain([chunk], chunks))
         if encoding is not None:
             return encoding
 
-        # If that doesn't work, try a heuristic
-        result = chardet.detect(sample)
-        if result is not None and result.get("encoding") is not None:
-            return result.get("encoding")
+    return default
 
-        return default
+
+def detect_encoding(
+    sample: typing.AnyStr,
+    default: typing.Optional[str] = "utf-8"
+) -> typing.Optional[str]:
+    """
+    Detects the encoding of a `sample` string, using the following
+    heuristics in this sequential order:
+
+    1. Check to see if we can find a BOM (Byte Order Mark) that may
+    suggest one variant of Unicode as an encoding. The BOMs are
+    defined in the `codecs` standard module.
+
+    2. If unsuccessful, check whether the `sample` is valid ASCII or
+    UTF-8, which is the case of most files (and much faster than the
+    statistical heuristic).
+
+    3. If unsuccessful, and if `chardet` is available, use `chardet`
+    to statistically determine the most likely encoding based on the
+    composition of the `sample` (the longer the sample, the more
+    reliable this method).
+
+    4. If unsuccessful, return the value of the `default` parameter;
+    this will be `"utf-8"` if unchanged.
+
+    The `sample` is looked at by chunks of `ENCODING_DETECTION_CHUNKSIZE`
+    bytes, and the detection stops as soon as a chunk is conclusive.
+    """
+    return _detect_encoding_of_chunks(
+        chunks=_iter_chunks(sample),
+        default=default)
+
+
+def detect_stream_encoding(
+    source: typing.BinaryIO,
+    default: typing.Optional[str] = "utf-8",
+    max_size: typing.Optional[int] = ENCODING_DETECTION_MAX_SIZE,
+) -> typing.Optional[str]:
+    """
+    Detects the encoding of a seekable binary stream `source`, as
+    `detect_encoding()` does, but reads more of the stream (by chunks of
+    `ENCODING_DETECTION_CHUNKSIZE` bytes, up to `max_size` bytes) as long
+    as the chunks read are inconclusive: For instance, a file that starts
+    with plain ASCII and only contains accented characters further along
+    is still properly detected. The position of the stream is restored.
+    """
+    encoding, _ = _detect_stream_encoding(
+        source=source,
+        default=default,
+        max_size=max_size)
+    return encoding
+
+
+def _detect_stream_encoding(
+    source: typing.BinaryIO,
+    default: typing.Optional[str] = "utf-8",
+    max_size: typing.Optional[int] = ENCODING_DETECTION_MAX_SIZE,
+) -> typing.Tuple[typing.Optional[str], int]:
+    """
+    Detects the encoding of a seekable binary stream `source` (see
+    `detect_stream_encoding()`), and returns it along with the number of
+    bytes that were read to detect it.
+    """
+
+    position = source.tell()
+    size_read = 0
+
+    def _read_chunks():
+        nonlocal size_read
+        remaining = max_size
+        while remaining is None or remaining > 0:
+            size = ENCODING_DETECTION_CHUNKSIZE
+            if remaining is not None:
+                size = min(size, remaining)
+                remaining -= size
+            chunk = source.read(size)
+            if not chunk:
+                break
+            size_read += len(chunk)
+            yield bytes(chunk)
+
+    try:
+        encoding = _detect_encoding_of_chunks(
+            chunks=_read_chunks(),
+            default=default)
+        return encoding, size_read
+    finally:
+        source.seek(position)
+
+
+# Export to NumPy arrays, if NumPy is available
+
+# The NumPy types corresponding to the `array.array` typecodes used by
+# the typed columns (see `comma.inference.ARRAY_TYPECODES`)
+NUMPY_DTYPES_BY_TYPECODE = {
+    "q": "int64",
+    "d": "float64",
+}
+
+try:
+    import numpy
 
 except ImportError:  # pragma: no cover
-    chardet = None
+    numpy = None
+
+
+def require_numpy():
+    """
+    Raises an `ImportError` if the optional `numpy` package is unavailable.
+    """
+    if numpy is None:
+        raise ImportError(
+            "the `numpy` package is required to export to NumPy arrays")
+
+
+def is_flexible_dtype(dtype: typing.Any) -> bool:
+    """
+    Checks whether the NumPy `dtype` is flexible, that is, a string or raw
+    data type of which the size is not specified (such as `str` or `"U"`):
+    Arrays of such a type cannot be allocated before their values are known.
+    """
+    require_numpy()
+    dtype = numpy.dtype(dtype)
+    return dtype.kind in "SUV" and dtype.itemsize == 0
+
+
+def to_numpy(
+    values: typing.Iterable[typing.Any],
+    dtype: typing.Optional[typing.Any] = None,
+    count: typing.Optional[int] = None,
+    copy: bool = True,
+):
+    """
+    Returns a one-dimensional NumPy array containing the `values`,
+    converted to `dtype` (which NumPy determines if not specified).
+
+    When `values` is (or wraps, in a `buffer` attribute) a numeric
+    `array.array`, its memory is copied in one block; if `copy` is `False`,
+    the NumPy array shares that memory instead, unless a conversion to a
+    different `dtype` is required. (As long as such an array exists, the
+    `array.array` cannot be resized: Appending to it raises a `BufferError`.)
+    Otherwise, the array is preallocated (using `count` if provided, or the
+    length of `values`) and filled in a single pass, with NumPy doing the
+    parsing.
+    """
+    require_numpy()
+
+    # export of typed columns, without any copy if allowed
+    buffer = getattr(values, "buffer", values)
+    if (isinstance(buffer, array.array) and
+            buffer.typecode in NUMPY_DTYPES_BY_TYPECODE):
+        ndarray = numpy.frombuffer(
+            buffer,
+            dtype=NUMPY_DTYPES_BY_TYPECODE[buffer.typecode])
+        if dtype is None or numpy.dtype(dtype) == ndarray.dtype:
+            return ndarray.copy() if copy else ndarray
+        return ndarray.astype(dtype)
+
+    # without a dtype, or with a flexible one (such as strings, of which
+    # the size is not known in advance), let NumPy determine the best type
+    if dtype is None or is_flexible_dtype(dtype):
+        return numpy.array(list(values), dtype=dtype)
+
+    if count is None:
+        count = len(values)
+
+    dtype = numpy.dtype(dtype)
+    if dtype.hasobject:
+        ndarray = numpy.empty(count, dtype=dtype)
+        ndarray[:] = list(values)
+        return ndarray
+
+    return numpy.fromiter(values, dtype=dtype, count=count)
@@ -1,10 +1,17 @@
 
+import array
+import bz2
+import codecs
 import collections
 import contextlib
 import csv
 import io
+import gzip
 import itertools
+import lzma
+import mmap
 import os
+import re
 import typing
 import urllib
 import urllib.parse
@@ -15,6 +22,13 @@ try:
 except ImportError:  # pragma: no cover
     requests = None
 
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+import comma.cache
+import comma.config
 import comma.exceptions
 import comma.extras
 import comma.typing
@@ -24,18 +38,36 @@ __author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
 
 __all__ = [
     "MAX_SAMPLE_CHUNKSIZE",
+    "DECODE_CHUNKSIZE",
+    "DECODING_ERRORS",
     "URI_SCHEME_LOCAL",
     "URI_SCHEMES_ACCEPTED",
     "LINE_TERMINATORS",
     "LINE_TERMINATOR_DEFAULT",
+    "COMPRESSION_MAGIC_BYTES",
+    "HTTP_TIMEOUT",
+    "HTTP_POOL_SIZE",
+    "HTTP_CHUNKSIZE",
 
     "DefaultDialect",
+    "MappedFile",
 
     "is_anystr",
     "is_local",
+    "get_session",
+    "set_session",
     "is_url",
     "detect_line_terminator",
+    "record_pattern",
+    "index_records",
+    "parse_record",
+    "map_file",
+    "detect_compression",
+    "open_compressed",
+    "open_response_stream",
+    "decode_stream",
     "open_stream",
+    "detect_csv_params",
     "open_csv",
 
     "validate_header",
@@ -53,6 +85,10 @@ __all__ = [
 
 MAX_SAMPLE_CHUNKSIZE = 10000
 
+DECODE_CHUNKSIZE = 1 << 20
+
+DECODING_ERRORS = "comma.strict"
+
 URI_SCHEME_LOCAL = "file"
 
 URI_SCHEMES_ACCEPTED = ["http", "https"]
@@ -61,6 +97,19 @@ LINE_TERMINATORS = ["\r\n", "\r", "\n"]
 
 LINE_TERMINATOR_DEFAULT = "\n"
 
+COMPRESSION_MAGIC_BYTES = [
+    ("gzip", b"\x1f\x8b"),
+    ("bz2", b"BZh"),
+    ("xz", b"\xfd7zXZ\x00"),
+    ("zstd", b"\x28\xb5\x2f\xfd"),
+]
+
+HTTP_TIMEOUT = 10
+
+HTTP_POOL_SIZE = 16
+
+HTTP_CHUNKSIZE = 1 << 16
+
 
 class DefaultDialect(csv.Dialect):
     """
@@ -98,6 +147,86 @@ class DefaultDialect(csv.Dialect):
         self.strict = True
 
 
+class MappedFile(io.RawIOBase):
+    """
+    A read-only binary stream over a local file that is memory-mapped: The
+    data is read from the pages of the OS cache (which are shared between
+    the processes that map the same file) rather than copied into a private
+    buffer, and `getbuffer()` provides zero-copy access to the contents.
+    Each read only copies the requested bytes out of the map, so that the
+    file can be decoded incrementally (see `decode_stream()`). Closing the
+    stream closes the underlying `file`.
+    """
+
+    def __init__(self, file: typing.BinaryIO):
+        """
+        Maps the contents of the binary `file`, which must be a local file
+        opened for reading. Raises a `ValueError` if the file is empty, and
+        an `OSError` (or `io.UnsupportedOperation`) if it cannot be mapped.
+        """
+        super().__init__()
+        self._file = file
+        self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        self._position = 0
+
+    @property
+    def name(self):
+        return getattr(self._file, "name", None)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def getbuffer(self) -> memoryview:
+        """
+        Returns a read-only view of the whole contents of the file.
+        """
+        return self._view[:]
+
+    def read(self, size: typing.Optional[int] = -1) -> bytes:
+        # (slicing the map makes a single copy of the bytes)
+        start = self._position
+        end = len(self._map)
+        if size is not None and size >= 0:
+            end = min(end, start + size)
+        self._position = max(start, end)
+        return self._map[start:end]
+
+    def readinto(self, b) -> int:
+        size = min(len(b), len(self._view) - self._position)
+        if size <= 0:
+            return 0
+        b[:size] = self._view[self._position:self._position + size]
+        self._position += size
+        return size
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._position = max(0, offset)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self):
+        if not self.closed:
+            self._view.release()
+            try:
+                self._map.close()
+            except BufferError:
+                # views of the contents are still in use: the map will be
+                # closed when they are released
+                pass
+            self._file.close()
+        super().close()
+
+
 def is_anystr(obj: typing.Union[typing.Any, typing.AnyStr]) -> bool:
     """
     Returns `True` if the `obj` object is of type `typing.AnyStr`.
@@ -165,6 +294,46 @@ def is_local(location: typing.AnyStr) -> typing.Optional[str]:
     return
 
 
+# the HTTP session shared by all requests (see `get_session()`)
+_session = None
+
+
+def get_session() -> "requests.Session":
+    """
+    Returns the HTTP session used to make all requests: Unless another
+    session was provided with `set_session()`, this is a `requests.Session`
+    created on first use, which keeps connections alive and pools them
+    (up to `HTTP_POOL_SIZE` per host), so that loading many files from
+    the same server does not open a new connection each time.
+    """
+    global _session
+
+    if _session is None:
+        if requests is None:
+            raise comma.exceptions.CommaException(
+                "loading URLs requires the optional `requests` package")
+
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=HTTP_POOL_SIZE,
+            pool_maxsize=HTTP_POOL_SIZE)
+
+        _session = requests.Session()
+        _session.mount("http://", adapter)
+        _session.mount("https://", adapter)
+
+    return _session
+
+
+def set_session(session: typing.Optional["requests.Session"]):
+    """
+    Sets the HTTP `session` used to make all requests (for instance, a
+    `requests.Session` with authentication or custom headers); if `session`
+    is `None`, a default session is created on the next request.
+    """
+    global _session
+    _session = session
+
+
 def is_url(location: str, no_request: bool = False) -> bool:
     """
     Detects whether a string location is a URL; may make a test HEAD request
@@ -213,7 +382,8 @@ def is_url(location: str, no_request: bool = False) -> bool:
     
     # Try to make a HEAD request on the location to see if it is successful
     try:
-        response = requests.head(location, allow_redirects=True, timeout=10)
+        response = get_session().head(
+            location, allow_redirects=True, timeout=HTTP_TIMEOUT)
     
     except requests.exceptions.InvalidSchema:
         # Not a supported scheme
@@ -279,16 +449,490 @@ def detect_line_terminator(
     return best_option[2]
 
 
+def record_pattern(
+    dialect: csv.Dialect,
+    encoding: typing.Optional[str] = None,
+) -> typing.Pattern:
+    """
+    Returns a regular expression matching a whole record of a CSV file in
+    the given `dialect`, up to and including its line terminator: Line
+    terminators within quoted fields (or escaped) do not end a record.
+
+    If an `encoding` is provided, the expression applies to the bytes of
+    the file rather than to its text; this requires an encoding in which
+    the bytes of ASCII characters never appear within other characters
+    (see `comma.parallel.is_splittable_encoding()`), and a dialect that
+    only uses ASCII characters.
+    """
+    quotechar = dialect.quotechar
+    if dialect.quoting == csv.QUOTE_NONE:
+        quotechar = None
+    escapechar = dialect.escapechar
+
+    specials = "".join(filter(None, [quotechar, escapechar]))
+
+    # with `skipinitialspace`, a quoted field can start after spaces, which
+    # are thus matched separately from the other characters
+    spaces = ""
+    if quotechar is not None and dialect.skipinitialspace:
+        spaces = " "
+
+    # runs of characters that cannot start a quoted field, or escape
+    patterns = ["[^{}{}\r\n]+".format(re.escape(specials), spaces)]
+
+    if quotechar is not None:
+        quote = re.escape(quotechar)
+        plain = "[^{}]*".format(re.escape(specials))
+
+        # the sequences that do not end a quoted field
+        inner = []
+        if dialect.doublequote:
+            inner.append(quote + quote)
+        if escapechar is not None:
+            inner.append(re.escape(escapechar) + ".")
+
+        body = plain
+        if inner:
+            body += "(?:(?:{}){})*".format("|".join(inner), plain)
+
+        # (a quote only starts a quoted field at the start of a field,
+        # possibly after spaces that are skipped, elsewhere it is an
+        # ordinary character; as with `csv.reader()`, a quoted field that
+        # is not closed extends to the end)
+        patterns.append(
+            r"(?<![^\r\n{delimiter}]){spaces}{quote}{body}(?:{quote}|\Z)".format(
+                delimiter=re.escape(dialect.delimiter),
+                spaces=" *" if spaces else "",
+                quote=quote,
+                body=body))
+        patterns.append(quote)
+        if spaces:
+            patterns.append(" +")
+
+    if escapechar is not None:
+        patterns.append(re.escape(escapechar) + ".?")
+
+    pattern = r"(?:{})*(?:\r\n?|\n|\Z)".format("|".join(patterns))
+
+    if encoding is not None:
+        return re.compile(pattern.encode(encoding), flags=re.DOTALL)
+
+    return re.compile(pattern, flags=re.DOTALL)
+
+
+def index_records(text: str, dialect: csv.Dialect) -> array.array:
+    """
+    Returns the offsets of the records of the CSV `text`, in the given
+    `dialect`, as an array that starts with `0` and ends with the length
+    of the text: Record `i` is `text[offsets[i]:offsets[i + 1]]`. The text
+    is scanned once, and line terminators within quoted fields do not end
+    a record.
+    """
+    pattern = record_pattern(dialect)
+
+    offsets = array.array("q", [0])
+    offsets.extend(map(lambda match: match.end(), pattern.finditer(text)))
+
+    # (the pattern also matches the empty string at the end of the text)
+    while len(offsets) > 1 and offsets[-1] == offsets[-2]:
+        offsets.pop()
+    if offsets[-1] != len(text):
+        offsets.append(len(text))
+
+    return offsets
+
+
+def parse_record(record: str, dialect: csv.Dialect) -> typing.List[str]:
+    """
+    Parses a single `record` (as delimited by `index_records()`) of a CSV
+    file in the given `dialect`, and returns its fields.
+    """
+    return next(csv.reader([record], dialect=dialect), [])
+
+
+def map_file(file: typing.BinaryIO) -> typing.BinaryIO:
+    """
+    Returns a memory-mapped stream over the binary `file` (see `MappedFile`),
+    if the file can be mapped (it must be a non-empty local file), or the
+    `file` itself otherwise.
+    """
+    try:
+        return MappedFile(file)
+    except (io.UnsupportedOperation, AttributeError, ValueError, OSError):
+        return file
+
+
+class _ZstdFile(io.RawIOBase):
+    """
+    A read-only binary stream that decompresses the Zstandard data of the
+    binary stream `fileobj` as it is read. Seeking backwards restarts the
+    decompression from the beginning (as `gzip.GzipFile` does).
+    """
+
+    def __init__(self, fileobj: typing.BinaryIO):
+        super().__init__()
+        self._fileobj = fileobj
+        self._start = fileobj.tell()
+        self._reader = None
+        self._rewind()
+
+    def _rewind(self):
+        if self._reader is not None:
+            self._reader.close()
+        self._fileobj.seek(self._start)
+        self._reader = zstandard.ZstdDecompressor().stream_reader(
+            self._fileobj,
+            read_across_frames=True,
+            closefd=False)
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        data = self._reader.read(len(b))
+        size = len(data)
+        b[:size] = data
+        self._position += size
+        return size
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            # the size is only known once everything is decompressed
+            while self.read(DECODE_CHUNKSIZE):
+                pass
+            offset += self._position
+
+        if offset < self._position:
+            self._rewind()
+
+        while self._position < offset:
+            if not self.read(min(DECODE_CHUNKSIZE, offset - self._position)):
+                break
+
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self):
+        if not self.closed:
+            self._reader.close()
+        super().close()
+
+
+def detect_compression(sample: bytes) -> typing.Optional[str]:
+    """
+    Detects, from the magic bytes at the start of the `sample`, whether
+    binary data is compressed, and returns the name of the compression
+    format (see `COMPRESSION_MAGIC_BYTES`), or `None` otherwise.
+    """
+    if type(sample) is not bytes:
+        return
+
+    for name, magic_bytes in COMPRESSION_MAGIC_BYTES:
+        if not sample.startswith(magic_bytes):
+            continue
+
+        # since "BZh" could well be text, also check the block size (a
+        # digit) and the magic number of the first block (or end of stream)
+        if name == "bz2":
+            if sample[3:4] not in b"123456789" or len(sample) < 4:
+                continue
+            if sample[4:10] not in (b"\x31\x41\x59\x26\x53\x59",
+                                    b"\x17\x72\x45\x38\x50\x90"):
+                continue
+
+        return name
+
+
+def open_compressed(source: typing.BinaryIO) -> typing.Optional[typing.BinaryIO]:
+    """
+    Returns a seekable binary stream decompressing the data of the seekable
+    stream `source` as it is read, if it is compressed with gzip,
+    bz2, xz or (if the optional `zstandard` package is available) zstd, or
+    `None` otherwise. The data is never decompressed all at once, and
+    `open_stream()` decodes it as it is read, so the memory used is bounded
+    by the size of the buffers. (Text streams are never considered
+    compressed.)
+    """
+    source.seek(0)
+    sample = source.read(16)
+    source.seek(0)
+
+    compression = detect_compression(sample)
+
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=source, mode="rb")
+
+    if compression == "bz2":
+        return bz2.BZ2File(source, mode="rb")
+
+    if compression == "xz":
+        return lzma.LZMAFile(source, mode="rb")
+
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError(
+                "provided source is compressed with Zstandard, which "
+                "requires the optional `zstandard` package")
+        return io.BufferedReader(_ZstdFile(source))
+
+
+class _ChunksRawStream(io.RawIOBase):
+    """
+    A read-only, non-seekable binary stream over an iterator of `chunks` of
+    bytes (such as `requests.Response.iter_content()`), which are consumed
+    as the stream is read. Closing the stream calls `on_close`, if provided.
+    """
+
+    def __init__(
+        self,
+        chunks: typing.Iterable[bytes],
+        on_close: typing.Optional[typing.Callable[[], typing.Any]] = None,
+    ):
+        super().__init__()
+        self._chunks = iter(chunks)
+        self._pending = b""
+        self._on_close = on_close
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while len(self._pending) == 0:
+            self._pending = next(self._chunks, None)
+            if self._pending is None:
+                self._pending = b""
+                return 0
+
+        size = min(len(b), len(self._pending))
+        b[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    def close(self):
+        if not self.closed and self._on_close is not None:
+            self._on_close()
+        super().close()
+
+
+def open_response_stream(
+    response: "requests.Response",
+    encoding: typing.Optional[str] = None,
+) -> typing.IO:
+    """
+    Returns a (non-seekable) text stream that decodes the body of the
+    `response` (made with `stream=True`) as it is downloaded, with the
+    `encoding` if provided, or the encoding of the response, or otherwise
+    an encoding detected on the start of the body. If the body is
+    compressed (as a file, not by the transport), it needs to be entirely
+    downloaded before it can be read: A binary stream containing the whole
+    body is then returned instead.
+    """
+
+    buffered = io.BufferedReader(
+        _ChunksRawStream(
+            chunks=response.iter_content(chunk_size=HTTP_CHUNKSIZE),
+            on_close=response.close),
+        buffer_size=max(HTTP_CHUNKSIZE, MAX_SAMPLE_CHUNKSIZE))
+
+    # look at the start of the body (without consuming it)
+    sample = buffered.peek(MAX_SAMPLE_CHUNKSIZE)[:MAX_SAMPLE_CHUNKSIZE]
+
+    is_zip = sample.startswith((b"PK\x03\x04", b"PK\x05\x06"))
+    if is_zip or detect_compression(sample) is not None:
+        with buffered:
+            return io.BytesIO(buffered.read())
+
+    if encoding is None:
+        encoding = response.encoding
+
+    if encoding is None:
+        encoding = comma.cache.detect_encoding(sample)
+
+    return io.TextIOWrapper(buffered, encoding=encoding, newline=None)
+
+
+def _raise_encoding_exception(error: UnicodeError):
+    raise comma.exceptions.CommaEncodingException(
+        "the data cannot be decoded with encoding `{}`: {}".format(
+            error.encoding, error.reason))
+
+
+codecs.register_error(DECODING_ERRORS, _raise_encoding_exception)
+
+
+class _ChunkedReader(io.BufferedIOBase):
+    """
+    A read-only binary stream that reads a seekable binary stream `source`
+    by chunks of `chunksize` bytes, starting with the `first_chunk` already
+    read from the start of the source. Closing this stream does not close
+    the `source`.
+    """
+
+    def __init__(
+        self,
+        source: typing.BinaryIO,
+        chunksize: int,
+        first_chunk: bytes = b"",
+    ):
+        super().__init__()
+        self._source = source
+        self._chunksize = chunksize
+        self._pending = first_chunk
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: typing.Optional[int] = -1) -> bytes:
+        pending, self._pending = self._pending, b""
+        if size is None or size < 0:
+            return pending + self._source.read()
+        if len(pending) > 0:
+            return pending
+        return self._source.read(self._chunksize)
+
+    # (as many bytes as are available are returned, the `size` requested
+    # by `io.TextIOWrapper` only being a hint)
+    read1 = read
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset -= len(self._pending)
+        self._pending = b""
+        return self._source.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._source.tell() - len(self._pending)
+
+
+class _DecodedStream(io.TextIOWrapper):
+    """
+    A text stream that decodes a binary stream as it is read, and that
+    also closes the `opened_streams` when it is closed. The encodings to
+    try next, if the data cannot be decoded, are the `fallback_encodings`.
+    """
+
+    def __init__(
+        self,
+        buffer,
+        encoding,
+        opened_streams=None,
+        fallback_encodings=None,
+    ):
+        super().__init__(
+            buffer,
+            encoding=encoding,
+            errors=DECODING_ERRORS,
+            newline=None)
+        self._opened_streams = list(opened_streams or [])
+        self.fallback_encodings = list(fallback_encodings or [])
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            for opened_stream in reversed(self._opened_streams):
+                opened_stream.close()
+
+
+def decode_stream(
+    source: typing.BinaryIO,
+    encodings: typing.Iterable[str],
+    chunksize: int = DECODE_CHUNKSIZE,
+    opened_streams: typing.Optional[typing.Iterable[typing.IO]] = None,
+) -> typing.Tuple[typing.TextIO, str]:
+    """
+    Returns a seekable text stream that decodes the seekable binary stream
+    `source` as it is read, by chunks of `chunksize` bytes, so that the
+    memory used does not depend on the size of the data; the encoding used
+    is also returned. Newlines are normalized as `io.TextIOWrapper` does.
+
+    The encoding is the first of the `encodings` that can decode the first
+    chunk (data that is ASCII there is decoded as UTF-8, if that is one of
+    the `encodings`, since it may not be ASCII further along): If none can,
+    a `CommaEncodingException` is raised, and if the data further along
+    cannot be decoded, it is raised when that data is read. The `encodings`
+    that come after the one used are listed in the `fallback_encodings`
+    attribute of the text stream, so that the source can then be read again
+    with the next one (as `open_csv()` does).
+
+    Closing the text stream does not close the `source`, but closes the
+    `opened_streams`, if provided.
+    """
+
+    encodings = list(encodings)
+
+    first_chunk = source.read(chunksize)
+    decoded_encoding = None
+
+    for encoding in encodings:
+        # let's sniff test this encoding on the first chunk
+        # sometimes the encoding detected just does not work
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(first_chunk)
+        except UnicodeError:
+            continue
+
+        decoded_encoding = encoding
+        if (codecs.lookup(encoding).name == "ascii" and
+                any(codecs.lookup(other).name == "utf-8"
+                    for other in encodings)):
+            decoded_encoding = "utf-8"
+        break
+
+    if decoded_encoding is None:
+        raise comma.exceptions.CommaEncodingException(
+            "no suitable encoding could be found, tried: {}".format(encodings)
+        )
+
+    # the (distinct) encodings that come after it, which can be tried if
+    # the data further along cannot be decoded
+    fallback_encodings = list()
+    codec_names = {codecs.lookup(decoded_encoding).name}
+    for encoding in encodings[encodings.index(encoding) + 1:]:
+        if codecs.lookup(encoding).name not in codec_names:
+            codec_names.add(codecs.lookup(encoding).name)
+            fallback_encodings.append(encoding)
+
+    stream = _DecodedStream(
+        _ChunkedReader(
+            source=source,
+            chunksize=chunksize,
+            first_chunk=first_chunk),
+        encoding=decoded_encoding,
+        opened_streams=opened_streams,
+        fallback_encodings=fallback_encodings)
+
+    return stream, decoded_encoding
+
+
 def open_stream(
     source: comma.typing.SourceType,
     encoding: str = None,
     no_request: bool = False,
+    seekable: bool = True,
 ) -> typing.Optional[typing.TextIO]:
     """
     Returns a seekable stream for text data that is properly decoded
     and ready to be read: The `source` can be actual data, a local file
     path, or a URL; it is possible to provide a stream that is compressed
-    using ZIP. (This method will store all the data in memory.)
+    using ZIP, gzip, bz2, xz or zstd. (Binary data is decoded as the stream
+    is read, see `decode_stream()`, so the decoded text is never stored in
+    memory all at once; compressed data is also decompressed as it is read.)
+
+    If `seekable` is `False`, the stream returned for a URL may not be
+    seekable: The data is then downloaded and decoded as the stream is
+    read, rather than stored in memory, see `open_response_stream()`.
     """
     
     if source is None:
@@ -297,6 +941,9 @@ def open_stream(
     # local variable to keep track of the (most accurate for the user)
     # caption of the source
     internal_name = None
+
+    # local variable to keep track of the streams opened by this method
+    opened_streams = list()
     
     # is this a STRING?
     if type(source) is str:
@@ -318,23 +965,48 @@ def open_stream(
         # is this a FILE?
         local_path = is_local(location=source)
         if local_path is not None:
-            source = open(local_path, mode="rb")
+            # (read through a memory map, backed by the OS page cache)
+            source = map_file(open(local_path, mode="rb"))
+            opened_streams.append(source)
         
         # is this a URL?
-        elif not no_request and is_url(location=source):
-            
-            response = requests.get(url=source, allow_redirects=True)
+        # (unless the `URL_HEAD_REQUEST` setting is set, the location is
+        # not checked with a HEAD request, the GET request is made directly)
+        elif not no_request and is_url(
+                location=source,
+                no_request=not comma.config.settings.URL_HEAD_REQUEST):
+
+            try:
+                response = get_session().get(
+                    url=source,
+                    allow_redirects=True,
+                    timeout=HTTP_TIMEOUT,
+                    stream=not seekable)
+
+            except requests.exceptions.ConnectionError:
+                # not able to connect
+                return None
             
             if not response.ok:
+                response.close()
                 return None
+
+            # the data is decoded as it is downloaded (and read)
+            if not seekable:
+                source = open_response_stream(
+                    response=response,
+                    encoding=encoding)
+                if isinstance(source, io.TextIOBase):
+                    return source
             
-            if encoding is None:
-                encoding = response.encoding
-            
-            if encoding is not None:
-                source = io.StringIO(response.text)
             else:
-                source = io.BytesIO(response.content)
+                if encoding is None:
+                    encoding = response.encoding
+
+                if encoding is not None:
+                    source = io.StringIO(response.text)
+                else:
+                    source = io.BytesIO(response.content)
         
         else:
             return None
@@ -366,6 +1038,7 @@ def open_stream(
         # is it compressed? if so, unzip it
         if zipfile.is_zipfile(source):
             zipsource = zipfile.ZipFile(source, mode="r")
+            opened_streams.append(zipsource)
             
             names = zipsource.namelist()
             
@@ -380,15 +1053,17 @@ def open_stream(
                     count_csv += 1
                     csv_filename = name
             
+            # (the member is decompressed as it is read)
+
             if count_total == 1:
                 # if only one file, we don't care if it is a CSV (we assume)
-                data = zipsource.read(name=names[0])
-                source = io.BytesIO(data)
+                source = zipsource.open(names[0], mode="r")
+                opened_streams.append(source)
             
             elif count_total > 1 and count_csv == 1:
                 # if exactly one CSV, we know what to do
-                data = zipsource.read(name=csv_filename)
-                source = io.BytesIO(data)
+                source = zipsource.open(csv_filename, mode="r")
+                opened_streams.append(source)
             
             elif count_total == 0:
                 raise ValueError(
@@ -401,6 +1076,13 @@ def open_stream(
                 raise ValueError(
                     "provided ZIP source is ambiguous, "
                     "contains multiple files: {}".format(names))
+
+        # is it compressed otherwise? if so, decompress it as it is read
+        else:
+            decompressed_source = open_compressed(source)
+            if decompressed_source is not None:
+                source = decompressed_source
+                opened_streams.append(source)
     
     # if at this point, has not been converted to stream, error
     if not hasattr(source, "seekable"):
@@ -414,35 +1096,20 @@ def open_stream(
     # detect encoding if bytestring
     if type(sample) is bytes:
         if encoding is None:
-            encoding = comma.extras.detect_encoding(sample)
+            encoding = comma.cache.detect_encoding(
+                sample=sample,
+                source=source)
 
         encoding_candidates = [encoding]
         if "utf-8" not in encoding_candidates:
             encoding_candidates.append("utf-8")
 
-        found_encoding = False
-        source_data = source.read()
-        for encoding in encoding_candidates:
-
-            source_with_encoding = io.TextIOWrapper(io.BytesIO(source_data), encoding=encoding)
-
-            # let's sniff test this encoding!
-            # sometimes the encoding detected just does not work
-            try:
-                source_with_encoding.seek(0)
-                source_with_encoding.read()
-                source_with_encoding.seek(0)
-                source = source_with_encoding
-                found_encoding = True
-                break
-            except UnicodeError:
-                continue
-
-        if not found_encoding:
-            raise comma.exceptions.CommaEncodingException(
-                "no suitable encoding could be found, tried: {}".format(
-                    encoding_candidates)
-            )
+        # decode as the data is read (the streams that were opened here
+        # are closed along with the decoded stream)
+        source, encoding = decode_stream(
+            source=source,
+            encodings=encoding_candidates,
+            opened_streams=opened_streams)
     
     # try to add useful metadata
     if internal_name is not None:
@@ -454,11 +1121,56 @@ def open_stream(
     return source
 
 
+def detect_csv_params(
+    sample: str,
+    delimiters: typing.Optional[typing.Iterable[str]] = None,
+    dialect: typing.Optional[typing.Union[csv.Dialect, str]] = None,
+    has_header: typing.Optional[bool] = None,
+) -> comma.typing.CommaInfoParamsType:
+    """
+    Returns the metadata of a CSV file (see `comma.extras.detect_csv_type()`,
+    the results of which are cached if a cache is set with
+    `comma.cache.set_cache()`) based on a `sample`, for the settings that
+    are not provided: If both the `dialect` (a `csv.Dialect`, or the name
+    of a registered dialect) and `has_header` are provided, the (relatively
+    expensive) detection is skipped entirely.
+    """
+
+    if type(dialect) is str:
+        dialect = csv.get_dialect(dialect)
+
+    if dialect is not None and has_header is not None:
+        return {
+            "dialect": dialect,
+            "simple_dialect": None,
+            "has_header": has_header,
+            "line_terminator": detect_line_terminator(
+                sample=sample,
+                default=getattr(dialect, "lineterminator", None)),
+        }
+
+    csv_params = comma.cache.detect_csv_type(
+        sample=sample,
+        delimiters=delimiters)
+
+    if dialect is not None:
+        csv_params["dialect"] = dialect
+
+    if has_header is not None:
+        csv_params["has_header"] = has_header
+
+    return csv_params
+
+
 def open_csv(
     source: comma.typing.SourceType,
     encoding: str = None,
     delimiters: typing.Optional[typing.Iterable[str]] = None,
     no_request: bool = False,
+    iterate: bool = False,
+    dialect: typing.Optional[typing.Union[csv.Dialect, str]] = None,
+    has_header: typing.Optional[bool] = None,
+    lazy: bool = False,
 ) -> comma.typing.CommaInfoType:
     """
     Returns a `CommaInfoType` typed dictionary containing the data and
@@ -467,14 +1179,33 @@ def open_csv(
     that is compressed using ZIP.
 
     The `source` is opened using the `comma.helpers.open_stream()`
-    helper method. The metadata data is detected using internal
-    helpers and either the `csv` or `clevercsv` dialect sniffers.
+    helper method (a URL is parsed as it is downloaded). The metadata
+    data is detected using internal helpers and either the `csv` or
+    `clevercsv` dialect sniffers.
+
+    If `iterate` is `True`, the `"rows"` entry is a generator that
+    parses the rows one at a time (and closes the stream, when needed,
+    once exhausted), rather than a list containing all the rows; in
+    that case, `"column_count"` is not computed.
+
+    If `lazy` is `True`, the rows are not parsed: The `"text"` entry
+    contains the decoded text of the source, and the `"offsets"` entry the
+    offsets of its records (see `index_records()`), excluding the header;
+    the `"rows"` entry is `None`, and `"column_count"` is not computed.
+
+    The `dialect` and `has_header` settings, when provided, are not
+    detected (see `comma.helpers.detect_csv_params()`).
+
+    If the data cannot be decoded past its start with the encoding that was
+    chosen (see `comma.helpers.decode_stream()`), the source is read again
+    with the next candidate encoding.
     """
 
     stream = comma.helpers.open_stream(
         source=source,
         encoding=encoding,
         no_request=no_request,
+        seekable=False,
     )
     if stream is None:
         return
@@ -488,33 +1219,159 @@ def open_csv(
     except AttributeError:
         close_at_end = True
 
-    # streams returned by open_stream should be seekable
-    # FIXME: handle non-seekable streams
+    try:
+        return _read_csv(
+            stream=stream,
+            source=source,
+            close_at_end=close_at_end,
+            delimiters=delimiters,
+            dialect=dialect,
+            has_header=has_header,
+            iterate=iterate,
+            lazy=lazy,
+        )
+
+    except comma.exceptions.CommaEncodingException:
+        # the data past the first chunk could not be decoded: the source is
+        # read again with the next candidate encoding, if there is one (a
+        # row returned by the generator when `iterate` is `True` cannot be
+        # taken back, so this only applies until the first row is returned)
+        fallback_encodings = getattr(stream, "fallback_encodings", None)
+        if not fallback_encodings:
+            raise
+
+        if close_at_end:
+            stream.close()
+
+        return open_csv(
+            source=source,
+            encoding=fallback_encodings[0],
+            delimiters=delimiters,
+            no_request=no_request,
+            iterate=iterate,
+            dialect=dialect,
+            has_header=has_header,
+            lazy=lazy,
+        )
+
+
+def _read_csv(
+    stream: typing.TextIO,
+    source: comma.typing.SourceType,
+    close_at_end: bool,
+    delimiters: typing.Optional[typing.Iterable[str]],
+    dialect: typing.Optional[typing.Union[csv.Dialect, str]],
+    has_header: typing.Optional[bool],
+    iterate: bool,
+    lazy: bool,
+) -> comma.typing.CommaInfoType:
+    """
+    Returns the `CommaInfoType` typed dictionary of the text `stream`
+    opened from `source`, closing the stream once it has been read if
+    `close_at_end` is `True` (see `open_csv()`).
+    """
+
     assert(hasattr(stream, "seekable"))
 
     # get a sample and analyze
-    stream.seek(0)
-    csv_sample = stream.read(comma.helpers.MAX_SAMPLE_CHUNKSIZE)
-    stream.seek(0)
-
-    csv_params = comma.extras.detect_csv_type(
+    if not isinstance(stream, io.TextIOBase) or stream.seekable():
+        stream.seek(0)
+        csv_sample = stream.read(comma.helpers.MAX_SAMPLE_CHUNKSIZE)
+        stream.seek(0)
+        csv_lines = stream
+
+    else:
+        # streams that are downloaded as they are read cannot be rewound:
+        # the sample (completed up to the end of its last line) is parsed
+        # first, followed by the rest of the stream
+        csv_sample = stream.read(comma.helpers.MAX_SAMPLE_CHUNKSIZE)
+        csv_sample_end = stream.readline()
+        csv_lines = itertools.chain(
+            io.StringIO(csv_sample + csv_sample_end),
+            stream)
+
+    csv_params = comma.helpers.detect_csv_params(
         sample=csv_sample,
-        delimiters=delimiters)
-
-    reader = csv.reader(stream, dialect=csv_params["dialect"])
-    csv_rows = [row for row in reader]
+        delimiters=delimiters,
+        dialect=dialect,
+        has_header=has_header)
 
-    # close if necessary
-    if close_at_end:
-        stream.close()
+    reader = csv.reader(csv_lines, dialect=csv_params["dialect"])
 
     data = {
-        "rows": csv_rows,
         "params": csv_params,
         "sample": csv_sample,
         "header": None,
     }
 
+    # store the source location if it was a string
+    if comma.helpers.is_anystr(source):
+        data["source"] = source
+
+    if lazy:
+        if csv_lines is stream:
+            text = stream.read()
+        else:
+            text = csv_sample + csv_sample_end + stream.read()
+
+        if close_at_end:
+            stream.close()
+
+        dialect = csv_params["dialect"]
+        offsets = index_records(text, dialect)
+
+        # isolate the headers if they exist
+        if data["params"].get("has_header", False):
+            if len(offsets) <= 1:
+                data["params"]["has_header"] = False
+                data["column_count"] = 0
+            else:
+                data["header"] = parse_record(
+                    text[offsets[0]:offsets[1]], dialect)
+                data["column_count"] = len(data["header"])
+                del offsets[0]
+
+        data["text"] = text
+        data["offsets"] = offsets
+        data["rows"] = None
+
+        return data
+
+    if iterate:
+        reader = iter(reader)
+
+        # isolate the headers if they exist (the reader is only advanced
+        # by one row, the rest is parsed as the generator is consumed)
+        if data["params"].get("has_header", False):
+            first_row = next(reader, None)
+            if first_row is None:
+                data["params"]["has_header"] = False
+                data["column_count"] = 0
+            else:
+                data["header"] = first_row
+                data["column_count"] = len(first_row)
+
+        def _iterate_rows():
+            try:
+                for row in reader:
+                    yield row
+            finally:
+                # close if necessary
+                if close_at_end:
+                    stream.close()
+
+        data["rows"] = _iterate_rows()
+
+        return data
+
+    csv_rows = [row for row in reader]
+
+    # close if necessary
+    if close_at_end:
+        stream.close()
+
+    data["rows"] = csv_rows
+
     # isolate the headers if they exist
     if data["params"].get("has_header", False):
 
@@ -530,10 +1387,6 @@ def open_csv(
     if len(csv_rows) > 0 and "column_count" not in data:
         data["column_count"] = max(map(len, csv_rows))
 
-    # store the source location if it was a string
-    if comma.helpers.is_anystr(source):
-        data["source"] = source
-
     return data
 
 
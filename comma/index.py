@@ -0,0 +1,803 @@
+import array
+import codecs
+import collections
+import contextlib
+import csv
+import io
+import itertools
+import json
+import mmap
+import os
+import typing
+import zipfile
+
+import comma.cache
+import comma.exceptions
+import comma.helpers
+import comma.parallel
+import comma.typing
+
+
+__author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
+
+__all__ = [
+    "INDEX_SUFFIX",
+    "INDEX_STRIDE",
+    "TAIL_CHUNKSIZE",
+    "INDEX_VERSION",
+
+    "RecordIndex",
+
+    "index_path",
+    "detect_file_params",
+    "build_index",
+    "find_index",
+    "open_index",
+    "count_records",
+    "read_head",
+    "read_tail",
+]
+
+
+# suffix of the name of the sidecar file of an index (e.g. "data.csv.commaidx")
+INDEX_SUFFIX = ".commaidx"
+
+# default number of records between two offsets stored in an index
+INDEX_STRIDE = 1000
+
+# number of bytes from the end of a file first scanned to find its last
+# records (see `read_tail()`)
+TAIL_CHUNKSIZE = 1 << 16
+
+# version of the format of the sidecar files (an index stored in another
+# version is rebuilt)
+INDEX_VERSION = 1
+
+
+class RecordIndex:
+    """
+    An index of the records of a local CSV file, which makes it possible to
+    read any range of rows without scanning the file: It stores the byte
+    offset of every `stride`-th record (following the header, if any), the
+    number of records, the encoding, dialect and header of the file, and
+    the size and modification time of the file (so that an index that no
+    longer matches the file can be detected, see `is_valid()`).
+
+    An index is built by `build_index()`, and can be stored in a sidecar
+    file next to the CSV file (see `save()` and `open_index()`).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        size: int,
+        mtime: int,
+        encoding: str,
+        dialect: csv.Dialect,
+        has_header: bool,
+        header: typing.Optional[typing.List[str]],
+        line_terminator: str,
+        stride: int,
+        row_count: int,
+        offsets: typing.Sequence[int],
+    ):
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.encoding = encoding
+        self.dialect = dialect
+        self.has_header = has_header
+        self.header = header
+        self.line_terminator = line_terminator
+        self.stride = stride
+        self.row_count = row_count
+        self.offsets = array.array("q", offsets)
+
+    def __len__(self):
+        return self.row_count
+
+    @property
+    def params(self) -> comma.typing.CommaInfoParamsType:
+        """
+        The metadata of the indexed file, as detected by
+        `comma.helpers.detect_csv_params()`.
+        """
+        return {
+            "dialect": self.dialect,
+            "simple_dialect": None,
+            "has_header": self.has_header,
+            "line_terminator": self.line_terminator,
+        }
+
+    def is_valid(self) -> bool:
+        """
+        Checks whether the file still has the size and modification time it
+        had when it was indexed.
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return stat.st_size == self.size and stat.st_mtime_ns == self.mtime
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        """
+        Returns the contents of the index, as a dictionary that can be
+        serialized to JSON.
+        """
+        return {
+            "version": INDEX_VERSION,
+            "size": self.size,
+            "mtime": self.mtime,
+            "encoding": self.encoding,
+            "dialect": comma.parallel.dialect_to_dict(self.dialect),
+            "has_header": self.has_header,
+            "header": self.header,
+            "line_terminator": self.line_terminator,
+            "stride": self.stride,
+            "row_count": self.row_count,
+            "offsets": self.offsets.tolist(),
+        }
+
+    @classmethod
+    def from_dict(
+        cls,
+        path: str,
+        entries: typing.Dict[str, typing.Any],
+    ) -> "RecordIndex":
+        """
+        Creates the index of the file `path` from the dictionary `entries`
+        returned by `to_dict()`. Raises a `ValueError` if the dictionary is
+        not a valid index (or is in another version of the format).
+        """
+        try:
+            if entries["version"] != INDEX_VERSION:
+                raise ValueError(
+                    "unsupported index version `{}`".format(entries["version"]))
+
+            return cls(
+                path=path,
+                size=entries["size"],
+                mtime=entries["mtime"],
+                encoding=entries["encoding"],
+                dialect=comma.helpers.DefaultDialect.override(
+                    **entries["dialect"]),
+                has_header=entries["has_header"],
+                header=entries["header"],
+                line_terminator=entries["line_terminator"],
+                stride=entries["stride"],
+                row_count=entries["row_count"],
+                offsets=entries["offsets"])
+
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError("invalid index: {}".format(e))
+
+    def save(self, path: typing.Optional[str] = None):
+        """
+        Writes the index to the JSON file `path` (by default, the sidecar
+        file of the indexed file, see `index_path()`), atomically.
+        """
+        if path is None:
+            path = index_path(self.path)
+
+        temporary_path = "{}.{}.tmp".format(path, os.getpid())
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        source_path: typing.Optional[str] = None,
+    ) -> "RecordIndex":
+        """
+        Reads the index stored in the JSON file `path`, of the file
+        `source_path` (by default, the file of which `path` is the sidecar
+        file). Raises an `OSError` if the file cannot be read, and a
+        `ValueError` if it does not contain a valid index.
+        """
+        if source_path is None:
+            if not path.endswith(INDEX_SUFFIX):
+                raise ValueError(
+                    "the indexed file of `{}` must be provided".format(path))
+            source_path = path[:-len(INDEX_SUFFIX)]
+
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+
+        if not isinstance(entries, dict):
+            raise ValueError("invalid index file `{}`".format(path))
+
+        return cls.from_dict(path=source_path, entries=entries)
+
+    def _block_range(self, first_block: int, last_block: int):
+        start = self.offsets[first_block]
+        end = (self.offsets[last_block + 1]
+               if last_block + 1 < len(self.offsets) else self.size)
+        return start, end
+
+    def read_rows(
+        self,
+        start: int = 0,
+        stop: typing.Optional[int] = None,
+    ) -> typing.List[typing.List[str]]:
+        """
+        Returns the rows `start` to `stop` (excluded) of the file, as lists
+        of fields: Only the blocks of records containing these rows are
+        read and parsed.
+        """
+        start, stop, _ = slice(start, stop).indices(self.row_count)
+        if start >= stop:
+            return []
+
+        first_block = start // self.stride
+        last_block = (stop - 1) // self.stride
+
+        byte_start, byte_end = self._block_range(first_block, last_block)
+
+        rows = comma.parallel.parse_chunk(
+            path=self.path,
+            start=byte_start,
+            end=byte_end,
+            encoding=self.encoding,
+            dialect_params=comma.parallel.dialect_to_dict(self.dialect))
+
+        skipped = first_block * self.stride
+        return rows[start - skipped:stop - skipped]
+
+    def read_block(self, block: int) -> typing.List[typing.List[str]]:
+        """
+        Returns the rows of the `block`-th block of records (that is, the
+        rows `block * stride` to `(block + 1) * stride`).
+        """
+        return self.read_rows(block * self.stride, (block + 1) * self.stride)
+
+
+def index_path(path: str) -> str:
+    """
+    Returns the path of the sidecar file storing the index of the file
+    `path` (see `INDEX_SUFFIX`).
+    """
+    return path + INDEX_SUFFIX
+
+
+def detect_file_params(
+    path: str,
+    encoding: typing.Optional[str] = None,
+    delimiters: typing.Optional[typing.Iterable[str]] = None,
+    dialect: typing.Optional[typing.Union[csv.Dialect, str]] = None,
+    has_header: typing.Optional[bool] = None,
+) -> typing.Tuple[str, comma.typing.CommaInfoParamsType, str]:
+    """
+    Detects the encoding and the format of the local CSV file `path` from a
+    sample of its first bytes, as `comma.helpers.open_csv()` does (the
+    settings that are provided are not detected), and returns the encoding,
+    the metadata of the file and the (decoded) sample. Raises a
+    `comma.exceptions.CommaException` if the file is compressed.
+    """
+
+    with open(path, mode="rb") as stream:
+        # (a character is at most four bytes)
+        sample_bytes = stream.read(4 * comma.helpers.MAX_SAMPLE_CHUNKSIZE)
+        final = len(stream.read(1)) == 0
+
+    if (comma.helpers.detect_compression(sample_bytes) is not None or
+            zipfile.is_zipfile(path)):
+        raise comma.exceptions.CommaException(
+            "the file `{}` is compressed".format(path))
+
+    if encoding is None:
+        encoding = comma.cache.detect_encoding(
+            sample_bytes[:comma.helpers.MAX_SAMPLE_CHUNKSIZE])
+
+    decoder = io.IncrementalNewlineDecoder(
+        decoder=codecs.getincrementaldecoder(encoding)(errors="replace"),
+        translate=True)
+    csv_sample = decoder.decode(sample_bytes, final=final)
+    csv_sample = csv_sample[:comma.helpers.MAX_SAMPLE_CHUNKSIZE]
+
+    csv_params = comma.helpers.detect_csv_params(
+        sample=csv_sample,
+        delimiters=delimiters,
+        dialect=dialect,
+        has_header=has_header)
+
+    csv_params["has_header"] = bool(csv_params.get("has_header", False))
+
+    return encoding, csv_params, csv_sample
+
+
+def _record_pattern(encoding: str, dialect: csv.Dialect) -> typing.Pattern:
+    """
+    Returns the expression matching the records of a file in the bytes of
+    the file (see `comma.helpers.record_pattern()`), or raises a
+    `comma.exceptions.CommaException` if the file cannot be scanned at the
+    byte level (which requires an encoding that can be split at the byte
+    level, see `comma.parallel.is_splittable_encoding()`, and a dialect
+    that only uses ASCII characters).
+    """
+    if not comma.parallel.is_splittable_encoding(encoding):
+        raise comma.exceptions.CommaException(
+            "a file in the `{}` encoding cannot be scanned".format(encoding))
+
+    characters = [dialect.delimiter, dialect.quotechar, dialect.escapechar]
+    if not all(character is None or ord(character) < 128
+               for character in characters):
+        raise comma.exceptions.CommaException(
+            "a file with non-ASCII delimiters or quotes cannot be scanned")
+
+    return comma.helpers.record_pattern(dialect, encoding=encoding)
+
+
+@contextlib.contextmanager
+def _map_path(path: str) -> typing.Iterator[typing.Union[bytes, mmap.mmap]]:
+    """
+    Provides the contents of the local file `path`, memory-mapped (an empty
+    file, which cannot be mapped, is provided as empty bytes).
+    """
+    with open(path, mode="rb") as stream:
+        if os.fstat(stream.fileno()).st_size == 0:
+            yield b""
+            return
+
+        data = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield data
+        finally:
+            data.close()
+
+
+# The functions scanning the records of a memory-mapped file make sure that
+# no match object outlives them, so that the map can then be closed.
+
+def _header_end(
+    data: typing.Union[bytes, mmap.mmap],
+    pattern: typing.Pattern,
+) -> typing.Optional[int]:
+    """
+    Returns the offset at which the first record (the header) of `data`
+    ends, or `None` if `data` is empty.
+    """
+    match = pattern.match(data)
+    if match is None or match.end() == 0:
+        return None
+    return match.end()
+
+
+def _count_records(
+    data: typing.Union[bytes, mmap.mmap],
+    pattern: typing.Pattern,
+    position: int = 0,
+) -> int:
+    """
+    Returns the number of records of `data` from offset `position`.
+    """
+    # (the expression also matches the empty string at the end of the data,
+    # which is not a record)
+    size = len(data)
+    return sum(1 for match in pattern.finditer(data, position)
+               if match.start() < size)
+
+
+def _scan_records(
+    data: typing.Union[bytes, mmap.mmap],
+    pattern: typing.Pattern,
+    stride: int,
+    position: int = 0,
+) -> typing.Tuple[array.array, int]:
+    """
+    Scans the records of `data` from offset `position`, and returns the
+    offsets of every `stride`-th record, and the number of records.
+    """
+    size = len(data)
+
+    starts = (
+        match.start()
+        for match in itertools.islice(
+            pattern.finditer(data, position), 0, None, stride)
+    )
+    offsets = array.array(
+        "q", itertools.takewhile(lambda start: start < size, starts))
+
+    row_count = 0
+    if len(offsets) > 0:
+        row_count = ((len(offsets) - 1) * stride +
+                     _count_records(data, pattern, offsets[-1]))
+
+    return offsets, row_count
+
+
+def _last_records_start(
+    data: typing.Union[bytes, mmap.mmap],
+    pattern: typing.Pattern,
+    dialect: csv.Dialect,
+    encoding: str,
+    count: int,
+    position: int = 0,
+    chunksize: int = TAIL_CHUNKSIZE,
+) -> int:
+    """
+    Returns the offset at which the last `count` records of `data` (from
+    offset `position`) start, scanning backwards from the end of the data.
+
+    The data is scanned from the start of a line found `chunksize` bytes
+    before the end: That line either starts a record, or continues a quoted
+    field. The records are delimited under both hypotheses; once the two
+    agree on the end of a record, all the following records are certain.
+    If they never agree, or if there are not enough records, the scan
+    starts again twice as far from the end (up to `position`).
+    """
+    size = len(data)
+    if count <= 0:
+        return size
+
+    # (with an escape character, a line terminator may be escaped, so the
+    # records are only certain when scanned from the start)
+    if dialect.escapechar is not None:
+        starts = collections.deque(
+            (match.start() for match in pattern.finditer(data, position)
+             if match.start() < size),
+            maxlen=count)
+        return starts[0] if len(starts) > 0 else size
+
+    quote = None
+    if dialect.quoting != csv.QUOTE_NONE and dialect.quotechar is not None:
+        quote = dialect.quotechar.encode(encoding)
+
+    while True:
+        start = max(position, size - chunksize)
+        if start > position:
+            newline = data.find(b"\n", start)
+            start = newline + 1 if newline != -1 else size
+
+        # the ends of the records, if `start` is the start of a record
+        ends = [match.end() for match in pattern.finditer(data, start)
+                if match.start() < size]
+
+        first = start
+        if start > position and quote is not None:
+            # the ends of the records, if `start` is within a quoted field
+            # (which is scanned as if the quote was just opened)
+            block = quote + data[start:size]
+            other_ends = set(
+                start - len(quote) + match.end()
+                for match in pattern.finditer(block)
+                if match.start() < len(block))
+
+            first = next((end for end in ends if end in other_ends), None)
+            ends = [end for end in ends if first is not None and end > first]
+
+        if first is not None and (len(ends) >= count or start <= position):
+            starts = [first] + ends[:-1]
+            return starts[-count] if len(starts) >= count else first
+
+        if start <= position:
+            return size
+
+        chunksize *= 2
+
+
+def _read_header(
+    path: str,
+    encoding: str,
+    dialect: csv.Dialect,
+    header_end: typing.Optional[int],
+) -> typing.Optional[typing.List[str]]:
+    if not header_end:
+        return None
+    return comma.parallel.parse_chunk(
+        path, 0, header_end, encoding,
+        comma.parallel.dialect_to_dict(dialect))[0]
+
+
+def _make_info(
+    path: str,
+    csv_params: comma.typing.CommaInfoParamsType,
+    csv_sample: str,
+    header: typing.Optional[typing.List[str]],
+    rows: typing.List[typing.List[str]],
+) -> comma.typing.CommaInfoType:
+    """
+    Returns the `CommaInfoType` typed dictionary of some `rows` of the file
+    `path` (as `comma.helpers.open_csv()` does).
+    """
+    if header is None:
+        csv_params["has_header"] = False
+
+    data = {
+        "params": csv_params,
+        "sample": csv_sample,
+        "header": header,
+        "source": path,
+        "rows": rows,
+    }
+
+    if header is not None:
+        data["column_count"] = len(header)
+    elif len(rows) > 0:
+        data["column_count"] = max(map(len, rows))
+    elif csv_params["has_header"]:
+        data["column_count"] = 0
+
+    return data
+
+
+def build_index(
+    path: str,
+    stride: int = INDEX_STRIDE,
+    encoding: typing.Optional[str] = None,
+    delimiters: typing.Optional[typing.Iterable[str]] = None,
+    dialect: typing.Optional[typing.Union[csv.Dialect, str]] = None,
+    has_header: typing.Optional[bool] = None,
+) -> RecordIndex:
+    """
+    Builds the index of the records of the local (uncompressed) CSV file
+    `path`, storing the offset of every `stride`-th record. The encoding
+    and format of the file are detected from a sample (see
+    `detect_file_params()`), unless they are provided. The file is
+    scanned once (as a memory-mapped file, so that it is not read into
+    memory), and line terminators within quoted fields do not end a record.
+
+    Raises a `comma.exceptions.CommaException` if the file cannot be indexed
+    (which requires an encoding that can be split at the byte level, see
+    `comma.parallel.is_splittable_encoding()`, and a dialect that only uses
+    ASCII characters).
+    """
+
+    if stride < 1:
+        raise ValueError(
+            "the stride of an index must be positive, not {}".format(stride))
+
+    stat = os.stat(path)
+
+    encoding, csv_params, _ = detect_file_params(
+        path=path,
+        encoding=encoding,
+        delimiters=delimiters,
+        dialect=dialect,
+        has_header=has_header)
+
+    dialect = csv_params["dialect"]
+    pattern = _record_pattern(encoding, dialect)
+
+    with _map_path(path) as data:
+        header_end = 0
+        if csv_params["has_header"]:
+            header_end = _header_end(data, pattern)
+
+        offsets, row_count = array.array("q"), 0
+        if header_end is not None:
+            offsets, row_count = _scan_records(
+                data=data,
+                pattern=pattern,
+                stride=stride,
+                position=header_end)
+
+    return RecordIndex(
+        path=path,
+        size=stat.st_size,
+        mtime=stat.st_mtime_ns,
+        encoding=encoding,
+        dialect=dialect,
+        has_header=header_end is not None and csv_params["has_header"],
+        header=_read_header(path, encoding, dialect, header_end),
+        line_terminator=csv_params["line_terminator"],
+        stride=stride,
+        row_count=row_count,
+        offsets=offsets)
+
+
+def find_index(
+    path: str,
+    stride: typing.Optional[int] = None,
+    encoding: typing.Optional[str] = None,
+    dialect: typing.Optional[typing.Union[csv.Dialect, str]] = None,
+    has_header: typing.Optional[bool] = None,
+) -> typing.Optional[RecordIndex]:
+    """
+    Returns the index of the local CSV file `path` stored in its sidecar
+    file (see `index_path()`), if there is one that still matches the file
+    and the settings that are provided (any `stride` is accepted if it is
+    `None`), or `None` otherwise.
+    """
+
+    try:
+        index = RecordIndex.load(index_path(path), source_path=path)
+    except (OSError, ValueError):
+        return None
+
+    if (not index.is_valid() or
+            (stride is not None and index.stride != stride) or
+            (encoding is not None and
+             codecs.lookup(encoding).name !=
+             codecs.lookup(index.encoding).name) or
+            (has_header is not None and index.has_header != has_header) or
+            (isinstance(dialect, csv.Dialect) and
+             comma.parallel.dialect_to_dict(dialect) !=
+             comma.parallel.dialect_to_dict(index.dialect))):
+        return None
+
+    return index
+
+
+def open_index(
+    path: str,
+    stride: int = INDEX_STRIDE,
+    encoding: typing.Optional[str] = None,
+    delimiters: typing.Optional[typing.Iterable[str]] = None,
+    dialect: typing.Optional[typing.Union[csv.Dialect, str]] = None,
+    has_header: typing.Optional[bool] = None,
+    save: bool = True,
+) -> RecordIndex:
+    """
+    Returns the index of the local CSV file `path`: The index stored in its
+    sidecar file (see `index_path()`) is used if it still matches the file
+    and the settings that are provided (see `find_index()`); otherwise, the
+    index is built (see `build_index()`) and, if `save` is `True`, stored
+    in the sidecar file (if it can be written).
+    """
+
+    index = find_index(
+        path=path,
+        stride=stride,
+        encoding=encoding,
+        dialect=dialect,
+        has_header=has_header)
+
+    if index is not None:
+        return index
+
+    index = build_index(
+        path=path,
+        stride=stride,
+        encoding=encoding,
+        delimiters=delimiters,
+        dialect=dialect,
+        has_header=has_header)
+
+    if save:
+        try:
+            index.save()
+        except OSError:
+            # (e.g., the directory of the file is read-only)
+            pass
+
+    return index
+
+
+def count_records(
+    path: str,
+    encoding: typing.Optional[str] = None,
+    delimiters: typing.Optional[typing.Iterable[str]] = None,
+    dialect: typing.Optional[typing.Union[csv.Dialect, str]] = None,
+    has_header: typing.Optional[bool] = None,
+) -> int:
+    """
+    Returns the number of rows (excluding the header) of the local CSV file
+    `path`: The count stored in the index of the file is used if there is
+    one (see `find_index()`); otherwise, the records of the file are
+    delimited by a scan of its bytes, without being parsed. Raises a
+    `comma.exceptions.CommaException` if the file cannot be scanned (see
+    `build_index()`).
+    """
+
+    index = find_index(
+        path=path,
+        encoding=encoding,
+        dialect=dialect,
+        has_header=has_header)
+
+    if index is not None:
+        return len(index)
+
+    encoding, csv_params, _ = detect_file_params(
+        path=path,
+        encoding=encoding,
+        delimiters=delimiters,
+        dialect=dialect,
+        has_header=has_header)
+
+    pattern = _record_pattern(encoding, csv_params["dialect"])
+
+    with _map_path(path) as data:
+        header_end = 0
+        if csv_params["has_header"]:
+            header_end = _header_end(data, pattern)
+
+        if header_end is None:
+            return 0
+
+        return _count_records(data, pattern, header_end)
+
+
+def read_head(
+    path: str,
+    count: int,
+    encoding: typing.Optional[str] = None,
+    delimiters: typing.Optional[typing.Iterable[str]] = None,
+    dialect: typing.Optional[typing.Union[csv.Dialect, str]] = None,
+    has_header: typing.Optional[bool] = None,
+) -> comma.typing.CommaInfoType:
+    """
+    Returns a `CommaInfoType` typed dictionary containing the first `count`
+    rows of the local CSV file `path` (as `comma.helpers.open_csv()` does,
+    for all the rows): The file is decoded and parsed as it is read, and
+    only until these rows have been parsed.
+    """
+
+    encoding, csv_params, csv_sample = detect_file_params(
+        path=path,
+        encoding=encoding,
+        delimiters=delimiters,
+        dialect=dialect,
+        has_header=has_header)
+
+    # (newlines are normalized, as done by `comma.helpers.decode_stream()`)
+    with io.TextIOWrapper(
+            open(path, mode="rb"), encoding=encoding, newline=None) as stream:
+        reader = csv.reader(stream, dialect=csv_params["dialect"])
+
+        header = None
+        if csv_params["has_header"]:
+            header = next(reader, None)
+
+        rows = list(itertools.islice(reader, count))
+
+    return _make_info(path, csv_params, csv_sample, header, rows)
+
+
+def read_tail(
+    path: str,
+    count: int,
+    encoding: typing.Optional[str] = None,
+    delimiters: typing.Optional[typing.Iterable[str]] = None,
+    dialect: typing.Optional[typing.Union[csv.Dialect, str]] = None,
+    has_header: typing.Optional[bool] = None,
+) -> comma.typing.CommaInfoType:
+    """
+    Returns a `CommaInfoType` typed dictionary containing the last `count`
+    rows of the local CSV file `path` (as `comma.helpers.open_csv()` does,
+    for all the rows): The records are delimited by a scan of the bytes of
+    the file backwards from its end (see `_last_records_start()`), and
+    only the last ones are decoded and parsed. Raises a
+    `comma.exceptions.CommaException` if the file cannot be scanned (see
+    `build_index()`).
+    """
+
+    encoding, csv_params, csv_sample = detect_file_params(
+        path=path,
+        encoding=encoding,
+        delimiters=delimiters,
+        dialect=dialect,
+        has_header=has_header)
+
+    dialect = csv_params["dialect"]
+    pattern = _record_pattern(encoding, dialect)
+
+    with _map_path(path) as data:
+        size = len(data)
+
+        header_end = 0
+        if csv_params["has_header"]:
+            header_end = _header_end(data, pattern)
+
+        start = size
+        if header_end is not None:
+            start = _last_records_start(
+                data=data,
+                pattern=pattern,
+                dialect=dialect,
+                encoding=encoding,
+                count=count,
+                position=header_end)
+
+    rows = []
+    if start < size:
+        rows = comma.parallel.parse_chunk(
+            path, start, size, encoding,
+            comma.parallel.dialect_to_dict(dialect))
+
+    header = _read_header(path, encoding, dialect, header_end)
+
+    return _make_info(path, csv_params, csv_sample, header, rows)
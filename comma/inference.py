@@ -0,0 +1,203 @@
+import array
+import datetime
+import itertools
+import math
+import typing
+
+import comma.config
+
+
+__author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
+
+__all__ = [
+    "INFERENCE_SAMPLE_SIZE",
+    "INFERABLE_TYPES",
+    "ARRAY_TYPECODES",
+    "LOW_CARDINALITY_RATIO",
+
+    "is_int",
+    "is_float",
+    "is_bool",
+    "is_date",
+    "is_type",
+    "infer_type",
+    "parse_value",
+    "make_buffer",
+    "is_low_cardinality",
+]
+
+
+# number of values of a column that are looked at to infer its type
+INFERENCE_SAMPLE_SIZE = 1000
+
+# the types that can be inferred, by order of precedence
+INFERABLE_TYPES = [int, float, bool, datetime.date, str]
+
+# the types that are stored in compact `array.array` buffers
+ARRAY_TYPECODES = {
+    int: "q",
+    float: "d",
+}
+
+# largest ratio of distinct values (among the values of a sample) for which
+# a column is considered to have a low cardinality
+LOW_CARDINALITY_RATIO = 0.1
+
+
+# NOTE: The following checks are stricter than those of `ConfigHelper`, on
+# which they are based: Except for floats, a value is only considered of a
+# type if converting it back to a string gives the original value (so that,
+# for instance, identifiers with leading zeroes are kept as strings). Floats
+# are written in many ways (`"3"`, `"2.50"`, `"1e5"`), so any finite float
+# that is stored exactly is accepted: Its value is kept, but it is serialized
+# in canonical form (`"3.0"`, `"2.5"`, `"100000.0"`).
+
+def is_int(value: str) -> bool:
+    """
+    Checks whether the string `value` is the representation of an integer
+    (which can be stored in a 64-bit `array.array`).
+    """
+    if not comma.config.ConfigHelper.is_int(value):
+        return False
+    parsed_value = int(value)
+    return str(parsed_value) == value and -2**63 <= parsed_value < 2**63
+
+
+def is_float(value: str) -> bool:
+    """
+    Checks whether the string `value` is the representation of a finite
+    float (which can be stored in a 64-bit `array.array`); integers must
+    also be integers as checked by `is_int()`, and be exactly represented
+    by the float.
+    """
+    if not comma.config.ConfigHelper.is_float(value):
+        return False
+    parsed_value = float(value)
+    if not math.isfinite(parsed_value):
+        return False
+    if comma.config.ConfigHelper.is_int(value):
+        return is_int(value) and int(parsed_value) == int(value)
+    return True
+
+
+def is_bool(value: str) -> bool:
+    """
+    Checks whether the string `value` is the representation of a boolean.
+    """
+    return (comma.config.ConfigHelper.is_likely_bool(value) and
+            value in ("True", "False"))
+
+
+def is_date(value: str) -> bool:
+    """
+    Checks whether the string `value` is an ISO 8601 date (`YYYY-MM-DD`).
+    """
+    try:
+        return _parse_date(value).isoformat() == value
+    except (TypeError, ValueError):
+        return False
+
+
+def _parse_date(value: str) -> datetime.date:
+    """
+    Parses an ISO 8601 date (`YYYY-MM-DD`).
+    """
+    return datetime.datetime.strptime(value, "%Y-%m-%d").date()
+
+
+_TYPE_CHECKS = {
+    int: is_int,
+    float: is_float,
+    bool: is_bool,
+    datetime.date: is_date,
+}
+
+
+def is_type(value: str, typ: type) -> bool:
+    """
+    Checks whether the string `value` is the representation of a value of
+    type `typ` (one of `INFERABLE_TYPES`).
+    """
+    if typ is str:
+        return True
+    return _TYPE_CHECKS[typ](value)
+
+
+def infer_type(
+    values: typing.Iterable[str],
+    sample_size: typing.Optional[int] = INFERENCE_SAMPLE_SIZE,
+) -> type:
+    """
+    Returns the most specific type, among `INFERABLE_TYPES`, that all the
+    (first `sample_size`) `values` are representations of; if `values` is
+    empty, or if the values have no common type, returns `str`.
+    """
+    sample = list(itertools.islice(values, sample_size))
+
+    if len(sample) == 0:
+        return str
+
+    for typ in INFERABLE_TYPES:
+        if typ is str:
+            break
+        if all(map(_TYPE_CHECKS[typ], sample)):
+            return typ
+
+    return str
+
+
+def parse_value(value: typing.Any, typ: type) -> typing.Any:
+    """
+    Converts `value` to type `typ`, if it is not already of that type;
+    strings are parsed. Raises a `ValueError` if the conversion fails.
+    """
+    if type(value) is typ or typ is str:
+        return value
+
+    if isinstance(value, str):
+        if typ is int:
+            return int(value)
+        if typ is float:
+            return float(value)
+        if typ is bool:
+            if value not in ("True", "False"):
+                raise ValueError(
+                    "invalid literal for bool: {}".format(repr(value)))
+            return value == "True"
+        if typ is datetime.date:
+            return _parse_date(value)
+
+    return typ(value)
+
+
+def make_buffer(values: typing.Iterable[typing.Any], typ: type) -> typing.MutableSequence:
+    """
+    Returns a buffer containing the `values` converted to type `typ`: For
+    numeric types, this is a compact `array.array`, otherwise a list.
+    """
+    values = map(lambda value: parse_value(value, typ), values)
+
+    typecode = ARRAY_TYPECODES.get(typ)
+    if typecode is not None:
+        return array.array(typecode, values)
+
+    return list(values)
+
+
+def is_low_cardinality(
+    values: typing.Iterable[typing.Any],
+    sample_size: typing.Optional[int] = INFERENCE_SAMPLE_SIZE,
+    max_ratio: float = LOW_CARDINALITY_RATIO,
+) -> bool:
+    """
+    Checks whether the (first `sample_size`) `values` take few distinct
+    values, that is, at most a ratio `max_ratio` of the number of values;
+    such a column benefits from dictionary encoding (see
+    `comma.classes.columns.CommaEncodedColumn`).
+    """
+    sample = list(itertools.islice(values, sample_size))
+
+    if len(sample) == 0:
+        return False
+
+    return len(set(sample)) <= max_ratio * len(sample)
@@ -1,13 +1,19 @@
 
 import csv
 import io
+import itertools
+import os
 import typing
 
+import comma.classes.columns
 import comma.classes.file
+import comma.classes.lazy
 import comma.classes.row
 import comma.classes.table
 import comma.exceptions
 import comma.helpers
+import comma.index
+import comma.parallel
 import comma.typing
 
 
@@ -17,12 +23,32 @@ __all__ = [
     "TableType",
 
     "load",
+    "iterload",
+    "count_rows",
+    "head",
+    "tail",
 
     "dumps",
     "dump",
 ]
 
 
+# The storage backends that can be selected when loading a table:
+#  - "rows": one `CommaRow` (holding a list of fields) per row
+#  - "columnar": one list per column, with rows provided as views
+#  - "lazy": the text of the source, with rows parsed when accessed
+
+STORAGE_ROWS = "rows"
+STORAGE_COLUMNAR = "columnar"
+STORAGE_LAZY = "lazy"
+
+STORAGE_TYPES = [STORAGE_ROWS, STORAGE_COLUMNAR, STORAGE_LAZY]
+
+
+# number of rows that are serialized and written at a time by `dump()`
+DUMP_BATCH_SIZE = 1000
+
+
 # Our type hint for a tabular type
 # NOTE: Because of the reference to CommaTable, must be here rather
 # than in comma.typing because otherwise will cause circular import
@@ -45,6 +71,14 @@ def load(
     encoding: str = None,
     force_header: bool = False,
     delimiters: typing.Optional[typing.Iterable[str]] = None,
+    storage: typing.Optional[str] = None,
+    infer_types: bool = False,
+    workers: typing.Optional[int] = None,
+    dialect: typing.Optional[typing.Union[csv.Dialect, str]] = None,
+    has_header: typing.Optional[bool] = None,
+    header: comma.typing.OptionalHeaderType = None,
+    dictionary_encoding: bool = False,
+    index: bool = False,
 ) -> typing.Optional[comma.classes.table.CommaTable]:
     """
     Deserializes a table from a CSV/DSV source, and returns a
@@ -55,20 +89,311 @@ def load(
     path to a file containing the data; a URL to the data source. The
     data can be in any encoding (which will be detected using the BOM
     if present, or the `chardet` module otherwise), and it can even be
-    compressed by ZIP.
+    compressed by ZIP, gzip, bz2, xz or zstd (the latter requiring the
+    optional `zstandard` package).
 
     Although everything is autodetected thanks to `clevercsv` and
     `chardet`, you can optionally use the `encoding` and `delimiters`
     parameters to override (or circumvent) automatic detection.
+
+    The `storage` parameter selects how the rows are stored in memory:
+    By default (`"rows"`), each row is a `CommaRow` containing a list of
+    fields; with `"columnar"`, the table stores one list per column and
+    provides the rows as lightweight views, which uses less memory and
+    makes accessing a column (e.g., `table["price"]`) free; with `"lazy"`,
+    the source is only split into records when it is loaded, and each row
+    is parsed the first time it is accessed (with at most
+    `comma.config.settings.LAZY_CACHE_SIZE` parsed rows kept in memory),
+    see `comma.classes.lazy.CommaLazyRows`, which makes loading a large
+    table of which only a few rows are used much faster.
+
+    If `infer_types` is `True` (which requires columnar storage, and
+    selects it by default), the type of each column (integer, float,
+    boolean, date or string) is inferred, and the values are converted
+    accordingly; numeric columns are then stored in compact arrays. The
+    inferred types are reported by the `dtypes` property of the table.
+
+    If `dictionary_encoding` is `True` (which also requires columnar
+    storage, and selects it by default), the columns that take few
+    distinct values in the first rows (such as a country or a status) are
+    dictionary-encoded: Each distinct value is stored once, and each row
+    only stores a small integer code (see
+    `comma.classes.columns.CommaEncodedColumn`). The memory used by each
+    column is reported by the `memory_usage()` method of the table.
+
+    If `index` is `True` (which requires the lazy storage, and selects it
+    by default), the source must be a local file, which is indexed (see
+    `comma.index.open_index()`): The index, which stores the offset of
+    every `comma.index.INDEX_STRIDE`-th record, is saved in a sidecar file
+    (e.g., `data.csv.commaidx`) and reused as long as the file does not
+    change, so that loading the file again does not read it; the rows are
+    then read from the file, by blocks of records, when they are accessed
+    (see `comma.classes.lazy.CommaIndexedRows`).
+
+    If `workers` is larger than one, a local file is parsed in parallel by
+    that many processes, each parsing a chunk of the file (split at record
+    boundaries), see `comma.parallel.open_csv_parallel()`; this is not
+    available with the `"lazy"` storage. Since the rows are then sent back
+    from the processes, this is not always faster than parsing the file in
+    a single process (see `benchmarks/bench_parallel.py` to measure it).
+
+    When the format of the source is known, the `dialect` (a `csv.Dialect`
+    or the name of a registered dialect), whether the source `has_header`,
+    and the `header` itself can be provided; if the `dialect` and either
+    `has_header` or `header` are provided, the (relatively expensive)
+    detection of the format is skipped. A `header` that is provided is used
+    as the header of the table: If `has_header` is `True`, it replaces the
+    first row of the source, otherwise all rows of the source are data.
     """
 
+    if storage is None:
+        storage = (STORAGE_COLUMNAR if infer_types or dictionary_encoding
+                   else STORAGE_LAZY if index
+                   else STORAGE_ROWS)
+
+    if infer_types and storage != STORAGE_COLUMNAR:
+        raise ValueError(
+            "type inference requires the `{}` storage".format(
+                STORAGE_COLUMNAR))
+
+    if dictionary_encoding and storage != STORAGE_COLUMNAR:
+        raise ValueError(
+            "dictionary encoding requires the `{}` storage".format(
+                STORAGE_COLUMNAR))
+
+    if index and storage != STORAGE_LAZY:
+        raise ValueError(
+            "an index requires the `{}` storage".format(STORAGE_LAZY))
+
+    if storage not in STORAGE_TYPES:
+        raise ValueError(
+            "unknown storage `{}`, expected one of: {}".format(
+                storage, STORAGE_TYPES))
+
+    if workers is not None and workers < 1:
+        raise ValueError(
+            "the number of workers must be positive, not {}".format(workers))
+
+    if workers is not None and workers > 1 and storage == STORAGE_LAZY:
+        raise ValueError(
+            "parallel parsing is not available with the `{}` storage".format(
+                STORAGE_LAZY))
+
+    if header is not None:
+        header = comma.helpers.validate_header(header)
+        if has_header is None:
+            has_header = False
+
+    if index:
+        return _load_indexed(
+            source=source,
+            encoding=encoding,
+            force_header=force_header,
+            delimiters=delimiters,
+            dialect=dialect,
+            has_header=has_header,
+            header=header,
+        )
+
     # Use the helper method to open the data, parse it and return
-    # a CommaInfoType typed dictionary.
+    # a CommaInfoType typed dictionary. (With columnar storage, rows
+    # are parsed lazily, so that they are directly stored by columns.)
+
+    if workers is not None and workers > 1:
+        csv_comma_info = comma.parallel.open_csv_parallel(
+            source=source,
+            encoding=encoding,
+            delimiters=delimiters,
+            workers=workers,
+            dialect=dialect,
+            has_header=has_header,
+        )
+
+    else:
+        csv_comma_info = comma.helpers.open_csv(
+            source=source,
+            encoding=encoding,
+            delimiters=delimiters,
+            iterate=(storage == STORAGE_COLUMNAR),
+            dialect=dialect,
+            has_header=has_header,
+            lazy=(storage == STORAGE_LAZY),
+        )
+
+    if csv_comma_info is None:
+        return
+
+    csv_rows_raw = csv_comma_info["rows"]
+    csv_header = csv_comma_info["header"]
+
+    if header is not None:
+        csv_header = header
+
+    # create CommaFile object
+    parent_comma_file = comma.classes.file.CommaFile(
+        header=csv_header,
+        params=csv_comma_info["params"],
+    )
+
+    if storage == STORAGE_LAZY:
+
+        csv_text = csv_comma_info["text"]
+        csv_offsets = csv_comma_info["offsets"]
+        csv_dialect = csv_comma_info["params"]["dialect"]
+
+        # (the header is parsed, and the other rows are left as they are)
+        if force_header and csv_header is None and len(csv_offsets) > 2:
+            parent_comma_file.header = comma.helpers.parse_record(
+                csv_text[csv_offsets[0]:csv_offsets[1]], csv_dialect)
+            del csv_offsets[0]
+
+        csv_comma_rows = comma.classes.lazy.CommaLazyRows(
+            text=csv_text,
+            offsets=csv_offsets,
+            dialect=csv_dialect,
+            parent=parent_comma_file,
+        )
+
+    elif storage == STORAGE_COLUMNAR:
+
+        csv_comma_rows = comma.classes.columns.CommaColumnarRows.from_rows(
+            rows=csv_rows_raw,
+            parent=parent_comma_file,
+            column_count=csv_comma_info.get("column_count"),
+            dictionary_encoding=dictionary_encoding,
+        )
+
+        if force_header and csv_header is None and len(csv_comma_rows) > 1:
+            parent_comma_file.header = list(csv_comma_rows[0])
+            del csv_comma_rows[0]
+
+        if infer_types:
+            csv_comma_rows.infer_types()
+
+    else:
+
+        if force_header and csv_header is None and len(csv_rows_raw) > 1:
+            parent_comma_file.header = csv_rows_raw[0]
+            csv_rows_raw = csv_rows_raw[1:]
+
+        def _make_comma_row(csv_row_data):
+            # (the row stores the fields produced by the parser in a tuple,
+            # which is smaller than the list itself)
+            comma_row = comma.classes.row.CommaRow(parent=parent_comma_file)
+            comma_row.data = tuple(csv_row_data)
+            return comma_row
+
+        csv_comma_rows = list(map(_make_comma_row, csv_rows_raw))
+
+    csv_comma_table = comma.classes.table.CommaTable(
+        csv_comma_rows,
+        parent=parent_comma_file
+    )
+
+    return csv_comma_table
+
+
+def _local_path(source: comma.typing.SourceType) -> typing.Optional[str]:
+    """
+    Returns the path of the `source`, if it is a local file.
+    """
+    if type(source) is not str or "\n" in source or "\r" in source:
+        return None
+    return comma.helpers.is_local(location=source)
+
+
+def _load_indexed(
+    source: comma.typing.SourceType,
+    encoding: str = None,
+    force_header: bool = False,
+    delimiters: typing.Optional[typing.Iterable[str]] = None,
+    dialect: typing.Optional[typing.Union[csv.Dialect, str]] = None,
+    has_header: typing.Optional[bool] = None,
+    header: comma.typing.OptionalHeaderType = None,
+) -> comma.classes.table.CommaTable:
+    """
+    Loads a table from the local file `source`, of which the rows are read
+    when accessed thanks to the index of the file (see `load()`).
+    """
+
+    path = _local_path(source)
+    if path is None:
+        raise ValueError("only a local file can be indexed")
+
+    record_index = comma.index.open_index(
+        path=path,
+        encoding=encoding,
+        delimiters=delimiters,
+        dialect=dialect,
+        has_header=has_header,
+    )
+
+    csv_header = record_index.header
+    if header is not None:
+        csv_header = header
+
+    # create CommaFile object
+    parent_comma_file = comma.classes.file.CommaFile(
+        header=csv_header,
+        params=record_index.params,
+    )
+
+    # (the header is read, and the other rows are left as they are)
+    start = 0
+    if force_header and csv_header is None and len(record_index) > 1:
+        parent_comma_file.header = record_index.read_rows(0, 1)[0]
+        start = 1
+
+    csv_comma_rows = comma.classes.lazy.CommaIndexedRows(
+        index=record_index,
+        parent=parent_comma_file,
+        start=start,
+    )
+
+    return comma.classes.table.CommaTable(
+        csv_comma_rows,
+        parent=parent_comma_file
+    )
+
+
+def iterload(
+    source: comma.typing.SourceType,
+    encoding: str = None,
+    force_header: bool = False,
+    delimiters: typing.Optional[typing.Iterable[str]] = None,
+    dialect: typing.Optional[typing.Union[csv.Dialect, str]] = None,
+    has_header: typing.Optional[bool] = None,
+    header: comma.typing.OptionalHeaderType = None,
+) -> typing.Iterator[comma.classes.row.CommaRow]:
+    """
+    Deserializes a table from a CSV/DSV source, but rather than
+    returning a `comma.classes.table.CommaTable`, returns a generator
+    that yields the rows, as `comma.classes.row.CommaRow` objects, one
+    at a time. This makes it possible to process large files without
+    keeping all the parsed rows in memory.
+
+    The dialect and header are detected from a sample of the source
+    exactly as with `comma.methods.load()`, and all the yielded rows
+    share a single parent `comma.classes.file.CommaFile` object (so
+    key-based access works as usual). The `dialect`, `has_header` and
+    `header` can be provided to skip the detection, as with `load()`.
+    """
+
+    if header is not None:
+        header = comma.helpers.validate_header(header)
+        if has_header is None:
+            has_header = False
+
+    # Use the helper method to open the data, but ask it to parse
+    # the rows lazily.
 
     csv_comma_info = comma.helpers.open_csv(
         source=source,
         encoding=encoding,
         delimiters=delimiters,
+        iterate=True,
+        dialect=dialect,
+        has_header=has_header,
     )
 
     if csv_comma_info is None:
@@ -77,10 +402,49 @@ def load(
     csv_rows_raw = csv_comma_info["rows"]
     csv_header = csv_comma_info["header"]
 
+    if header is not None:
+        csv_header = header
+
+    if force_header and csv_header is None:
+        csv_header = next(csv_rows_raw, None)
+
+    # create CommaFile object
+    parent_comma_file = comma.classes.file.CommaFile(
+        header=csv_header,
+        params=csv_comma_info["params"],
+    )
+
+    for csv_row_data in csv_rows_raw:
+        comma_row = comma.classes.row.CommaRow(parent=parent_comma_file)
+        comma_row.data = tuple(csv_row_data)
+        yield comma_row
+
+
+def _make_table(
+    csv_comma_info: comma.typing.CommaInfoType,
+    force_header: bool = False,
+    header: comma.typing.OptionalHeaderType = None,
+    count: typing.Optional[int] = None,
+) -> comma.classes.table.CommaTable:
+    """
+    Returns a `comma.classes.table.CommaTable` containing the rows of
+    `csv_comma_info` (a list), keeping at most `count` of them, once the
+    header has been isolated (as done by `load()`).
+    """
+
+    csv_rows_raw = csv_comma_info["rows"]
+    csv_header = csv_comma_info["header"]
+
+    if header is not None:
+        csv_header = header
+
     if force_header and csv_header is None and len(csv_rows_raw) > 1:
         csv_header = csv_rows_raw[0]
         csv_rows_raw = csv_rows_raw[1:]
 
+    if count is not None:
+        csv_rows_raw = csv_rows_raw[:count]
+
     # create CommaFile object
     parent_comma_file = comma.classes.file.CommaFile(
         header=csv_header,
@@ -88,42 +452,245 @@ def load(
     )
 
     def _make_comma_row(csv_row_data):
-        return comma.classes.row.CommaRow(
-            csv_row_data,
-            parent=parent_comma_file,
+        comma_row = comma.classes.row.CommaRow(parent=parent_comma_file)
+        comma_row.data = tuple(csv_row_data)
+        return comma_row
+
+    return comma.classes.table.CommaTable(
+        list(map(_make_comma_row, csv_rows_raw)),
+        parent=parent_comma_file
+    )
+
+
+def _check_count(n: int):
+    if n < 0:
+        raise ValueError(
+            "the number of rows must be non-negative, not {}".format(n))
+
+
+def count_rows(
+    source: comma.typing.SourceType,
+    encoding: str = None,
+    delimiters: typing.Optional[typing.Iterable[str]] = None,
+    dialect: typing.Optional[typing.Union[csv.Dialect, str]] = None,
+    has_header: typing.Optional[bool] = None,
+) -> typing.Optional[int]:
+    """
+    Returns the number of rows (excluding the header) of a CSV/DSV source,
+    that is, the length of the table that `load()` would return, without
+    parsing the rows: The records are only delimited (taking quoted fields
+    into account). For a local file, this is a scan of the bytes of the
+    file, or even a read of the count stored in its index if the file has
+    been indexed (see `comma.index.count_records()`).
+
+    The `dialect` and `has_header` settings, when provided, are not
+    detected, as with `load()`.
+    """
+
+    path = _local_path(source)
+    if path is not None:
+        try:
+            return comma.index.count_records(
+                path=path,
+                encoding=encoding,
+                delimiters=delimiters,
+                dialect=dialect,
+                has_header=has_header,
+            )
+        except comma.exceptions.CommaException:
+            # (e.g., a compressed file, which is decompressed below)
+            pass
+
+    csv_comma_info = comma.helpers.open_csv(
+        source=source,
+        encoding=encoding,
+        delimiters=delimiters,
+        dialect=dialect,
+        has_header=has_header,
+        lazy=True,
+    )
+
+    if csv_comma_info is None:
+        return
+
+    return len(csv_comma_info["offsets"]) - 1
+
+
+def head(
+    source: comma.typing.SourceType,
+    n: int = 10,
+    encoding: str = None,
+    force_header: bool = False,
+    delimiters: typing.Optional[typing.Iterable[str]] = None,
+    dialect: typing.Optional[typing.Union[csv.Dialect, str]] = None,
+    has_header: typing.Optional[bool] = None,
+    header: comma.typing.OptionalHeaderType = None,
+) -> typing.Optional[comma.classes.table.CommaTable]:
+    """
+    Deserializes the first `n` rows of a table from a CSV/DSV source, and
+    returns them as a `comma.classes.table.CommaTable` (with the same
+    settings as `load()`), but stops reading the source once these rows
+    have been parsed: A local file is decoded and parsed as it is read
+    (see `comma.index.read_head()`), and other sources are parsed one row
+    at a time (as with `iterload()`).
+    """
+
+    _check_count(n)
+
+    if header is not None:
+        header = comma.helpers.validate_header(header)
+        if has_header is None:
+            has_header = False
+
+    # (one more row may be used as the header)
+    count = n + 1 if force_header else n
+
+    csv_comma_info = None
+
+    path = _local_path(source)
+    if path is not None:
+        try:
+            csv_comma_info = comma.index.read_head(
+                path=path,
+                count=count,
+                encoding=encoding,
+                delimiters=delimiters,
+                dialect=dialect,
+                has_header=has_header,
+            )
+        except (comma.exceptions.CommaException, UnicodeError):
+            # (e.g., a compressed file, or an encoding that was not
+            # properly detected from the sample, both handled below)
+            csv_comma_info = None
+
+    if csv_comma_info is None:
+        csv_comma_info = comma.helpers.open_csv(
+            source=source,
+            encoding=encoding,
+            delimiters=delimiters,
+            iterate=True,
+            dialect=dialect,
+            has_header=has_header,
         )
 
-    csv_comma_rows = list(map(_make_comma_row, csv_rows_raw))
+        if csv_comma_info is None:
+            return
 
-    csv_comma_table = comma.classes.table.CommaTable(
-        csv_comma_rows,
-        parent=parent_comma_file
+        csv_rows_iter = csv_comma_info["rows"]
+        csv_comma_info["rows"] = list(itertools.islice(csv_rows_iter, count))
+        csv_rows_iter.close()
+
+    return _make_table(
+        csv_comma_info=csv_comma_info,
+        force_header=force_header,
+        header=header,
+        count=n,
     )
 
-    return csv_comma_table
+
+def tail(
+    source: comma.typing.SourceType,
+    n: int = 10,
+    encoding: str = None,
+    force_header: bool = False,
+    delimiters: typing.Optional[typing.Iterable[str]] = None,
+    dialect: typing.Optional[typing.Union[csv.Dialect, str]] = None,
+    has_header: typing.Optional[bool] = None,
+    header: comma.typing.OptionalHeaderType = None,
+) -> typing.Optional[comma.classes.table.CommaTable]:
+    """
+    Deserializes the last `n` rows of a table from a CSV/DSV source, and
+    returns them as a `comma.classes.table.CommaTable` (with the same
+    settings as `load()`), but only parses these rows: In a local file,
+    the records are found by scanning the bytes of the file backwards from
+    its end (see `comma.index.read_tail()`); in other sources, the records
+    are delimited (see `comma.helpers.index_records()`), and only the last
+    ones are parsed.
+    """
+
+    _check_count(n)
+
+    if header is not None:
+        header = comma.helpers.validate_header(header)
+        if has_header is None:
+            has_header = False
+
+    csv_comma_info = None
+
+    # (with `force_header`, the first record is also needed, so the source
+    # is read from its start)
+    path = _local_path(source)
+    if path is not None and not force_header:
+        try:
+            csv_comma_info = comma.index.read_tail(
+                path=path,
+                count=n,
+                encoding=encoding,
+                delimiters=delimiters,
+                dialect=dialect,
+                has_header=has_header,
+            )
+        except (comma.exceptions.CommaException, UnicodeError):
+            # (e.g., a compressed file, or an encoding that was not
+            # properly detected from the sample, both handled below)
+            csv_comma_info = None
+
+    if csv_comma_info is None:
+        csv_comma_info = comma.helpers.open_csv(
+            source=source,
+            encoding=encoding,
+            delimiters=delimiters,
+            dialect=dialect,
+            has_header=has_header,
+            lazy=True,
+        )
+
+        if csv_comma_info is None:
+            return
+
+        csv_text = csv_comma_info["text"]
+        csv_offsets = csv_comma_info["offsets"]
+        csv_dialect = csv_comma_info["params"]["dialect"]
+
+        # the first record is kept, as it may be used as the header
+        indexes = range(max(0, len(csv_offsets) - 1 - n), len(csv_offsets) - 1)
+        if force_header and header is None and len(indexes) > 0:
+            indexes = [0] + [index for index in indexes if index > 0]
+
+        csv_comma_info["rows"] = [
+            comma.helpers.parse_record(
+                csv_text[csv_offsets[index]:csv_offsets[index + 1]],
+                csv_dialect)
+            for index in indexes
+        ]
+
+    return _make_table(
+        csv_comma_info=csv_comma_info,
+        force_header=force_header,
+        header=header,
+    )
 
 
 # noinspection PyProtectedMember
-def dumps(
+def _prepare_records(
     records: TableType,
     header: comma.typing.OptionalHeaderType = None,
     dialect: typing.Optional[csv.Dialect] = None,
-) -> str:
+) -> typing.Tuple[typing.Iterable, typing.Any, typing.Any, csv.Dialect,
+                   typing.Optional[comma.classes.file.CommaFile]]:
     """
-    Serializes a table, as specified by `records`, into CSV format and returns a
-    string.
-
-    Optionally allows for a user-specified `header`, either to provide a header when
-    the `records` do not have one; or to override existing headers.
-
-    Optionally allows for a user-specified `dialect` (or type `csv.Dialect`), which
-    will default to `comma.helpers.DefaultDialect()`.
+    Validates the `records` to serialize, and fills in the missing settings
+    (the `header` and the `dialect`) with information from the linked parent
+    `CommaFile`, if any, or defaults. Returns a tuple of the records (which,
+    if they were a one-time iterator, are replaced by an equivalent one),
+    the header, the existing header, the dialect and the parent.
     """
 
     # initialization of the variables
 
     parent = None
     existing_header = None
+    first_record = None
 
     # ==============================================================================
     # Try to get linked parent to retrieve metadata
@@ -143,11 +710,22 @@ def dumps(
 
     # CASE 3: `records` is some iterable structure
     elif isinstance(records, typing.Iterable):
-        records = list(records)
-        if (len(records) > 0
-                and hasattr(records[0], "_parent")
-                and isinstance(records[0]._parent, klass_cf)):
-            parent = records[0]._parent
+
+        # only peek at the first record, rather than making a list of all
+        # the records, which may be produced lazily (e.g., by `iterload()`)
+        if isinstance(records, typing.Sequence):
+            first_record = records[0] if len(records) > 0 else None
+        else:
+            records_iter = iter(records)
+            first_record = next(records_iter, None)
+            records = records_iter
+            if first_record is not None:
+                records = itertools.chain([first_record], records_iter)
+
+        if (first_record is not None
+                and hasattr(first_record, "_parent")
+                and isinstance(first_record._parent, klass_cf)):
+            parent = first_record._parent
 
     else:
         # not a `CommaTable`, and not iterable
@@ -161,7 +739,9 @@ def dumps(
     # fill in missing settings with information from linked parent or defaults
 
     try:
-        existing_header = list(records[0].keys())
+        if first_record is None:
+            first_record = records[0]
+        existing_header = list(first_record.keys())
     except AttributeError:
         pass
     except TypeError:
@@ -183,59 +763,163 @@ def dumps(
     if dialect is None:
         dialect = comma.helpers.DefaultDialect()
 
-    # ==============================================================================
+    return records, header, existing_header, dialect, parent
 
-    # in this method we output to a StringIO of which we will recuperate the
-    # output string, using the `StringIO.getvalue()` method.
 
-    output_stream = io.StringIO()
+def _record_values(
+    record: typing.Any,
+    source_names: typing.Optional[typing.List[str]],
+) -> typing.Sequence:
+    """
+    Returns the values of `record` to serialize (before they are adjusted
+    to the width of the header), reading them by position when the record
+    is a plain sequence, and by name (the `source_names`) otherwise.
+    """
+    if isinstance(record, (list, tuple)) and not isinstance(
+            record, comma.classes.row.CommaRow):
+        return record
 
-    # now actually write to the stream
+    if source_names is None:
+        return list(record)
 
-    has_header = (header is not None or existing_header is not None)
+    if hasattr(record, "get"):
+        return [record.get(name, "") for name in source_names]
 
-    if has_header:
-        writer = csv.DictWriter(
-            output_stream,
-            fieldnames=header or existing_header,
-            dialect=dialect,
-        )
-        writer.writeheader()
-    else:
-        writer = csv.writer(
-            output_stream,
-            dialect=dialect,
-        )
+    return [record[name] for name in source_names]
 
-    for record in records:
 
-        # header: possibly user-specified header
-        # existing_header: header from linked parent
+def _write_records(
+    output_stream: typing.IO,
+    records: typing.Iterable,
+    header: typing.Any,
+    existing_header: typing.Any,
+    dialect: csv.Dialect,
+    parent: typing.Optional[comma.classes.file.CommaFile] = None,
+):
+    """
+    Writes the `records`, as prepared by `_prepare_records()`, in CSV format
+    to the `output_stream`, in batches of `DUMP_BATCH_SIZE` rows (so the
+    serialized table is never held in memory as a whole).
+    """
+
+    writer = csv.writer(
+        output_stream,
+        dialect=dialect,
+    )
+
+    fieldnames = header or existing_header
+
+    # without a header, the records are written as they are
+
+    if fieldnames is None:
+        records_iter = iter(records)
+        batch = list(itertools.islice(records_iter, DUMP_BATCH_SIZE))
+        while len(batch) > 0:
+            writer.writerows(batch)
+            batch = list(itertools.islice(records_iter, DUMP_BATCH_SIZE))
+        return
+
+    writer.writerow(fieldnames)
+
+    # header: possibly user-specified header
+    # existing_header: header from linked parent
+    #
+    # The plan, computed once for all records, is that column `j` of the
+    # output (named `header[j]`) contains the field `existing_header[j]` of
+    # the record (if there is such a field, otherwise it is left empty); if
+    # there is no existing header, the records are positional.
+
+    width = len(fieldnames)
+
+    source_names = None
+    if existing_header is not None:
+        source_names = list(existing_header)[:len(header)]
+
+    # the underlying data of a `CommaRow` of the linked parent can be used
+    # directly (when the field names are unique, positions and names agree)
+
+    rows_by_position = (
+        parent is not None and
+        (source_names is None or len(set(source_names)) == len(source_names))
+    )
+
+    klass_cr = comma.classes.row.CommaRow
+
+    def make_line(record):
+        if (rows_by_position and
+                type(record) is klass_cr and
+                record._parent is parent and
+                not record._slice_list):
+            values = record.data
+        else:
+            values = _record_values(record, source_names)
+
+        # adjust the values to the width of the header
+        if len(values) > width:
+            return values[:width]
+        if len(values) < width:
+            return list(values) + [""] * (width - len(values))
+        return values
+
+    lines = map(make_line, records)
+    batch = list(itertools.islice(lines, DUMP_BATCH_SIZE))
+    while len(batch) > 0:
+        writer.writerows(batch)
+        batch = list(itertools.islice(lines, DUMP_BATCH_SIZE))
+
+
+class _TeeStream:
+    """
+    A minimal write-only stream that forwards everything written to it to
+    several underlying `streams`.
+    """
+
+    def __init__(self, *streams: typing.IO):
+        self._streams = streams
+
+    def write(self, s: str) -> int:
+        for stream in self._streams:
+            stream.write(s)
+        return len(s)
+
+
+def dumps(
+    records: TableType,
+    header: comma.typing.OptionalHeaderType = None,
+    dialect: typing.Optional[csv.Dialect] = None,
+) -> str:
+    """
+    Serializes a table, as specified by `records`, into CSV format and returns a
+    string.
 
-        # CASE 1: If there were no headers besides the user-specified one,
-        # convert the list records into dict records.
+    Optionally allows for a user-specified `header`, either to provide a header when
+    the `records` do not have one; or to override existing headers.
 
-        if existing_header is None and header is not None:
-            new_record = dict()
-            for i in range(len(record)):
-                new_record[header[i]] = record[i]
-            record = new_record
+    Optionally allows for a user-specified `dialect` (or type `csv.Dialect`), which
+    will default to `comma.helpers.DefaultDialect()`.
+    """
 
-        # CASE 2: If the user-specified headers are different than the ones the
-        # linked parent knows about, then we need to rename the fields before
-        # writing this row
+    records, header, existing_header, dialect, parent = _prepare_records(
+        records=records,
+        header=header,
+        dialect=dialect,
+    )
 
-        elif existing_header != header:
-            new_record = dict()
-            for field_orig, field_renamed in zip(existing_header, header):
-                new_record[field_renamed] = record[field_orig]
-            record = new_record
+    # in this method we output to a StringIO of which we will recuperate the
+    # output string, using the `StringIO.getvalue()` method.
 
-        writer.writerow(record)
+    output_stream = io.StringIO()
 
-    ret = output_stream.getvalue()
+    _write_records(
+        output_stream=output_stream,
+        records=records,
+        header=header,
+        existing_header=existing_header,
+        dialect=dialect,
+        parent=parent,
+    )
 
-    return ret
+    return output_stream.getvalue()
 
 
 def dump(
@@ -244,7 +928,7 @@ def dump(
     fp: typing.Optional[typing.IO] = None,
     header: comma.typing.OptionalHeaderType = None,
     dialect: typing.Optional[csv.Dialect] = None,
-    no_echo: bool = False,
+    no_echo: typing.Optional[bool] = None,
 ) -> typing.Optional[str]:
     """
     Serializes a table, as specified by `records`, into CSV format and outputs
@@ -259,41 +943,69 @@ def dump(
 
     The option `no_echo` prevents the method from returning the serialized table
     when it has been output to a file or a stream.
+
+    The rows are written directly to the file or stream. Unless `no_echo` is
+    specified, the serialized table written to a (regular) file is then read
+    back from it, rather than collected in a string while it is written, so
+    that it is only held in memory once; setting `no_echo` to `True` avoids
+    holding it in memory at all.
     """
 
-    # use our `dumps()` method to compute the actual output string
+    # figure out how to output the result
 
-    csv_str = dumps(
+    if fp is None and filename is None:
+        return dumps(
+            records=records,
+            header=header,
+            dialect=dialect,
+        )
+
+    # prepare the records before opening the file, so that invalid records
+    # do not leave an empty file behind
+
+    records, header, existing_header, dialect, parent = _prepare_records(
         records=records,
         header=header,
         dialect=dialect,
     )
 
-    # figure out how to output the result
-
     output_stream = fp
     close_at_end = False
     if output_stream is None:
         close_at_end = True
-        if filename is None:
-            output_stream = None  # io.StringIO()
-        else:
-            output_stream = open(filename, "w")
+        output_stream = open(filename, "w")
 
-    # if we've got a stream to write to, write to it
+    # unless `no_echo` is `True`, the output is also returned: If `no_echo`
+    # is not specified, a (regular) file is read back once written, and
+    # otherwise the output is collected in a string as it is written
 
-    if output_stream is not None:
+    read_back = (no_echo is None and close_at_end and
+                 os.path.isfile(filename))
 
-        output_stream.write(csv_str)
+    echo_stream = None
+    writer_stream = output_stream
+    if not no_echo and not read_back:
+        echo_stream = io.StringIO()
+        writer_stream = _TeeStream(output_stream, echo_stream)
 
+    try:
+        _write_records(
+            output_stream=writer_stream,
+            records=records,
+            header=header,
+            existing_header=existing_header,
+            dialect=dialect,
+            parent=parent,
+        )
+    finally:
         if close_at_end:
             output_stream.close()
 
-        if no_echo:
-            return
-
-    # unless `no_echo` is `True` and we are writing to a stream,
-    # return the value as a string
+    if read_back:
+        with open(filename, newline="") as input_stream:
+            return input_stream.read()
 
-    return csv_str
+    if echo_stream is None:
+        return
 
+    return echo_stream.getvalue()
@@ -0,0 +1,324 @@
+import codecs
+import concurrent.futures
+import csv
+import importlib
+import io
+import os
+import typing
+import zipfile
+
+import comma.cache
+import comma.helpers
+import comma.typing
+
+
+__author__ = "Jérémie Lumbroso <lumbroso@cs.princeton.edu>"
+
+__all__ = [
+    "PARALLEL_MIN_CHUNKSIZE",
+    "DIALECT_ATTRIBUTES",
+
+    "is_splittable_encoding",
+    "dialect_to_dict",
+    "find_record_boundaries",
+    "parse_chunk",
+    "open_csv_parallel",
+]
+
+
+# smallest number of bytes that is worth parsing in a separate process
+PARALLEL_MIN_CHUNKSIZE = 1 << 20
+
+# the attributes that define a `csv.Dialect` (which are passed to the worker
+# processes rather than the dialect object itself, which cannot be pickled)
+DIALECT_ATTRIBUTES = [
+    "delimiter",
+    "doublequote",
+    "escapechar",
+    "lineterminator",
+    "quotechar",
+    "quoting",
+    "skipinitialspace",
+    "strict",
+]
+
+
+def is_splittable_encoding(encoding: str) -> bool:
+    """
+    Checks whether a file encoded with `encoding` can be split at the byte
+    level on newlines and quote characters: This is the case of UTF-8 (in
+    which the bytes of ASCII characters never appear within a multi-byte
+    character) and of single-byte ASCII-compatible encodings, but not of
+    UTF-16 or of stateful encodings for instance.
+    """
+    try:
+        name = codecs.lookup(encoding).name
+    except (LookupError, TypeError):
+        return False
+
+    if name in ("utf-8", "utf-8-sig", "ascii", "iso8859-1"):
+        return True
+
+    # single-byte encodings are the codecs defined by a decoding table
+    try:
+        module = importlib.import_module(
+            "encodings.{}".format(name.replace("-", "_")))
+        ascii_compatible = "\n\"'".encode(name) == b"\n\"'"
+    except (ImportError, UnicodeError):
+        return False
+
+    return hasattr(module, "decoding_table") and ascii_compatible
+
+
+def dialect_to_dict(dialect: csv.Dialect) -> typing.Dict[str, typing.Any]:
+    """
+    Returns the attributes of `dialect`, as a dictionary of the formatting
+    parameters of `csv.reader()`.
+    """
+    return {
+        name: getattr(dialect, name)
+        for name in DIALECT_ATTRIBUTES
+        if hasattr(dialect, name)
+    }
+
+
+def find_record_boundaries(
+    source: typing.BinaryIO,
+    size: int,
+    count: int,
+    quotechar: typing.Optional[bytes] = b'"',
+    chunksize: typing.Optional[int] = None,
+) -> typing.List[int]:
+    """
+    Returns the offsets at which the binary stream `source`, of `size` bytes,
+    can be split into (at most) `count` chunks of roughly equal size, such
+    that each chunk contains complete records: The stream is split after a
+    newline, provided the number of `quotechar` before it is even (so that
+    the newline is not within a quoted field). The returned list starts
+    with `0` and ends with `size`.
+
+    The stream is scanned once, by chunks of `chunksize` bytes (by default,
+    `comma.helpers.DECODE_CHUNKSIZE`).
+    """
+
+    if chunksize is None:
+        chunksize = comma.helpers.DECODE_CHUNKSIZE
+
+    targets = iter([size * i // count for i in range(1, count)])
+    target = next(targets, None)
+
+    boundaries = [0]
+    quotes = 0
+
+    source.seek(0)
+    block_start = 0
+
+    while target is not None:
+
+        block = source.read(chunksize)
+        if not block:
+            break
+
+        cursor = 0
+        running = quotes
+
+        while target is not None:
+            start = max(target - block_start, cursor)
+            if start >= len(block):
+                break
+
+            position = block.find(b"\n", start)
+            if position == -1:
+                break
+
+            if quotechar is not None:
+                running += block.count(quotechar, cursor, position + 1)
+            cursor = position + 1
+
+            if running % 2 == 0:
+                boundary = block_start + position + 1
+                if boundary < size:
+                    boundaries.append(boundary)
+
+                # skip the targets that fall within the chunk just delimited
+                while target is not None and target < boundary:
+                    target = next(targets, None)
+
+        if quotechar is not None:
+            running += block.count(quotechar, cursor)
+
+        quotes = running
+        block_start += len(block)
+
+    boundaries.append(size)
+
+    return boundaries
+
+
+def parse_chunk(
+    path: str,
+    start: int,
+    end: int,
+    encoding: str,
+    dialect_params: typing.Dict[str, typing.Any],
+) -> typing.List[typing.List[str]]:
+    """
+    Parses the records contained in the bytes `start` to `end` of the local
+    file `path`, decoded with `encoding` (with newlines normalized, as done
+    by `comma.helpers.decode_stream()`), and returns them as a list of rows.
+    This is the function run by the worker processes.
+    """
+    with open(path, mode="rb") as source:
+        source.seek(start)
+        data = source.read(end - start)
+
+    decoder = io.IncrementalNewlineDecoder(
+        decoder=codecs.getincrementaldecoder(encoding)(),
+        translate=True)
+    text = decoder.decode(data, final=True)
+
+    return list(csv.reader(io.StringIO(text), **dialect_params))
+
+
+def open_csv_parallel(
+    source: comma.typing.SourceType,
+    encoding: str = None,
+    delimiters: typing.Optional[typing.Iterable[str]] = None,
+    workers: int = 2,
+    min_chunksize: int = PARALLEL_MIN_CHUNKSIZE,
+    dialect: typing.Optional[typing.Union[csv.Dialect, str]] = None,
+    has_header: typing.Optional[bool] = None,
+) -> comma.typing.CommaInfoType:
+    """
+    Returns a `CommaInfoType` typed dictionary containing the data and
+    metadata related to a CSV file, as `comma.helpers.open_csv()` does, but
+    parses the file with `workers` processes: The file is split at record
+    boundaries into chunks (of at least `min_chunksize` bytes), which are
+    parsed in parallel, and then reassembled in order.
+
+    This only applies to local files, in an encoding that can be split at
+    the byte level (see `is_splittable_encoding()`), with a dialect that
+    does not use an escape character; other sources are parsed by
+    `comma.helpers.open_csv()`.
+    """
+
+    def _open_csv_serial():
+        return comma.helpers.open_csv(
+            source=source,
+            encoding=encoding,
+            delimiters=delimiters,
+            dialect=dialect,
+            has_header=has_header)
+
+    # only local (uncompressed) files can be split
+
+    if type(source) is not str or "\n" in source or "\r" in source:
+        return _open_csv_serial()
+
+    path = comma.helpers.is_local(location=source)
+    if path is None or zipfile.is_zipfile(path):
+        return _open_csv_serial()
+
+    size = os.path.getsize(path)
+
+    # get a sample, detect the encoding and analyze
+
+    with open(path, mode="rb") as stream:
+        # (a character is at most four bytes)
+        sample_bytes = stream.read(4 * comma.helpers.MAX_SAMPLE_CHUNKSIZE)
+
+    if encoding is None:
+        encoding = comma.cache.detect_encoding(
+            sample_bytes[:comma.helpers.MAX_SAMPLE_CHUNKSIZE])
+
+    if not is_splittable_encoding(encoding):
+        return _open_csv_serial()
+
+    try:
+        decoder = io.IncrementalNewlineDecoder(
+            decoder=codecs.getincrementaldecoder(encoding)(),
+            translate=True)
+        csv_sample = decoder.decode(sample_bytes, final=len(sample_bytes) == size)
+    except UnicodeError:
+        return _open_csv_serial()
+
+    csv_sample = csv_sample[:comma.helpers.MAX_SAMPLE_CHUNKSIZE]
+
+    csv_params = comma.helpers.detect_csv_params(
+        sample=csv_sample,
+        delimiters=delimiters,
+        dialect=dialect,
+        has_header=has_header)
+
+    dialect = csv_params["dialect"]
+    dialect_params = dialect_to_dict(dialect)
+
+    # with an escape character, quotes may not come in pairs
+    if dialect.escapechar is not None and dialect.quoting != csv.QUOTE_NONE:
+        return _open_csv_serial()
+
+    quotechar = None
+    if dialect.quoting != csv.QUOTE_NONE and dialect.quotechar is not None:
+        quotechar = dialect.quotechar.encode(encoding)
+
+    # split the file into chunks of records
+
+    count = max(1, min(workers, size // max(1, min_chunksize)))
+
+    with open(path, mode="rb") as stream:
+        boundaries = find_record_boundaries(
+            source=stream,
+            size=size,
+            count=count,
+            quotechar=quotechar)
+
+    chunks = list(zip(boundaries[:-1], boundaries[1:]))
+
+    # parse the chunks (in order)
+
+    try:
+        if len(chunks) <= 1:
+            csv_rows_chunks = [
+                parse_chunk(path, start, end, encoding, dialect_params)
+                for start, end in chunks
+            ]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=min(workers, len(chunks))) as executor:
+                csv_rows_chunks = list(executor.map(
+                    parse_chunk,
+                    *zip(*[
+                        (path, start, end, encoding, dialect_params)
+                        for start, end in chunks
+                    ])))
+    except UnicodeError:
+        # the encoding detected on the sample does not apply to the whole
+        # file: let the serial method try other encodings
+        return _open_csv_serial()
+
+    csv_rows = [row for csv_rows_chunk in csv_rows_chunks for row in csv_rows_chunk]
+
+    data = {
+        "params": csv_params,
+        "sample": csv_sample,
+        "header": None,
+        "source": source,
+        "rows": csv_rows,
+    }
+
+    # isolate the headers if they exist
+    if data["params"].get("has_header", False):
+
+        if len(csv_rows) == 0:
+            data["params"]["has_header"] = False
+            data["column_count"] = 0
+
+        else:
+            data["header"] = csv_rows[0]
+            data["rows"] = csv_rows[1:]
+            data["column_count"] = len(data["header"])
+
+    if len(csv_rows) > 0 and "column_count" not in data:
+        data["column_count"] = max(map(len, csv_rows))
+
+    return data
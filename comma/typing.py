@@ -98,4 +98,9 @@ CommaInfoType = TypedDict(
         # CSV parameters
         "header": typing.Optional[typing.List[str]],
         "params": CommaInfoParamsType,
+
+        # (when the rows are parsed lazily) the decoded text of the CSV
+        # file, and the offsets of its records
+        "text": str,
+        "offsets": typing.Sequence[int],
     })
@@ -0,0 +1,288 @@
+import copy
+
+import pytest
+
+import comma
+import comma.classes.columns
+import comma.classes.file
+import comma.classes.row
+import comma.exceptions
+
+
+# noinspection PyProtectedMember
+class TestCommaColumnarRows:
+
+    SOME_HEADER = ["col1", "col2", "col3"]
+    SOME_DATA_ROWS = [
+        ["rowAcol1", "rowAcol2", "rowAcol3"],
+        ["rowBcol1", "rowBcol2", "rowBcol3"],
+    ]
+    SOME_CSV_STRING = "\n".join(
+        map(",".join, [SOME_HEADER] + SOME_DATA_ROWS)) + "\n"
+    SOME_STRING = "some string"
+
+    @pytest.fixture()
+    def columnar_rows(self):
+        parent = comma.classes.file.CommaFile(header=self.SOME_HEADER)
+        return comma.classes.columns.CommaColumnarRows.from_rows(
+            rows=copy.deepcopy(self.SOME_DATA_ROWS),
+            parent=parent)
+
+    @pytest.fixture()
+    def columnar_table(self):
+        return comma.load(self.SOME_CSV_STRING, storage="columnar")
+
+    def test_from_rows(self, columnar_rows):
+        assert len(columnar_rows) == len(self.SOME_DATA_ROWS)
+        assert columnar_rows == self.SOME_DATA_ROWS
+        assert columnar_rows.column(0) == [
+            row[0] for row in self.SOME_DATA_ROWS]
+
+    def test_row_views(self, columnar_rows):
+        row = columnar_rows[1]
+        assert isinstance(row, comma.classes.row.CommaRow)
+        assert row == self.SOME_DATA_ROWS[1]
+        assert row["col2"] == "rowBcol2"
+        assert dict(row.items()) == dict(zip(
+            self.SOME_HEADER, self.SOME_DATA_ROWS[1]))
+        assert list(row[1:]) == self.SOME_DATA_ROWS[1][1:]
+
+        # writes go through to the columns
+        row["col3"] = self.SOME_STRING
+        assert columnar_rows.column(2)[1] == self.SOME_STRING
+
+        with pytest.raises(comma.exceptions.CommaBatchException):
+            row.append(self.SOME_STRING)
+
+    def test_ragged_rows(self):
+        obj = comma.classes.columns.CommaColumnarRows.from_rows(
+            rows=[["a", "b"], ["c"], ["d", "e", "f"]])
+        assert obj == [["a", "b", ""], ["c", "", ""], ["d", "e", "f"]]
+
+    def test_extend(self, columnar_rows):
+        columnar_rows.extend([["a"], ["b", "c", "d", "e"]])
+        assert columnar_rows[-2] == ["a", "", "", ""]
+        assert columnar_rows[-1] == ["b", "c", "d", "e"]
+        assert columnar_rows[0] == self.SOME_DATA_ROWS[0] + [""]
+
+    def test_structural_changes(self, columnar_rows):
+        columnar_rows.append(["x1", "x2", "x3"])
+        columnar_rows.insert(0, ["y1", "y2", "y3"])
+        assert len(columnar_rows) == 4
+        assert columnar_rows[0] == ["y1", "y2", "y3"]
+        assert columnar_rows[-1] == ["x1", "x2", "x3"]
+
+        del columnar_rows[0]
+        columnar_rows[0] = ["z1", "z2", "z3"]
+        assert columnar_rows[0] == ["z1", "z2", "z3"]
+        assert columnar_rows.column(1) == ["z2", "rowBcol2", "x2"]
+
+        with pytest.raises(IndexError):
+            columnar_rows[10]
+
+    def test_reverse(self, columnar_rows):
+        columnar_rows.append(["x1", "x2", "x3"])
+        columnar_rows.reverse()
+        assert columnar_rows == [["x1", "x2", "x3"]] + self.SOME_DATA_ROWS[::-1]
+
+    def test_pop(self, columnar_rows):
+        row = columnar_rows.pop(0)
+        assert row == self.SOME_DATA_ROWS[0]
+        assert row["col2"] == "rowAcol2"
+        assert columnar_rows == self.SOME_DATA_ROWS[1:]
+
+        assert columnar_rows.pop() == self.SOME_DATA_ROWS[1]
+        assert len(columnar_rows) == 0
+        with pytest.raises(IndexError):
+            columnar_rows.pop()
+
+    def test_sort(self, columnar_rows):
+        columnar_rows.append(["rowCcol1", "a", "z"])
+        columnar_rows.sort(reverse=True)
+        assert columnar_rows == [
+            ["rowCcol1", "a", "z"]] + self.SOME_DATA_ROWS[::-1]
+
+        columnar_rows.sort(key=lambda row: row["col2"])
+        assert columnar_rows == [
+            ["rowCcol1", "a", "z"]] + self.SOME_DATA_ROWS
+
+    def test_concatenate(self, columnar_table):
+        table = columnar_table + columnar_table
+        assert table.is_columnar
+        assert table == self.SOME_DATA_ROWS * 2
+
+        # the original table is unchanged
+        assert columnar_table == self.SOME_DATA_ROWS
+        table[0]["col1"] = self.SOME_STRING
+        assert columnar_table[0]["col1"] == "rowAcol1"
+
+        assert columnar_table.data + [["x", "y", "z"]] == (
+            self.SOME_DATA_ROWS + [["x", "y", "z"]])
+        assert [["x", "y", "z"]] + columnar_table.data == (
+            [["x", "y", "z"]] + self.SOME_DATA_ROWS)
+
+    def test_clear(self, columnar_table):
+        columnar_table.clear()
+        assert len(columnar_table) == 0
+        assert columnar_table.header == self.SOME_HEADER
+
+    def test_deepcopy_row(self, columnar_rows):
+        row_copy = copy.deepcopy(columnar_rows[0])
+        row_copy[0] = self.SOME_STRING
+        assert columnar_rows[0][0] == self.SOME_DATA_ROWS[0][0]
+
+    def test_load_columnar(self, columnar_table):
+        reference_table = comma.load(self.SOME_CSV_STRING)
+
+        assert columnar_table.is_columnar
+        assert not reference_table.is_columnar
+        assert columnar_table.header == reference_table.header
+        assert list(columnar_table) == list(reference_table)
+        assert columnar_table.dump() == reference_table.dump()
+
+    def test_load_invalid_storage(self):
+        with pytest.raises(ValueError):
+            comma.load(self.SOME_CSV_STRING, storage=self.SOME_STRING)
+
+    def test_load_columnar_force_header(self):
+        table = comma.load("a,a,a\na,a,a\na,a,a", storage="columnar",
+                           force_header=True)
+        assert table.has_header
+        assert len(table) == 2
+
+    def test_column_slice_zero_copy(self, columnar_table):
+        column = columnar_table["col1"]
+        assert column == [row[0] for row in self.SOME_DATA_ROWS]
+        assert column._column is columnar_table.data.column(0)
+
+        column[0] = self.SOME_STRING
+        assert columnar_table[0]["col1"] == self.SOME_STRING
+
+        column[1:] = [self.SOME_STRING.upper()]
+        assert columnar_table[1]["col1"] == self.SOME_STRING.upper()
+        assert list(column[1:]) == [self.SOME_STRING.upper()]
+
+    def test_column_slice_deep_copy(self, columnar_table):
+        backup_sdcd = comma.settings.SLICE_DEEP_COPY_DATA
+        comma.settings.SLICE_DEEP_COPY_DATA = True
+
+        column = columnar_table["col1"]
+        column[0] = self.SOME_STRING
+        assert columnar_table[0]["col1"] == self.SOME_DATA_ROWS[0][0]
+
+        comma.settings.SLICE_DEEP_COPY_DATA = backup_sdcd
+
+    def test_primary_key_columnar(self, columnar_table):
+        columnar_table.primary_key = "col1"
+        assert columnar_table["rowBcol1"] == self.SOME_DATA_ROWS[1]
+
+
+class TestCommaEncodedColumn:
+
+    SOME_VALUES = ["FR", "US", "FR", "DE", "FR"]
+    SOME_STRING = "some string"
+
+    SOME_CSV_STRING = "id,country,status\n" + "".join(
+        "{},{},{}\n".format(i, ["FR", "US", "DE"][i % 3], ["on", "off"][i % 2])
+        for i in range(100))
+
+    @pytest.fixture()
+    def encoded_column(self):
+        return comma.classes.columns.CommaEncodedColumn.from_values(
+            self.SOME_VALUES)
+
+    @pytest.fixture()
+    def encoded_table(self):
+        return comma.load(self.SOME_CSV_STRING, dictionary_encoding=True)
+
+    def test_from_values(self, encoded_column):
+        assert encoded_column == self.SOME_VALUES
+        assert encoded_column.vocabulary == ["FR", "US", "DE"]
+        assert list(encoded_column.codes) == [0, 1, 0, 2, 0]
+        assert encoded_column.codes.itemsize == 1
+
+    def test_lookups(self, encoded_column):
+        assert encoded_column.count("FR") == 3
+        assert encoded_column.count(self.SOME_STRING) == 0
+        assert encoded_column.index("DE") == 3
+        assert encoded_column.index("FR", 1) == 2
+        assert encoded_column.indexes("FR") == [0, 2, 4]
+        assert "US" in encoded_column
+        assert self.SOME_STRING not in encoded_column
+        with pytest.raises(ValueError):
+            encoded_column.index(self.SOME_STRING)
+
+    def test_modifications(self, encoded_column):
+        encoded_column[0] = self.SOME_STRING
+        encoded_column.append("US")
+        encoded_column.insert(0, "DE")
+        del encoded_column[-2]
+        encoded_column[1:3] = ["FR", "FR"]
+
+        assert encoded_column == ["DE", "FR", "FR", "FR", "DE", "US"]
+        assert encoded_column.code(self.SOME_STRING) == 3
+
+    def test_codes_widened(self):
+        column = comma.classes.columns.CommaEncodedColumn.from_values(["a"])
+        for i in range(300):
+            column.append(str(i))
+
+        assert column.codes.itemsize == 2
+        assert column[-1] == "299"
+        assert len(column) == 301
+
+    def test_slice_shares_vocabulary(self, encoded_column):
+        column_slice = encoded_column[1:]
+        assert column_slice == self.SOME_VALUES[1:]
+        assert column_slice.vocabulary is encoded_column.vocabulary
+        assert column_slice == encoded_column[1:]
+        assert column_slice != encoded_column[:-1]
+
+    def test_load_dictionary_encoding(self, encoded_table):
+        columns = encoded_table.data.columns
+        assert not isinstance(
+            columns[0], comma.classes.columns.CommaEncodedColumn)
+        assert isinstance(
+            columns[1], comma.classes.columns.CommaEncodedColumn)
+        assert isinstance(
+            columns[2], comma.classes.columns.CommaEncodedColumn)
+
+        table = comma.load(self.SOME_CSV_STRING)
+        assert encoded_table == table
+        assert encoded_table.dtypes == table.dtypes
+        assert comma.dumps(encoded_table) == comma.dumps(table)
+
+        encoded_table[0]["country"] = self.SOME_STRING
+        assert encoded_table["country"][0] == self.SOME_STRING
+
+    def test_load_dictionary_encoding_requires_columnar(self):
+        with pytest.raises(ValueError):
+            comma.load(self.SOME_CSV_STRING, dictionary_encoding=True,
+                       storage="rows")
+
+    def test_field_slice(self, encoded_table):
+        country = encoded_table["country"]
+
+        assert country.count("FR") == 34
+        assert country.index("US") == 1
+        assert "DE" in country
+        assert country.indexes("DE") == list(range(2, 100, 3))
+        assert country == encoded_table["country"]
+        assert country != encoded_table["status"]
+
+        table = comma.load(self.SOME_CSV_STRING)
+        assert table["country"].indexes("DE") == country.indexes("DE")
+
+    def test_memory_usage(self, encoded_table):
+        table = comma.load(self.SOME_CSV_STRING, storage="columnar")
+
+        usage = table.memory_usage()
+        encoded_usage = encoded_table.memory_usage()
+
+        assert list(usage) == ["id", "country", "status"]
+        assert encoded_usage["id"] == usage["id"]
+        assert encoded_usage["country"] < usage["country"]
+        assert encoded_usage["status"] < usage["status"]
+
+        rows_usage = comma.load(self.SOME_CSV_STRING).memory_usage()
+        assert list(rows_usage) == list(usage)
@@ -224,3 +224,34 @@ class TestCommaFile:
         assert comma_file_with_header.header is not None
         comma_file_with_header.header = None
         assert comma_file_with_header.header is None
+
+    def test_column_index(self, comma_file_with_header):
+        for index, field_name in enumerate(self.SOME_HEADER):
+            assert comma_file_with_header.column_index(field_name) == index
+            assert comma_file_with_header.has_column(field_name)
+
+        assert not comma_file_with_header.has_column(self.SOME_OTHER_STRING)
+        with pytest.raises(comma.exceptions.CommaKeyError):
+            comma_file_with_header.column_index(self.SOME_OTHER_STRING)
+
+    def test_column_index_no_header(self, comma_file):
+        assert not comma_file.has_column(self.SOME_HEADER[0])
+        with pytest.raises(comma.exceptions.CommaNoHeaderException):
+            comma_file.column_index(self.SOME_HEADER[0])
+
+    def test_column_index_duplicates(self, comma_file):
+        comma_file.header = ["a", "b", "a"]
+        assert comma_file.column_index("a") == 0
+
+    def test_column_index_header_change(self, comma_file_with_header):
+        comma_file_with_header.header = list(reversed(self.SOME_HEADER))
+        assert comma_file_with_header.column_index(self.SOME_HEADER[0]) == 2
+
+        del comma_file_with_header.header
+        assert not comma_file_with_header.has_column(self.SOME_HEADER[0])
+
+    def test_mark_modified(self, comma_file):
+        assert comma_file.modifications == 0
+        comma_file.mark_modified()
+        comma_file.mark_modified()
+        assert comma_file.modifications == 2
@@ -0,0 +1,202 @@
+import csv
+
+import pytest
+
+import comma
+import comma.classes.lazy
+import comma.classes.row
+import comma.helpers
+
+
+class TestIndexRecords:
+
+    @pytest.mark.parametrize("text", [
+        "",
+        "a,b\n",
+        "a,b\n1,2",
+        "a,b\r\n1,2\r\n",
+        'a,b\n1,"multi\nline"\n3,4\n',
+        'a,b\n1,"with ""quotes"" and\nnewline"\n3,4\n',
+        'a,b\n5",6\n7,8\n',
+        'a,b\n\n1,2\n',
+    ])
+    def test_records_match_csv_reader(self, text):
+        dialect = csv.excel
+        offsets = comma.helpers.index_records(text, dialect)
+
+        assert offsets[0] == 0
+        assert offsets[-1] == len(text)
+
+        records = [
+            comma.helpers.parse_record(text[start:end], dialect)
+            for start, end in zip(offsets[:-1], offsets[1:])
+        ]
+        assert records == list(csv.reader(
+            text.splitlines(keepends=True), dialect=dialect))
+
+    @pytest.mark.parametrize("text", [
+        'a, b\nx, "multi\nline"\ny,  "c, d"\n',
+        '  "multi\nline", x\n"a",b\n',
+        'a, b "c\nd, e\n',
+    ])
+    def test_skipinitialspace(self, text):
+        dialect = comma.helpers.DefaultDialect.override(skipinitialspace=True)
+        offsets = comma.helpers.index_records(text, dialect)
+
+        records = [
+            comma.helpers.parse_record(text[start:end], dialect)
+            for start, end in zip(offsets[:-1], offsets[1:])
+        ]
+        assert records == list(csv.reader(
+            text.splitlines(keepends=True), dialect=dialect))
+
+    def test_escapechar(self):
+        dialect = comma.helpers.DefaultDialect.override(
+            doublequote=False, escapechar="\\")
+        text = 'a,"b\\"\n"\nc,d\n'
+        offsets = comma.helpers.index_records(text, dialect)
+        assert len(offsets) == 3
+        assert comma.helpers.parse_record(
+            text[offsets[0]:offsets[1]], dialect) == ["a", 'b"\n']
+
+
+class TestCommaLazyRows:
+
+    SOME_HEADER = ["col1", "col2", "col3"]
+    SOME_DATA_ROWS = [
+        ["row{}col{}".format(i, j) for j in range(1, 4)]
+        for i in range(20)
+    ]
+    SOME_CSV_STRING = "\n".join(
+        map(",".join, [SOME_HEADER] + SOME_DATA_ROWS)) + "\n"
+
+    @staticmethod
+    def make_rows(csv_string, maxsize=None):
+        offsets = comma.helpers.index_records(csv_string, csv.excel)
+        return comma.classes.lazy.CommaLazyRows(
+            text=csv_string,
+            offsets=offsets,
+            dialect=csv.excel,
+            maxsize=maxsize)
+
+    @pytest.fixture()
+    def lazy_rows(self):
+        data_string = self.SOME_CSV_STRING.split("\n", 1)[1]
+        return self.make_rows(data_string, maxsize=4)
+
+    def test_rows_are_parsed_on_access(self, lazy_rows):
+        assert len(lazy_rows) == len(self.SOME_DATA_ROWS)
+        assert lazy_rows.materialized_count == 0
+
+        row = lazy_rows[3]
+        assert isinstance(row, comma.classes.row.CommaRow)
+        assert row == self.SOME_DATA_ROWS[3]
+        assert lazy_rows[-1] == self.SOME_DATA_ROWS[-1]
+        assert lazy_rows.materialized_count == 2
+
+    def test_equal_to_eager(self, lazy_rows):
+        assert lazy_rows == self.SOME_DATA_ROWS
+        assert lazy_rows[2:5] == self.SOME_DATA_ROWS[2:5]
+
+    def test_cache_is_bounded(self, lazy_rows):
+        for _ in lazy_rows:
+            pass
+        assert lazy_rows.materialized_count <= lazy_rows.maxsize
+
+    def test_index_out_of_range(self, lazy_rows):
+        with pytest.raises(IndexError):
+            _ = lazy_rows[len(self.SOME_DATA_ROWS)]
+
+    def test_referenced_row_is_kept(self, lazy_rows):
+        row = lazy_rows[0]
+        for i in range(1, len(lazy_rows)):
+            _ = lazy_rows[i]
+        assert lazy_rows[0] is row
+
+    def test_modified_row_survives_eviction(self, lazy_rows):
+        lazy_rows[0][1] = "changed"
+        for i in range(1, len(lazy_rows)):
+            _ = lazy_rows[i]
+        assert lazy_rows[0][1] == "changed"
+
+    def test_setitem(self, lazy_rows):
+        lazy_rows[5] = ["a", "b", "c"]
+        for i in range(len(lazy_rows)):
+            _ = lazy_rows[i]
+        assert lazy_rows[5] == ["a", "b", "c"]
+
+    def test_append_stays_lazy(self, lazy_rows):
+        lazy_rows.append(["a", "b", "c"])
+        assert len(lazy_rows) == len(self.SOME_DATA_ROWS) + 1
+        assert lazy_rows[-1] == ["a", "b", "c"]
+        assert lazy_rows.materialized_count == 1
+
+    def test_structural_change_materializes(self, lazy_rows):
+        lazy_rows[0][0] = "changed"
+        lazy_rows.insert(1, ["a", "b", "c"])
+        del lazy_rows[2]
+        assert lazy_rows.materialized_count == len(self.SOME_DATA_ROWS)
+        assert lazy_rows[0][0] == "changed"
+        assert lazy_rows[1] == ["a", "b", "c"]
+        assert lazy_rows[2:] == self.SOME_DATA_ROWS[2:]
+
+    def test_load(self):
+        table = comma.load(
+            self.SOME_CSV_STRING, storage="lazy", has_header=True)
+        eager_table = comma.load(self.SOME_CSV_STRING, has_header=True)
+
+        assert isinstance(table.data, comma.classes.lazy.CommaLazyRows)
+        assert table.header == self.SOME_HEADER
+        assert table[4]["col2"] == "row4col2"
+        assert table.data.materialized_count == 1
+
+        assert table == eager_table
+        assert comma.dumps(table) == comma.dumps(eager_table)
+
+    def test_load_force_header(self):
+        data_string = self.SOME_CSV_STRING.split("\n", 1)[1]
+        table = comma.load(
+            data_string, storage="lazy", force_header=True,
+            dialect="excel", has_header=False)
+        assert table.header == self.SOME_DATA_ROWS[0]
+        assert len(table) == len(self.SOME_DATA_ROWS) - 1
+        assert table[0] == self.SOME_DATA_ROWS[1]
+
+    def test_load_skipinitialspace(self, tmp_path):
+        dialect = comma.helpers.DefaultDialect.override(skipinitialspace=True)
+        data = "id, comment, value\n" + "".join(
+            '{}, "line one\nline, two", {}\n'.format(i, 3 * i)
+            for i in range(30))
+
+        table = comma.load(
+            data, storage="lazy", dialect=dialect, has_header=True)
+        eager_table = comma.load(data, dialect=dialect, has_header=True)
+
+        assert len(table) == len(eager_table) == 30
+        assert table[0]["comment"] == "line one\nline, two"
+        assert table == eager_table
+
+        path = tmp_path / "data.csv"
+        path.write_bytes(data.encode("utf-8"))
+        assert comma.count_rows(
+            str(path), dialect=dialect, has_header=True) == 30
+        assert comma.tail(
+            str(path), 2, dialect=dialect, has_header=True) == eager_table[-2:]
+
+    def test_load_url(self, requests_mock):
+        # larger than the sample, which is read separately from the rest
+        url = "https://somesite.io/file.csv"
+        data = "id,comment,value\n" + "".join(
+            '{},"line one\nline, two",{}\n'.format(i, 3 * i)
+            for i in range(3000))
+        requests_mock.head(url, status_code=200)
+        requests_mock.get(url, content=data.encode("utf-8"))
+
+        table = comma.load(url, storage="lazy")
+        eager_table = comma.load(url)
+
+        assert len(table) == len(eager_table) == 3000
+        for row, eager_row in zip(table, eager_table):
+            assert row == eager_row
+        assert comma.count_rows(url) == 3000
+        assert comma.tail(url, 2) == eager_table[-2:]
@@ -1,10 +1,12 @@
-
+import collections.abc
 import copy
+import json
 import string
 
 import pytest
 
 import comma.classes.row
+import comma.helpers
 import comma.exceptions
 
 
@@ -109,7 +111,7 @@ class TestCommaRow:
         """
         assert comma_row._parent is not None
         assert comma_row._parent.header is not None
-        assert comma_row._slice_list is None or comma_row._slice_list == []
+        assert not comma_row._slice_list
         assert comma_row.header == self.SOME_HEADER
 
     def test_sliceddict_no_header(self, comma_row_no_header):
@@ -325,3 +327,108 @@ class TestCommaRow:
             comma_row.__add__(comma_long_row)
         with pytest.raises(NotImplementedError):
             comma_row.__radd__(comma_long_row)
+
+    def test_nested_slices(self, comma_long_row):
+        nested = comma_long_row[1:][::2][1:]
+        expected = self.SOME_LONG_ROW_DATA[1:][::2][1:]
+        assert len(nested) == len(expected)
+        assert list(nested) == expected
+        assert [nested[i] for i in range(len(nested))] == expected
+        assert list(nested.values()) == expected
+        assert list(nested.keys()) == self.SOME_LONG_HEADER[1:][::2][1:]
+
+    def test_nested_slices_original_id_to_current_id(self, comma_long_row):
+        nested = comma_long_row[1:][::2]
+        # original indexes 1, 3, 5 are now at 0, 1, 2
+        for current_id, original_id in enumerate([1, 3, 5]):
+            assert nested._CommaRow__original_id_to_current_id(
+                original_id) == current_id
+        with pytest.raises(IndexError):
+            nested._CommaRow__original_id_to_current_id(2)
+
+    def test_index_map_cached(self, mocker, comma_long_row):
+        nested = comma_long_row[1:][::2]
+        spy = mocker.spy(comma.helpers, "multislice_range")
+        list(nested)
+        list(nested)
+        len(nested)
+        assert spy.call_count == 1
+
+        # changing the size of the underlying data recomputes the map
+        nested.data.extend([self.SOME_STRING, self.SOME_OTHER_STRING])
+        assert list(nested)[-1] == self.SOME_OTHER_STRING
+        assert spy.call_count == 2
+
+    def test_compact(self, comma_row, comma_long_row):
+        # the attributes are stored in slots
+        assert not hasattr(comma_row, "__dict__")
+
+        # rows that are not sliced share the same (empty) slices
+        assert comma_row._slice_list is comma_long_row._slice_list
+
+        # a slice does not modify the slices of the row it comes from
+        nested = comma_long_row[1:]
+        assert nested._slice_list == (slice(1, None),)
+        assert not comma_long_row._slice_list
+
+    def test_abstract_base_classes(self, comma_row):
+        assert isinstance(comma_row, collections.abc.MutableSequence)
+        assert isinstance(comma_row, collections.abc.MutableMapping)
+        assert dict(comma_row) == self.SOME_DATA_DICT
+        assert self.SOME_DATA_ROW[0] in comma_row
+        assert comma_row.index(self.SOME_DATA_ROW[1]) == 1
+        assert comma_row.count(self.SOME_DATA_ROW[1]) == 1
+        assert list(reversed(comma_row)) == self.SOME_DATA_ROW[::-1]
+
+    def test_list_instance(self, comma_row):
+        # rows still inherit from `list` (see the class docstring)
+        assert isinstance(comma_row, list)
+        assert json.loads(json.dumps(comma_row)) == self.SOME_DATA_ROW
+        assert json.loads(json.dumps([comma_row, comma_row])) == (
+            [self.SOME_DATA_ROW] * 2)
+
+    def test_tuple_data(self, comma_row):
+        # the cells are stored in a tuple until the row is modified
+        assert type(comma_row.data) is tuple
+
+        comma_row[0] = self.SOME_STRING
+        assert type(comma_row.data) is list
+        assert list(comma_row) == [self.SOME_STRING, self.SOME_DATA_ROW[1]]
+
+    def test_tuple_data_slice(self, comma_long_row):
+        # a slice shares the cells of the row it comes from
+        nested = comma_long_row[1:]
+        nested[0] = self.SOME_STRING
+        assert comma_long_row[1] == self.SOME_STRING
+
+        comma_long_row[2] = self.SOME_OTHER_STRING
+        assert nested[1] == self.SOME_OTHER_STRING
+
+    def test_list_methods(self, comma_row):
+        comma_row.append(self.SOME_STRING)
+        assert comma_row[-1] == self.SOME_STRING
+
+        comma_row.insert(0, self.SOME_OTHER_STRING)
+        assert comma_row[0] == self.SOME_OTHER_STRING
+
+        assert comma_row.pop() == self.SOME_STRING
+        comma_row.remove(self.SOME_OTHER_STRING)
+        assert comma_row == self.SOME_DATA_ROW
+
+        comma_row += [self.SOME_STRING]
+        assert len(comma_row) == 3
+        del comma_row[2]
+        assert comma_row * 2 == self.SOME_DATA_ROW * 2
+
+        comma_row.clear()
+        assert len(comma_row) == 0
+
+    def test_copy(self, comma_long_row):
+        nested = comma_long_row[1:]
+        copied = nested.copy()
+
+        assert copied == nested
+        assert copied.header == nested.header
+
+        copied[0] = self.SOME_STRING
+        assert nested[0] != self.SOME_STRING
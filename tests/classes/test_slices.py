@@ -240,3 +240,75 @@ class TestCommaFieldSlice:
 
         for val_from_cfs, row in zip(comma_field_slice, self.SOME_DATA_ROWS):
             assert val_from_cfs == row[field_index]
+
+    def test_rows_view_not_copied(self, mocker):
+        """
+        Checks that a `CommaFieldSlice` created from `rows` references them
+        rather than copying them, so that changes propagate both ways.
+        """
+        mock_parent = mocker.Mock(header=self.SOME_HEADER)
+        rows = copy.deepcopy(self.SOME_DATA_ROWS)
+        cfs = comma.classes.slices.CommaFieldSlice(
+            rows=rows,
+            parent=mock_parent,
+            field_name=self.SOME_HEADER[1],
+        )
+
+        assert cfs._rows is rows
+        assert cfs == [row[1] for row in rows]
+
+        # writes through the view are reflected in the rows
+        cfs[0] = "new value"
+        assert rows[0][1] == "new value"
+
+        # writes to the rows are reflected in the view
+        rows[1][1] = "other value"
+        assert cfs[1] == "other value"
+
+        # and rows appended later are visible
+        rows.append(["a", "b"])
+        assert len(cfs) == 3
+        assert cfs[-1] == "b"
+
+    def test_table_column_is_view(self):
+        """
+        Checks that the column slice of a table is a view of its rows.
+        """
+        table = comma.load("a,b\n1,2\n3,4\n", force_header=True)
+        column = table["b"]
+
+        assert column._rows is table.data
+        assert "4" in column
+        assert column.count("2") == 1
+        assert column.index("4") == 1
+
+        column[1] = "5"
+        assert table[1]["b"] == "5"
+
+    def test_list_methods_use_values(self, comma_field_slice):
+        assert comma_field_slice.copy() == self.SOME_COL_SLICE
+        assert type(comma_field_slice.copy()) is list
+        assert comma_field_slice * 2 == self.SOME_COL_SLICE * 2
+        assert 2 * comma_field_slice == self.SOME_COL_SLICE * 2
+        assert comma_field_slice + ["x"] == self.SOME_COL_SLICE + ["x"]
+        assert sorted(comma_field_slice, reverse=True) == sorted(
+            self.SOME_COL_SLICE, reverse=True)
+        assert comma_field_slice < self.SOME_COL_SLICE + ["x"]
+
+    @pytest.mark.parametrize("method, args", [
+        ("append", ("x",)),
+        ("extend", (["x"],)),
+        ("insert", (0, "x")),
+        ("remove", ("data",)),
+        ("pop", ()),
+        ("clear", ()),
+        ("sort", ()),
+        ("reverse", ()),
+        ("__iadd__", (["x"],)),
+        ("__imul__", (2,)),
+        ("__delitem__", (0,)),
+    ])
+    def test_size_and_order_unchangeable(self, comma_field_slice, method, args):
+        with pytest.raises(TypeError):
+            getattr(comma_field_slice, method)(*args)
+        assert comma_field_slice == self.SOME_COL_SLICE
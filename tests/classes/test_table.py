@@ -317,6 +317,93 @@ class TestCommaTable:
         with pytest.raises(comma.exceptions.CommaKeyError):
             real_comma_table[self.SOME_STRING]
 
+    def test_real_pk_index_is_persistent(self, real_comma_table, mocker):
+        """
+        Checks that the primary key index is only built once, rather than
+        at every lookup.
+        """
+        real_comma_table.primary_key = real_comma_table.header[0]
+        spy = mocker.spy(real_comma_table, "_update_primary_key_dict")
+
+        for _ in range(3):
+            assert real_comma_table["rowAcol1"] == real_comma_table[0]
+            assert real_comma_table["rowBcol1"] == real_comma_table[1]
+
+        assert spy.call_count == 1
+
+    def test_real_pk_index_misses_not_rebuilt(self, real_comma_table, mocker):
+        """
+        Checks that looking up a missing primary key value does not rebuild
+        the index, unless the rows have been modified directly.
+        """
+        real_comma_table.primary_key = real_comma_table.header[0]
+        assert real_comma_table["rowAcol1"] == real_comma_table[0]
+        spy = mocker.spy(real_comma_table, "_update_primary_key_dict")
+
+        for _ in range(3):
+            with pytest.raises(comma.exceptions.CommaKeyError):
+                real_comma_table[self.SOME_STRING]
+        assert spy.call_count == 0
+
+        real_comma_table[1]["header1"] = self.SOME_STRING
+        assert real_comma_table[self.SOME_STRING] is real_comma_table[1]
+        assert spy.call_count == 1
+
+        real_comma_table["header1"][1] = "rowBcol1"
+        assert real_comma_table["rowBcol1"] is real_comma_table[1]
+        assert spy.call_count == 2
+
+    def test_real_pk_index_structural_changes(self, real_comma_table):
+        """
+        Checks that the primary key index is kept consistent when rows are
+        added, replaced, inserted, deleted or modified in place.
+        """
+        real_comma_table.primary_key = real_comma_table.header[0]
+        row_a = real_comma_table["rowAcol1"]
+        row_b = real_comma_table["rowBcol1"]
+
+        # append
+        row_c = copy.deepcopy(row_a)
+        row_c[0] = "rowCcol1"
+        real_comma_table.append(row_c)
+        assert real_comma_table["rowCcol1"] is row_c
+
+        # replace
+        row_d = copy.deepcopy(row_a)
+        row_d[0] = "rowDcol1"
+        real_comma_table[0] = row_d
+        assert real_comma_table["rowDcol1"] is row_d
+        with pytest.raises(comma.exceptions.CommaKeyError):
+            real_comma_table["rowAcol1"]
+
+        # insert and delete shift the indexes
+        real_comma_table.insert(0, row_a)
+        assert real_comma_table["rowAcol1"] is row_a
+        assert real_comma_table["rowBcol1"] is row_b
+        del real_comma_table[0]
+        assert real_comma_table["rowBcol1"] is row_b
+        with pytest.raises(comma.exceptions.CommaKeyError):
+            real_comma_table["rowAcol1"]
+
+        # modification of the row itself
+        row_b[0] = "rowEcol1"
+        assert real_comma_table["rowEcol1"] is row_b
+        with pytest.raises(comma.exceptions.CommaKeyError):
+            real_comma_table["rowBcol1"]
+
+    def test_real_pk_index_slice(self, real_comma_table):
+        """
+        Checks that a slice of a table does not reuse the primary key index
+        of the original table.
+        """
+        real_comma_table.primary_key = real_comma_table.header[0]
+        assert real_comma_table["rowBcol1"] is not None
+
+        table_slice = real_comma_table[1:]
+        assert table_slice["rowBcol1"] == real_comma_table["rowBcol1"]
+        with pytest.raises(comma.exceptions.CommaKeyError):
+            table_slice["rowAcol1"]
+
     @pytest.fixture
     def mock_settings(self, mocker):
         """
@@ -0,0 +1,229 @@
+import json
+
+import pytest
+
+import comma
+import comma.cache
+import comma.extras
+
+
+SOME_CSV_STRING = (
+    "name;age;city\n"
+    "Alice;33;Paris\n"
+    "Bob;25;London\n"
+    "Carol;41;Berlin\n"
+)
+
+
+@pytest.fixture()
+def cache():
+    previous_cache = comma.cache.get_cache()
+    cache = comma.cache.DetectionCache()
+    comma.cache.set_cache(cache)
+    yield cache
+    comma.cache.set_cache(previous_cache)
+
+
+class TestDetectionCache:
+
+    def test_get_put(self):
+        cache = comma.cache.DetectionCache()
+
+        assert cache.get("key") is None
+        cache.put("key", {"value": 1})
+        assert cache.get("key") == {"value": 1}
+        assert "key" in cache
+
+        assert cache.cache_info() == comma.cache.CacheInfo(
+            hits=1, misses=1, maxsize=comma.cache.CACHE_MAXSIZE, currsize=1)
+
+    def test_least_recently_used_evicted(self):
+        cache = comma.cache.DetectionCache(maxsize=2)
+
+        cache.put("a", {})
+        cache.put("b", {})
+        cache.get("a")
+        cache.put("c", {})
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert len(cache) == 2
+
+    def test_clear(self):
+        cache = comma.cache.DetectionCache()
+        cache.put("a", {})
+        cache.get("a")
+        cache.clear()
+
+        assert len(cache) == 0
+        assert cache.cache_info().hits == 0
+
+    def test_persistence(self, tmp_path):
+        path = str(tmp_path / "cache.json")
+
+        cache = comma.cache.DetectionCache(path=path)
+        cache.put("a", {"value": [1, 2]})
+        cache.flush()
+
+        with open(path) as f:
+            assert json.load(f) == {"a": {"value": [1, 2]}}
+
+        other_cache = comma.cache.DetectionCache(path=path)
+        assert other_cache.get("a") == {"value": [1, 2]}
+
+    def test_persistence_keeps_order(self, tmp_path):
+        path = str(tmp_path / "cache.json")
+
+        cache = comma.cache.DetectionCache(maxsize=3, path=path)
+        for key in "abc":
+            cache.put(key, {"value": key})
+        cache.get("a")
+        cache.flush()
+
+        # "b" is the least recently used entry, and "a" the most recent
+        other_cache = comma.cache.DetectionCache(maxsize=3, path=path)
+        other_cache.put("d", {"value": "d"})
+        assert "b" not in other_cache
+        other_cache.put("e", {"value": "e"})
+        assert "c" not in other_cache
+        assert "a" in other_cache
+
+        # entries already in the cache are more recent than those read
+        other_cache.load()
+        assert list(other_cache._entries) == ["a", "d", "e"]
+
+    def test_saved_in_batches(self, tmp_path, mocker):
+        path = tmp_path / "cache.json"
+        cache = comma.cache.DetectionCache(path=str(path))
+        spy = mocker.spy(cache, "save")
+
+        for i in range(comma.cache.CACHE_SAVE_INTERVAL - 1):
+            cache.put(str(i), {"value": i})
+        assert spy.call_count == 0
+        assert not path.exists()
+
+        cache.put("last", {"value": None})
+        assert spy.call_count == 1
+        assert len(json.loads(path.read_text())) == (
+            comma.cache.CACHE_SAVE_INTERVAL)
+
+        # nothing left to write
+        cache.flush()
+        assert spy.call_count == 1
+
+    def test_path_expanded(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("HOME", str(tmp_path))
+
+        cache = comma.cache.DetectionCache(path="~/.comma-cache.json")
+        cache.put("a", {"value": 1})
+        cache.flush()
+
+        assert cache.path == str(tmp_path / ".comma-cache.json")
+        assert (tmp_path / ".comma-cache.json").exists()
+
+    def test_save_error_warns(self, tmp_path):
+        path = str(tmp_path / "missing" / "cache.json")
+
+        cache = comma.cache.DetectionCache(path=path)
+        cache.put("a", {"value": 1})
+        with pytest.warns(UserWarning):
+            cache.flush()
+
+        # the cache still works in memory
+        assert cache.get("a") == {"value": 1}
+        assert list(tmp_path.iterdir()) == []
+
+    def test_invalid_file_ignored(self, tmp_path):
+        path = tmp_path / "cache.json"
+        path.write_text("not json")
+
+        cache = comma.cache.DetectionCache(path=str(path))
+        assert len(cache) == 0
+
+
+class TestFingerprint:
+
+    def test_same_sample(self):
+        assert (comma.cache.fingerprint("csv", "abc") ==
+                comma.cache.fingerprint("csv", b"abc"))
+
+    def test_different_parameters(self):
+        assert (comma.cache.fingerprint("csv", "abc", None) !=
+                comma.cache.fingerprint("csv", "abc", [";"]))
+        assert (comma.cache.fingerprint("csv", "abc") !=
+                comma.cache.fingerprint("encoding", "abc"))
+
+
+class TestCachedDetection:
+
+    def test_detect_encoding(self, cache, mocker):
+        spy = mocker.spy(comma.extras, "detect_encoding")
+
+        sample = SOME_CSV_STRING.encode("utf-8")
+        first = comma.cache.detect_encoding(sample)
+        second = comma.cache.detect_encoding(sample)
+
+        assert first == second
+        assert spy.call_count == 1
+        assert cache.cache_info().hits == 1
+
+    def test_detect_csv_type(self, cache, mocker):
+        spy = mocker.spy(comma.extras, "detect_csv_type")
+
+        first = comma.cache.detect_csv_type(SOME_CSV_STRING)
+        second = comma.cache.detect_csv_type(SOME_CSV_STRING)
+
+        assert spy.call_count == 1
+        assert second["dialect"].delimiter == first["dialect"].delimiter == ";"
+        assert second["has_header"] == first["has_header"]
+        assert second["line_terminator"] == first["line_terminator"]
+
+    def test_load_skips_detection(self, cache, mocker):
+        spy = mocker.spy(comma.extras, "detect_csv_type")
+
+        first = comma.load(SOME_CSV_STRING)
+        second = comma.load(SOME_CSV_STRING)
+
+        assert spy.call_count == 1
+        assert second.header == first.header == ["name", "age", "city"]
+        assert [list(row) for row in second] == [list(row) for row in first]
+
+    def test_persisted_across_caches(self, tmp_path, mocker):
+        path = str(tmp_path / "cache.json")
+        previous_cache = comma.cache.get_cache()
+        spy = mocker.spy(comma.extras, "detect_csv_type")
+
+        try:
+            comma.cache.set_cache(comma.cache.DetectionCache(path=path))
+            comma.load(SOME_CSV_STRING)
+
+            comma.cache.set_cache(comma.cache.DetectionCache(path=path))
+            table = comma.load(SOME_CSV_STRING)
+        finally:
+            comma.cache.set_cache(previous_cache)
+
+        assert spy.call_count == 1
+        assert table.header == ["name", "age", "city"]
+
+    def test_disabled_by_default(self, mocker):
+        assert comma.cache.get_cache() is None
+
+        spy = mocker.spy(comma.extras, "detect_csv_type")
+        comma.cache.detect_csv_type(SOME_CSV_STRING)
+        comma.cache.detect_csv_type(SOME_CSV_STRING)
+
+        assert spy.call_count == 2
+
+    def test_detect_encoding_past_sample(self, cache):
+        # two files with the same (ASCII) start, but only the second one
+        # has Latin-1 characters, past the sample
+        start = SOME_CSV_STRING + "Dan;50;Rome\n" * 1000
+        ascii_data = (start + "Dan;50;Rome\n").encode("latin-1")
+        latin1_data = (start + "Zoë;50;Besançon\n").encode("latin-1")
+
+        assert len(comma.load(ascii_data)) == 1004
+        table = comma.load(latin1_data)
+
+        assert table[-1]["name"] == "Zoë"
+        assert table[-1]["city"] == "Besançon"
@@ -147,4 +147,36 @@ class TestConfig:
             mock_settings.SLICE_DEEP_COPY_PARENT = False
             assert not comma.config.settings.SLICE_DEEP_COPY_PARENT
             mock_settings.stop()
-            assert comma.config.settings.SLICE_DEEP_COPY_PARENT == original_copy_parent
\ No newline at end of file
+            assert comma.config.settings.SLICE_DEEP_COPY_PARENT == original_copy_parent
+
+    def test_environment_cached(self, monkeypatch):
+        """
+        Checks that settings are read from the environment once, and read
+        again only after a call to `reload()`.
+        """
+        obj = comma.config.ConfigClass()
+
+        monkeypatch.setenv("COMMA_SLICE_DEEP_COPY_DATA", "true")
+        assert obj.SLICE_DEEP_COPY_DATA
+
+        monkeypatch.setenv("COMMA_SLICE_DEEP_COPY_DATA", "false")
+        assert obj.SLICE_DEEP_COPY_DATA
+
+        obj.reload()
+        assert not obj.SLICE_DEEP_COPY_DATA
+
+    def test_set_overrides_cache(self, monkeypatch):
+        """
+        Checks that an assigned value replaces the cached value, and
+        persists across calls to `reload()`.
+        """
+        obj = comma.config.ConfigClass()
+
+        monkeypatch.setenv("COMMA_SLICE_DEEP_COPY_PARENT", "false")
+        assert not obj.SLICE_DEEP_COPY_PARENT
+
+        obj.SLICE_DEEP_COPY_PARENT = True
+        assert obj.SLICE_DEEP_COPY_PARENT
+
+        obj.reload()
+        assert obj.SLICE_DEEP_COPY_PARENT
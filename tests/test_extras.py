@@ -1,4 +1,9 @@
 
+import array
+import io
+
+import comma
+import comma.exceptions
 import comma.extras
 import comma.helpers  # for comma.helpers.MAX_SAMPLE_CHUNKSIZE
 
@@ -278,16 +283,17 @@ class TestDetectEncoding:
         heuristics provided a guess.
         """
 
-        # check that _detect_encoding_by_bom is defined, and patch it
+        # check that the heuristics are defined, and patch them
         assert "_detect_encoding_by_bom" in comma.extras.__dict__
         mocker.patch("comma.extras._detect_encoding_by_bom", return_value=None)
 
-        # only patch the chardet module if it is available
-        try:
-            import chardet
-            mocker.patch("chardet.detect", return_value=None)
-        except ImportError or ModuleNotFoundError:
-            pass
+        assert "_detect_encoding_by_validation" in comma.extras.__dict__
+        mocker.patch(
+            "comma.extras._detect_encoding_by_validation",
+            side_effect=lambda chunks: (None, next(chunks)))
+
+        assert "_detect_encoding_by_chardet" in comma.extras.__dict__
+        mocker.patch("comma.extras._detect_encoding_by_chardet", return_value=None)
 
         # having had all the heuristics fail, check if the returned
         # default value is what we expect it will be
@@ -295,3 +301,185 @@ class TestDetectEncoding:
             sample=self.SOME_UTF8_STRING_KANJI,
             default=self.SOME_MADE_UP_ENCODING) == self.SOME_MADE_UP_ENCODING
 
+    @pytest.mark.parametrize("sample, encoding", [
+        (b"name,age\nPerson1,33\n" * 1000, "ascii"),
+        ("name,age\nJ\u00e9r\u00e9mie,33\n".encode("utf-8") * 1000, "utf-8"),
+    ])
+    def test_detect_by_validation(self, sample, encoding, mocker):
+        """
+        Checks that ASCII and UTF-8 samples are detected without resorting
+        to the (slower) statistical heuristic.
+        """
+        chardet_spy = mocker.spy(comma.extras, "_detect_encoding_by_chardet")
+
+        assert comma.extras.detect_encoding(sample) == encoding
+        chardet_spy.assert_not_called()
+
+    def test_detect_ambiguous_ascii_by_chardet(self):
+        """
+        Checks that 7-bit encodings using escape sequences are not mistaken
+        for ASCII.
+        """
+        pytest.importorskip("chardet")
+
+        sample = self.SOME_UTF8_STRING_KANJI.encode("iso-2022-jp")
+        assert comma.extras.detect_encoding(sample).lower() == "iso-2022-jp"
+
+    def test_detect_stops_early(self, mocker):
+        """
+        Checks that the detection stops at the first conclusive chunk.
+        """
+        sample = self.SOME_UTF8_STRING_FRENCH_NAME.encode("utf-8") * 10000
+
+        read_chunks = []
+        original_iter_chunks = comma.extras._iter_chunks
+
+        def _iter_chunks(*args, **kwargs):
+            for chunk in original_iter_chunks(*args, **kwargs):
+                read_chunks.append(chunk)
+                yield chunk
+
+        mocker.patch("comma.extras._iter_chunks", side_effect=_iter_chunks)
+
+        assert comma.extras.detect_encoding(sample) == "utf-8"
+        assert len(read_chunks) == 1
+
+    def test_detect_stream_past_first_chunk(self):
+        """
+        Checks that the detection on a stream looks past the start of the
+        stream when it is plain ASCII, and restores the position.
+        """
+        pytest.importorskip("chardet")
+
+        data = (b"name,city\n" + b"Person,Paris\n" * 2000 +
+                "Ren\u00e9e,Orl\u00e9ans\nFran\u00e7ois,Besan\u00e7on\n".encode(
+                    "latin-1") * 50)
+        source = io.BytesIO(data)
+
+        encoding = comma.extras.detect_stream_encoding(source)
+
+        assert source.tell() == 0
+        assert data.decode(encoding) == data.decode("latin-1")
+
+        # the sample alone is inconclusive
+        assert comma.extras.detect_encoding(
+            data[:comma.helpers.MAX_SAMPLE_CHUNKSIZE]) == "ascii"
+
+    def test_detect_stream_max_size(self):
+        data = b"a,b\n" * 10000 + "\u00e9".encode("utf-8")
+
+        assert comma.extras.detect_stream_encoding(
+            io.BytesIO(data), max_size=1000) == "ascii"
+        assert comma.extras.detect_stream_encoding(
+            io.BytesIO(data), max_size=None) == "utf-8"
+
+
+
+class TestToNumpy:
+
+    SOME_CSV_STRING = "id,price\n1,2.5\n3,4.0\n5,0.5\n"
+
+    @pytest.fixture(autouse=True)
+    def numpy(self):
+        return pytest.importorskip("numpy")
+
+    def test_to_numpy_strings(self, numpy):
+        ndarray = comma.extras.to_numpy(["1.5", "2"], dtype=float)
+        assert ndarray.dtype == numpy.float64
+        assert list(ndarray) == [1.5, 2.0]
+
+    def test_to_numpy_zero_copy(self, numpy):
+        buffer = array.array("d", [1.0, 2.0])
+        ndarray = comma.extras.to_numpy(buffer, copy=False)
+        ndarray[0] = 3.0
+        assert buffer[0] == 3.0
+
+    def test_to_numpy_copy(self, numpy):
+        buffer = array.array("d", [1.0, 2.0])
+        ndarray = comma.extras.to_numpy(buffer)
+        ndarray[0] = 3.0
+        assert buffer[0] == 1.0
+        buffer.append(4.0)
+
+    @pytest.mark.parametrize("dtype", [str, "U", object])
+    def test_to_numpy_string_column(self, numpy, dtype):
+        table = comma.load("a,b\n1,xyz\n2,\n3,hello\n")
+
+        ndarray = table["b"].to_numpy(dtype=dtype)
+        assert ndarray.tolist() == ["xyz", "", "hello"]
+        assert table["b"][1:].to_numpy(dtype=dtype).tolist() == ["", "hello"]
+
+        ndarray = table.to_numpy(dtype=dtype)
+        assert ndarray.shape == (3, 2)
+        assert ndarray[:, 1].tolist() == ["xyz", "", "hello"]
+
+    def test_is_flexible_dtype(self, numpy):
+        assert comma.extras.is_flexible_dtype(str)
+        assert comma.extras.is_flexible_dtype("U")
+        assert comma.extras.is_flexible_dtype(bytes)
+        assert not comma.extras.is_flexible_dtype("U5")
+        assert not comma.extras.is_flexible_dtype(float)
+        assert not comma.extras.is_flexible_dtype(object)
+
+    def test_to_numpy_missing(self, mocker):
+        mocker.patch("comma.extras.numpy", None)
+        with pytest.raises(ImportError):
+            comma.extras.to_numpy(["1"], dtype=float)
+
+    @pytest.mark.parametrize("storage", ["rows", "columnar"])
+    def test_field_slice_to_numpy(self, numpy, storage):
+        table = comma.load(self.SOME_CSV_STRING, storage=storage)
+        ndarray = table["price"].to_numpy(dtype=float)
+        assert ndarray.tolist() == [2.5, 4.0, 0.5]
+        assert table["price"][1:].to_numpy(dtype=float).tolist() == [4.0, 0.5]
+
+    def test_typed_column_shares_memory(self, numpy):
+        table = comma.load(self.SOME_CSV_STRING, infer_types=True)
+
+        ndarray = table["price"].to_numpy(copy=False)
+        assert ndarray.dtype == numpy.float64
+        ndarray[0] = 10.0
+        assert table[0]["price"] == 10.0
+
+        ndarray = table.to_numpy("id", copy=False)
+        assert ndarray.dtype == numpy.int64
+        assert numpy.shares_memory(
+            ndarray, table.to_numpy(columns="id", copy=False))
+
+    def test_typed_column_copied(self, numpy):
+        table = comma.load(self.SOME_CSV_STRING, infer_types=True)
+
+        ndarray = table["price"].to_numpy()
+        ndarray[0] = 10.0
+        assert table[0]["price"] == 2.5
+        assert not numpy.shares_memory(ndarray, table.to_numpy("price"))
+
+        # the table can still grow while the array exists
+        table.append(["7", "1.5"])
+        assert table[-1]["price"] == 1.5
+
+    def test_shared_memory_blocks_append(self, numpy):
+        table = comma.load(self.SOME_CSV_STRING, infer_types=True)
+
+        ndarray = table.to_numpy("price", copy=False)
+        with pytest.raises(BufferError):
+            table.append(["7", "1.5"])
+        assert table["id"] == [1, 3, 5]
+
+        del ndarray
+        table.append(["7", "1.5"])
+        assert table[-1]["price"] == 1.5
+
+    @pytest.mark.parametrize("infer_types", [False, True])
+    def test_table_to_numpy(self, numpy, infer_types):
+        table = comma.load(self.SOME_CSV_STRING, infer_types=infer_types)
+        ndarray = table.to_numpy(dtype=float)
+        assert ndarray.shape == (3, 2)
+        assert ndarray.tolist() == [[1.0, 2.5], [3.0, 4.0], [5.0, 0.5]]
+        assert table.to_numpy(columns=["price"], dtype=float).shape == (3, 1)
+        assert table.to_numpy(columns=[1, 0], dtype=float)[0].tolist() == [2.5, 1.0]
+
+    def test_table_to_numpy_bad_column(self):
+        table = comma.load(self.SOME_CSV_STRING)
+        with pytest.raises(comma.exceptions.CommaKeyError):
+            table.to_numpy(columns="cassava")
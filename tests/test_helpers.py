@@ -1,9 +1,14 @@
 
+import bz2
 import collections
+import gzip
 import io
 import itertools
+import lzma
 import os
+import tracemalloc
 import typing
+import zipfile
 
 import pytest
 try:
@@ -11,7 +16,13 @@ try:
 except ImportError:
     # this is an optional package
     requests = None
+try:
+    import zstandard
+except ImportError:
+    # this is an optional package
+    zstandard = None
 
+import comma.config
 import comma.exceptions
 import comma.helpers
 import comma.typing
@@ -19,10 +30,16 @@ import comma.typing
 
 EXPECTED_CONSTANTS = [
     ("MAX_SAMPLE_CHUNKSIZE", int),
+    ("DECODE_CHUNKSIZE", int),
+    ("DECODING_ERRORS", str),
     ("URI_SCHEME_LOCAL", str),
     ("URI_SCHEMES_ACCEPTED", typing.List),
     ("LINE_TERMINATORS", typing.List),
     ("LINE_TERMINATOR_DEFAULT", str),
+    ("COMPRESSION_MAGIC_BYTES", typing.List),
+    ("HTTP_TIMEOUT", int),
+    ("HTTP_POOL_SIZE", int),
+    ("HTTP_CHUNKSIZE", int),
 ]
 
 
@@ -288,6 +305,87 @@ class TestOpenStream:
                 self.SOME_LATIN1_ENCODED_STRING,
                 encoding="utf-8")
 
+    def test_decode_stream_single_pass(self, mocker):
+        source = io.BytesIO(self.SOME_UTF8_ENCODED_STRING)
+        spy = mocker.spy(source, "read")
+        result, encoding = comma.helpers.decode_stream(
+            source=source,
+            encodings=["utf-8", "latin-1"],
+            chunksize=3)
+        assert encoding == "utf-8"
+
+        # the data is decoded as it is read, one chunk at a time
+        assert result.read(2) == self.SOME_UTF8_DECODED_STRING[:2]
+        assert spy.call_count == 2
+
+        TestOpenStream.check_stream(
+            stream=result,
+            reset_position=True,
+            check_content=self.SOME_UTF8_DECODED_STRING)
+
+    def test_decode_stream_fallback(self):
+        source = io.BytesIO(self.SOME_LATIN1_ENCODED_STRING)
+        result, encoding = comma.helpers.decode_stream(
+            source=source,
+            encodings=["utf-8", "latin-1"],
+            chunksize=3)
+        assert encoding == "latin-1"
+        TestOpenStream.check_stream(
+            stream=result,
+            check_content=self.SOME_LATIN1_ENCODED_STRING.decode("latin-1"))
+
+    def test_decode_stream_no_encoding(self):
+        with pytest.raises(comma.exceptions.CommaEncodingException):
+            comma.helpers.decode_stream(
+                source=io.BytesIO(self.SOME_LATIN1_ENCODED_STRING),
+                encodings=["utf-8", "ascii"])
+
+    def test_decode_stream_error_past_first_chunk(self):
+        source = io.BytesIO(b"a,b\n" * 10 + self.SOME_LATIN1_ENCODED_STRING)
+        result, encoding = comma.helpers.decode_stream(
+            source=source,
+            encodings=["utf-8"],
+            chunksize=8)
+        assert encoding == "utf-8"
+        with pytest.raises(comma.exceptions.CommaEncodingException):
+            result.read()
+
+    def test_decode_stream_fallback_encodings(self):
+        result, encoding = comma.helpers.decode_stream(
+            source=io.BytesIO(self.SOME_UTF8_ENCODED_STRING),
+            encodings=["utf-8", "latin-1", "utf8", "cp1252"])
+        assert encoding == "utf-8"
+        assert result.fallback_encodings == ["latin-1", "cp1252"]
+
+    def test_decode_stream_ascii_start(self):
+        # (only the first chunk is ASCII)
+        source = io.BytesIO(b"a,b\n" + self.SOME_UTF8_ENCODED_STRING)
+        result, encoding = comma.helpers.decode_stream(
+            source=source,
+            encodings=["ascii", "utf-8"],
+            chunksize=4)
+        assert encoding == "utf-8"
+        assert result.read() == "a,b\n" + self.SOME_UTF8_DECODED_STRING
+
+    def test_decode_stream_source_not_closed(self):
+        source = io.BytesIO(self.SOME_UTF8_ENCODED_STRING)
+        opened_stream = io.BytesIO()
+        result, _ = comma.helpers.decode_stream(
+            source=source,
+            encodings=["utf-8"],
+            opened_streams=[opened_stream])
+        result.close()
+        assert not source.closed
+        assert opened_stream.closed
+
+    def test_decode_stream_newline_across_chunks(self):
+        source = io.BytesIO(b"a,b\r\nc,d\r\n")
+        result, _ = comma.helpers.decode_stream(
+            source=source,
+            encodings=["utf-8"],
+            chunksize=4)  # splits the first "\r\n"
+        assert result.read() == "a,b\nc,d\n"
+
     def test_string_data_input(self):
         result = comma.helpers.open_stream(source=self.SOME_DATA)
         TestOpenStream.check_stream(stream=result, check_content=self.SOME_DATA)
@@ -391,7 +489,11 @@ class TestOpenStream:
         mocker.patch("zipfile.is_zipfile", return_value=True)
         mocker.patch("zipfile.ZipFile", return_value=mocker.Mock(
             namelist=mocker.Mock(return_value=filenames),
-            read=mocker.Mock(return_value=self.SOME_UTF8_ENCODED_STRING)))
+            read=mocker.Mock(return_value=self.SOME_UTF8_ENCODED_STRING),
+            # members are streamed rather than read at once
+            open=mocker.Mock(
+                side_effect=lambda *args, **kwargs: io.BytesIO(
+                    self.SOME_UTF8_ENCODED_STRING))))
         result = comma.helpers.open_stream(source=io.StringIO(), no_request=False)
         return result
 
@@ -420,6 +522,269 @@ class TestOpenStream:
             self.aux_test_zipfile(mocker=mocker, csv_file_count=0, txt_file_count=0)
 
 
+class TestSession:
+
+    SOME_URL = "https://somesite.io/file.csv"
+    SOME_DATA = "col1,col2\n1,2\n3,4\n"
+
+    @pytest.fixture(autouse=True)
+    def reset_session(self):
+        comma.helpers.set_session(None)
+        yield
+        comma.helpers.set_session(None)
+
+    @pytest.mark.skipif(requests is None, reason="requires `requests`")
+    def test_session_is_shared(self):
+        session = comma.helpers.get_session()
+        assert isinstance(session, requests.Session)
+        assert comma.helpers.get_session() is session
+
+    @pytest.mark.skipif(requests is None, reason="requires `requests`")
+    def test_set_session(self, requests_mock, mocker):
+        requests_mock.head(self.SOME_URL, status_code=200)
+        requests_mock.get(self.SOME_URL, text=self.SOME_DATA)
+
+        session = requests.Session()
+        comma.helpers.set_session(session)
+        assert comma.helpers.get_session() is session
+
+        get_spy = mocker.spy(session, "get")
+        result = comma.helpers.open_stream(source=self.SOME_URL)
+        get_spy.assert_called_once()
+
+        TestOpenStream.check_stream(stream=result, check_content=self.SOME_DATA)
+
+    @pytest.mark.parametrize("head_request", [True, False])
+    def test_url_head_request(self, head_request, requests_mock, monkeypatch):
+        monkeypatch.setattr(
+            comma.config.settings, "URL_HEAD_REQUEST", head_request)
+        requests_mock.head(self.SOME_URL, status_code=200)
+        requests_mock.get(self.SOME_URL, text=self.SOME_DATA)
+
+        result = comma.helpers.open_stream(source=self.SOME_URL)
+        TestOpenStream.check_stream(stream=result, check_content=self.SOME_DATA)
+
+        methods = [request.method for request in requests_mock.request_history]
+        assert methods == (["HEAD", "GET"] if head_request else ["GET"])
+
+    @pytest.mark.skipif(requests is None, reason="requires `requests`")
+    def test_no_head_request_connection_error(self, requests_mock, monkeypatch):
+        monkeypatch.setattr(comma.config.settings, "URL_HEAD_REQUEST", False)
+        requests_mock.get(self.SOME_URL, exc=requests.exceptions.ConnectionError)
+        assert comma.helpers.open_stream(source=self.SOME_URL) is None
+
+
+class TestStreamingDownload:
+
+    SOME_URL = "https://somesite.io/file.csv"
+
+    # larger than the sample, with a quoted field spanning lines
+    SOME_DATA = "id,comment,value\n" + "".join(
+        '{},"line one\nline, two",{}\n'.format(i, 3 * i) for i in range(2000))
+
+    @pytest.fixture(autouse=True)
+    def no_head_request(self, requests_mock):
+        requests_mock.head(self.SOME_URL, status_code=200)
+
+    def test_open_stream_not_seekable(self, requests_mock):
+        requests_mock.get(self.SOME_URL, content=self.SOME_DATA.encode("utf-8"))
+        result = comma.helpers.open_stream(source=self.SOME_URL, seekable=False)
+
+        assert isinstance(result, io.TextIOBase)
+        assert not result.seekable()
+        assert result.read() == self.SOME_DATA
+
+        result.close()
+        assert result.closed
+
+    def test_open_stream_not_seekable_compressed(self, requests_mock):
+        requests_mock.get(
+            self.SOME_URL,
+            content=gzip.compress(self.SOME_DATA.encode("utf-8")))
+        result = comma.helpers.open_stream(source=self.SOME_URL, seekable=False)
+
+        # compressed data is downloaded before it is read
+        TestOpenStream.check_stream(stream=result, check_content=self.SOME_DATA)
+
+    @pytest.mark.parametrize("iterate", [True, False])
+    def test_open_csv_streaming(self, iterate, requests_mock, mocker):
+        requests_mock.get(self.SOME_URL, content=self.SOME_DATA.encode("utf-8"))
+        open_stream_spy = mocker.spy(comma.helpers, "open_stream")
+
+        data = comma.helpers.open_csv(source=self.SOME_URL, iterate=iterate)
+
+        assert open_stream_spy.call_args[1]["seekable"] is False
+        assert data["header"] == ["id", "comment", "value"]
+
+        rows = list(data["rows"])
+        assert len(rows) == 2000
+        assert all(row == [str(i), "line one\nline, two", str(3 * i)]
+                   for i, row in enumerate(rows))
+
+
+class TestMappedFile:
+
+    SOME_DATA = "name,age\nPerson1,33\nPerson2,25\n"
+
+    @pytest.fixture()
+    def some_file_path(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_bytes(self.SOME_DATA.encode("utf-8"))
+        return str(path)
+
+    def test_read_and_seek(self, some_file_path):
+        data = self.SOME_DATA.encode("utf-8")
+        stream = comma.helpers.map_file(open(some_file_path, mode="rb"))
+
+        assert isinstance(stream, comma.helpers.MappedFile)
+        assert stream.seekable()
+        assert stream.name == some_file_path
+
+        assert stream.read(4) == data[:4]
+        assert stream.tell() == 4
+        assert stream.read() == data[4:]
+        assert stream.read(4) == b""
+
+        stream.seek(-3, io.SEEK_END)
+        assert stream.read() == data[-3:]
+
+        with stream.getbuffer() as view:
+            assert view[:4] == data[:4]
+
+        stream.close()
+        assert stream.closed
+        assert stream._file.closed
+
+    def test_map_file_fallback(self, tmp_path):
+        # streams that are not local files are not mapped
+        stream = io.BytesIO(b"abc")
+        assert comma.helpers.map_file(stream) is stream
+
+        # neither are empty files
+        path = tmp_path / "empty.csv"
+        path.write_bytes(b"")
+        with open(str(path), mode="rb") as file:
+            assert comma.helpers.map_file(file) is file
+
+    def test_open_stream_local_file(self, some_file_path, mocker):
+        mapped_file_spy = mocker.spy(comma.helpers.MappedFile, "close")
+
+        result = comma.helpers.open_stream(source=some_file_path)
+
+        TestOpenStream.check_stream(stream=result, check_content=self.SOME_DATA)
+        mapped_file_spy.assert_called()
+
+    def test_open_stream_encoding_past_sample(self, tmp_path):
+        data = ("name,city\n" + "Person,Paris\n" * 2000 +
+                "Ren\u00e9e,Orl\u00e9ans\n")
+        path = tmp_path / "latin1.csv"
+        path.write_bytes(data.encode("latin-1"))
+
+        result = comma.helpers.open_stream(source=str(path))
+
+        assert result.read() == data
+
+
+class TestCompression:
+
+    SOME_DATA = "name,age\nPerson1,33\nPerson2,25\n" * 100
+
+    COMPRESSORS = {
+        "gzip": gzip.compress,
+        "bz2": bz2.compress,
+        "xz": lzma.compress,
+        "zstd": (zstandard.ZstdCompressor().compress
+                 if zstandard is not None else None),
+    }
+
+    @pytest.mark.parametrize("compression", ["gzip", "bz2", "xz", "zstd"])
+    def test_open_stream_compressed(self, compression, tmp_path):
+        compress = self.COMPRESSORS[compression]
+        if compress is None:
+            pytest.skip("optional package `zstandard` is not available")
+
+        data = compress(self.SOME_DATA.encode("utf-8"))
+        assert comma.helpers.detect_compression(data) == compression
+
+        # from a stream
+        result = comma.helpers.open_stream(source=io.BytesIO(data))
+        TestOpenStream.check_stream(stream=result, check_content=self.SOME_DATA)
+
+        # from a local file
+        path = tmp_path / "data.csv.{}".format(compression)
+        path.write_bytes(data)
+        result = comma.helpers.open_stream(source=str(path))
+        TestOpenStream.check_stream(stream=result, check_content=self.SOME_DATA)
+
+    @pytest.mark.parametrize("compression", ["gzip", "zstd"])
+    def test_open_compressed_seek(self, compression):
+        compress = self.COMPRESSORS[compression]
+        if compress is None:
+            pytest.skip("optional package `zstandard` is not available")
+
+        data = self.SOME_DATA.encode("utf-8")
+        stream = comma.helpers.open_compressed(io.BytesIO(compress(data)))
+
+        assert stream.read(10) == data[:10]
+        stream.seek(0)
+        assert stream.read() == data
+        stream.seek(5)
+        assert stream.read(5) == data[5:10]
+        stream.close()
+
+    @pytest.mark.parametrize("compression", ["gzip", "zstd"])
+    def test_open_stream_compressed_bounded_memory(self, compression, tmp_path):
+        compress = self.COMPRESSORS[compression]
+        if compress is None:
+            pytest.skip("optional package `zstandard` is not available")
+
+        data = "id,name\n" + "".join(
+            "{},Person{}\n".format(i, i) for i in range(300000))
+        path = tmp_path / "data.csv.{}".format(compression)
+        path.write_bytes(compress(data.encode("utf-8")))
+
+        tracemalloc.start()
+        try:
+            with comma.helpers.open_stream(source=str(path)) as result:
+                line_count = sum(1 for _ in result)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        # neither the decompressed data nor the decoded text is stored
+        assert line_count == 300001
+        assert peak < len(data) / 2
+
+    def test_compressed_encoding_fallback(self):
+        # the data must be decompressed again to try another encoding
+        data = gzip.compress("é,ü\n".encode("latin-1") * 100)
+        result, encoding = comma.helpers.decode_stream(
+            source=comma.helpers.open_compressed(io.BytesIO(data)),
+            encodings=["utf-8", "latin-1"],
+            chunksize=16)
+        assert encoding == "latin-1"
+        assert result.read() == "é,ü\n" * 100
+
+    @pytest.mark.parametrize("sample", [
+        b"BZh,name,age\n",
+        b"name,age\n",
+        "\x1f\x8b",
+        b"",
+    ])
+    def test_detect_compression_none(self, sample):
+        assert comma.helpers.detect_compression(sample) is None
+
+    def test_zipfile_streamed(self, tmp_path):
+        path = tmp_path / "data.zip"
+        with zipfile.ZipFile(str(path), mode="w",
+                             compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("data.csv", self.SOME_DATA)
+            archive.writestr("readme.txt", "not the data")
+
+        result = comma.helpers.open_stream(source=str(path))
+        TestOpenStream.check_stream(stream=result, check_content=self.SOME_DATA)
+
+
 class TestDetectLineTerminator:
     """
 
@@ -537,6 +902,49 @@ class TestOpenCSV:
         assert "params" in ret and "has_header" in ret.get("params")
         assert not ret["params"]["has_header"]
 
+    @pytest.mark.parametrize("lazy", [False, True])
+    def test_encoding_fallback_past_first_chunk(self, lazy):
+        # (only past the first chunk is the data not valid CP-1252, it is
+        # then read again as UTF-8, as when it was decoded all at once)
+        last_row = ["\u00c1ngel", "\u00e9"]
+        source = io.BytesIO(
+            b"name,value\n" +
+            b"a,b\n" * (comma.helpers.DECODE_CHUNKSIZE // 4) +
+            ",".join(last_row).encode("utf-8") + b"\n")
+
+        ret = comma.helpers.open_csv(
+            source=source,
+            encoding="cp1252",
+            lazy=lazy)
+
+        if lazy:
+            assert ret["text"].endswith(",".join(last_row) + "\n")
+        else:
+            assert ret["rows"][-1] == last_row
+
+    def test_iterate_rows_are_lazy(self):
+        ret = comma.helpers.open_csv(
+            source=self.SOME_DATA_WITH_HEADER,
+            iterate=True)
+        assert ret is not None
+        assert ret["params"]["has_header"]
+        assert ret["header"] == ["name", "age", "eye_color"]
+        assert isinstance(ret["rows"], typing.Iterator)
+        assert list(ret["rows"]) == list(map(
+            lambda s: s.split(","),
+            self.SOME_DATA_NO_HEADER.strip().split("\n")))
+
+    def test_iterate_close_at_end(self, mocker):
+        string_stream = io.StringIO(self.SOME_DATA_WITH_HEADER)
+        mocker.patch("comma.helpers.open_stream", return_value=string_stream)
+
+        ret = comma.helpers.open_csv(source=self.SOME_FILENAME, iterate=True)
+
+        # stream is only closed once the rows have been consumed
+        assert not string_stream.closed
+        list(ret["rows"])
+        assert string_stream.closed
+
     def test_close_at_end(self, mocker):
         """
         Checks whether internally created streams are closed.
@@ -0,0 +1,261 @@
+import csv
+import gzip
+import os
+
+import pytest
+
+import comma
+import comma.classes.lazy
+import comma.exceptions
+import comma.helpers
+import comma.index
+import comma.parallel
+
+
+SOME_HEADER = ["id", "comment", "amount"]
+SOME_DATA_ROWS = [
+    [str(i), "a comment\nover two lines" if i % 3 == 0 else "plain", str(i * 7)]
+    for i in range(25)
+]
+
+
+def make_csv(rows, header=SOME_HEADER, line_terminator="\n"):
+    return comma.dumps(
+        rows, header=header,
+        dialect=comma.helpers.DefaultDialect.override(
+            lineterminator=line_terminator, escapechar=None))
+
+
+@pytest.fixture()
+def csv_path(tmp_path):
+    path = str(tmp_path / "data.csv")
+    with open(path, "w", newline="") as f:
+        f.write(make_csv(SOME_DATA_ROWS))
+    return path
+
+
+def build(path, **kwargs):
+    kwargs.setdefault("stride", 4)
+    kwargs.setdefault("dialect", "excel")
+    kwargs.setdefault("has_header", True)
+    return comma.index.build_index(path, **kwargs)
+
+
+class TestBuildIndex:
+
+    def test_counts_records(self, csv_path):
+        index = build(csv_path)
+        assert len(index) == len(SOME_DATA_ROWS)
+        assert index.header == SOME_HEADER
+        assert len(index.offsets) == 7
+
+    def test_offsets_are_record_starts(self, csv_path):
+        index = build(csv_path)
+        with open(csv_path, "rb") as f:
+            data = f.read()
+        for block, offset in enumerate(index.offsets):
+            assert data[offset:].startswith(
+                "{},".format(block * index.stride).encode())
+
+    def test_read_rows(self, csv_path):
+        index = build(csv_path)
+        assert index.read_rows() == SOME_DATA_ROWS
+        assert index.read_rows(3, 9) == SOME_DATA_ROWS[3:9]
+        assert index.read_rows(-2) == SOME_DATA_ROWS[-2:]
+        assert index.read_block(1) == SOME_DATA_ROWS[4:8]
+
+    def test_crlf(self, tmp_path):
+        path = str(tmp_path / "crlf.csv")
+        with open(path, "w", newline="") as f:
+            f.write(make_csv(SOME_DATA_ROWS, line_terminator="\r\n"))
+        index = build(path)
+        assert len(index) == len(SOME_DATA_ROWS)
+        assert index.read_rows(5, 7) == SOME_DATA_ROWS[5:7]
+
+    def test_no_trailing_newline(self, tmp_path):
+        path = str(tmp_path / "data.csv")
+        with open(path, "w", newline="") as f:
+            f.write(make_csv(SOME_DATA_ROWS).rstrip("\n"))
+        index = build(path)
+        assert len(index) == len(SOME_DATA_ROWS)
+        assert index.read_rows(-1) == SOME_DATA_ROWS[-1:]
+
+    def test_empty(self, tmp_path):
+        path = str(tmp_path / "empty.csv")
+        open(path, "w").close()
+        index = build(path)
+        assert len(index) == 0
+        assert index.header is None
+        assert index.read_rows() == []
+
+    def test_compressed(self, tmp_path):
+        path = str(tmp_path / "data.csv.gz")
+        with gzip.open(path, "wt") as f:
+            f.write(make_csv(SOME_DATA_ROWS))
+        with pytest.raises(comma.exceptions.CommaException):
+            build(path)
+
+    def test_invalid_stride(self, csv_path):
+        with pytest.raises(ValueError):
+            build(csv_path, stride=0)
+
+
+class TestOpenIndex:
+
+    def test_saved_and_reused(self, csv_path, mocker):
+        index = comma.index.open_index(
+            csv_path, stride=4, dialect="excel", has_header=True)
+        assert os.path.exists(comma.index.index_path(csv_path))
+
+        spy = mocker.spy(comma.index, "build_index")
+        reused = comma.index.open_index(
+            csv_path, stride=4, dialect="excel", has_header=True)
+
+        spy.assert_not_called()
+        assert reused.to_dict() == index.to_dict()
+        assert reused.read_rows(10, 12) == SOME_DATA_ROWS[10:12]
+
+    def test_rebuilt_when_file_changes(self, csv_path):
+        comma.index.open_index(
+            csv_path, stride=4, dialect="excel", has_header=True)
+
+        with open(csv_path, "a") as f:
+            f.write("25,appended,175\n")
+        os.utime(csv_path, ns=(0, 0))
+
+        index = comma.index.open_index(
+            csv_path, stride=4, dialect="excel", has_header=True)
+        assert index.is_valid()
+        assert len(index) == len(SOME_DATA_ROWS) + 1
+
+    def test_rebuilt_when_stride_changes(self, csv_path):
+        comma.index.open_index(
+            csv_path, stride=4, dialect="excel", has_header=True)
+        index = comma.index.open_index(
+            csv_path, stride=10, dialect="excel", has_header=True)
+        assert index.stride == 10
+        assert len(index.offsets) == 3
+
+    def test_invalid_sidecar_ignored(self, csv_path):
+        with open(comma.index.index_path(csv_path), "w") as f:
+            f.write("not an index")
+        index = comma.index.open_index(
+            csv_path, stride=4, dialect="excel", has_header=True)
+        assert len(index) == len(SOME_DATA_ROWS)
+
+
+class TestLoadIndexed:
+
+    def test_load(self, csv_path):
+        table = comma.load(
+            csv_path, index=True, dialect="excel", has_header=True)
+        eager_table = comma.load(csv_path, dialect="excel", has_header=True)
+
+        assert isinstance(table.data, comma.classes.lazy.CommaIndexedRows)
+        assert len(table) == len(SOME_DATA_ROWS)
+        assert table.data.materialized_count == 0
+        assert table.header == SOME_HEADER
+        assert table[-3]["comment"] == SOME_DATA_ROWS[-3][1]
+        assert table.data.materialized_count == 1
+
+        assert table == eager_table
+        assert comma.dumps(table) == comma.dumps(eager_table)
+
+    def test_modifications(self, csv_path):
+        table = comma.load(
+            csv_path, index=True, dialect="excel", has_header=True)
+        table[0]["amount"] = "changed"
+        table.append(["25", "appended", "175"])
+        del table[1]
+
+        assert table[0]["amount"] == "changed"
+        assert table[-1] == ["25", "appended", "175"]
+        assert len(table) == len(SOME_DATA_ROWS)
+
+    def test_force_header(self, tmp_path):
+        path = str(tmp_path / "data.csv")
+        with open(path, "w", newline="") as f:
+            f.write(make_csv(SOME_DATA_ROWS, header=None))
+        table = comma.load(
+            path, index=True, force_header=True,
+            dialect="excel", has_header=False)
+        assert table.header == SOME_DATA_ROWS[0]
+        assert table == SOME_DATA_ROWS[1:]
+
+    def test_requires_local_file(self):
+        with pytest.raises(ValueError):
+            comma.load(make_csv(SOME_DATA_ROWS), index=True)
+
+    def test_requires_lazy_storage(self, csv_path):
+        with pytest.raises(ValueError):
+            comma.load(csv_path, index=True, storage="rows")
+
+
+class TestScanRecords:
+
+    SOME_TRICKY_ROWS = [
+        ["1", "a\nquoted field\nover lines", "x"],
+        ["2", "with \"\"quotes\"\"\n", "y"],
+        ["3", "plain", "z"],
+        ["4", "\n\n\n", "w"],
+        ["5", "ends with quote\"", "v"],
+    ] * 5
+
+    @pytest.fixture()
+    def tricky_path(self, tmp_path):
+        path = str(tmp_path / "tricky.csv")
+        with open(path, "w", newline="") as f:
+            f.write(make_csv(self.SOME_TRICKY_ROWS))
+        return path
+
+    def test_count_records(self, tricky_path):
+        assert comma.index.count_records(
+            tricky_path, dialect="excel", has_header=True
+        ) == len(self.SOME_TRICKY_ROWS)
+
+    @pytest.mark.parametrize("chunksize", [1, 8, 64, 1 << 16])
+    @pytest.mark.parametrize("count", [0, 1, 3, 7, 25, 40])
+    def test_last_records_start(self, tricky_path, chunksize, count):
+        with open(tricky_path, "rb") as f:
+            data = f.read()
+
+        dialect = comma.helpers.DefaultDialect.override(escapechar=None)
+        pattern = comma.helpers.record_pattern(dialect, encoding="utf-8")
+        header_end = data.index(b"\n") + 1
+
+        start = comma.index._last_records_start(
+            data=data,
+            pattern=pattern,
+            dialect=dialect,
+            encoding="utf-8",
+            count=count,
+            position=header_end,
+            chunksize=chunksize)
+
+        rows = comma.parallel.parse_chunk(
+            tricky_path, start, len(data), "utf-8",
+            comma.parallel.dialect_to_dict(dialect))
+        expected = self.SOME_TRICKY_ROWS[max(0, 25 - count):] if count else []
+        assert [row[0] for row in rows] == [row[0] for row in expected]
+
+    def test_read_tail(self, tricky_path):
+        info = comma.index.read_tail(
+            tricky_path, 3, dialect="excel", has_header=True)
+        assert info["header"] == SOME_HEADER
+        assert info["rows"] == self.SOME_TRICKY_ROWS[-3:]
+
+    def test_read_tail_escapechar(self, tmp_path):
+        path = str(tmp_path / "escaped.csv")
+        with open(path, "w", newline="") as f:
+            f.write('id,comment\n1,a\\\nb\n2,c\n')
+        dialect = comma.helpers.DefaultDialect.override(
+            doublequote=False, quoting=csv.QUOTE_NONE)
+        info = comma.index.read_tail(path, 2, dialect=dialect, has_header=True)
+        assert info["rows"] == [["1", "a\nb"], ["2", "c"]]
+
+    def test_read_head(self, tricky_path):
+        info = comma.index.read_head(
+            tricky_path, 4, dialect="excel", has_header=True)
+        assert info["header"] == SOME_HEADER
+        assert info["rows"] == self.SOME_TRICKY_ROWS[:4]
+        assert info["column_count"] == len(SOME_HEADER)
@@ -0,0 +1,187 @@
+import array
+import datetime
+
+import pytest
+
+import comma
+import comma.classes.columns
+import comma.inference
+
+
+class TestInferType:
+
+    @pytest.mark.parametrize("values, expected_type", [
+        (["1", "22", "-333"], int),
+        (["1.5", "2.0", "-0.25"], float),
+        (["1", "2.50", "1e5"], float),
+        (["2.5", "007"], str),      # leading zeroes would be lost
+        (["2.5", str(2 ** 53 + 1)], str),   # not exactly a float
+        (["True", "False"], bool),
+        (["2020-01-31", "1999-12-01"], datetime.date),
+        (["a", "1"], str),
+        ([], str),
+    ])
+    def test_infer_type(self, values, expected_type):
+        assert comma.inference.infer_type(values) is expected_type
+
+    @pytest.mark.parametrize("values", [
+        ["007"],                # leading zeroes would be lost
+        ["1", ""],              # missing values
+        ["1.5", "nan"],         # not a finite float
+        ["1e999"],              # does not fit in a float
+        ["true", "false"],      # not the canonical representation
+        ["2020-1-31"],          # not the canonical representation
+        [str(2 ** 64)],         # does not fit in an array
+    ])
+    def test_infer_type_lossless(self, values):
+        # values are only typed if they can be serialized back identically
+        assert comma.inference.infer_type(values) is str
+
+    def test_infer_type_sample_size(self):
+        values = ["1", "2", "x"]
+        assert comma.inference.infer_type(values, sample_size=2) is int
+        assert comma.inference.infer_type(values, sample_size=3) is str
+
+    def test_parse_value(self):
+        assert comma.inference.parse_value("12", int) == 12
+        assert comma.inference.parse_value("False", bool) is False
+        assert comma.inference.parse_value(
+            "2020-01-31", datetime.date) == datetime.date(2020, 1, 31)
+        assert comma.inference.parse_value(3, float) == 3.0
+        with pytest.raises(ValueError):
+            comma.inference.parse_value("maybe", bool)
+
+    @pytest.mark.parametrize("values, expected", [
+        (["FR", "US", "FR", "FR"] * 10, True),
+        (["id{}".format(i) for i in range(40)], False),
+        ([], False),
+    ])
+    def test_is_low_cardinality(self, values, expected):
+        assert comma.inference.is_low_cardinality(values) is expected
+
+    def test_make_buffer(self):
+        buffer = comma.inference.make_buffer(["1", "2"], int)
+        assert isinstance(buffer, array.array)
+        assert list(buffer) == [1, 2]
+
+        buffer = comma.inference.make_buffer(["True", "False"], bool)
+        assert buffer == [True, False]
+
+
+class TestLoadInferTypes:
+
+    SOME_CSV_STRING = (
+        "id,price,active,day,name\n"
+        "1,2.5,True,2020-01-02,x\n"
+        "3,4.0,False,2021-12-31,y\n")
+
+    @pytest.fixture()
+    def typed_table(self):
+        return comma.load(self.SOME_CSV_STRING, infer_types=True)
+
+    def test_dtypes(self, typed_table):
+        assert typed_table.is_columnar
+        assert typed_table.dtypes == {
+            "id": int,
+            "price": float,
+            "active": bool,
+            "day": datetime.date,
+            "name": str,
+        }
+
+    def test_dtypes_untyped(self):
+        table = comma.load(self.SOME_CSV_STRING)
+        assert set(table.dtypes.values()) == {str}
+        assert list(table.dtypes) == table.header
+
+    def test_array_storage(self, typed_table):
+        assert isinstance(typed_table.data.column(0).buffer, array.array)
+        assert typed_table.data.column(0).buffer.typecode == "q"
+        assert typed_table.data.column(1).buffer.typecode == "d"
+
+    def test_values(self, typed_table):
+        assert typed_table[0]["id"] == 1
+        assert typed_table[1]["price"] == 4.0
+        assert list(typed_table["active"]) == [True, False]
+
+    def test_round_trip(self, typed_table):
+        assert typed_table.dump() == self.SOME_CSV_STRING
+
+    def test_write_parses_strings(self, typed_table):
+        typed_table[0]["id"] = "42"
+        typed_table["price"][1] = "1.25"
+        typed_table.append(["5", "6.5", "True", "2000-01-01", "z"])
+
+        assert typed_table[0]["id"] == 42
+        assert typed_table[1]["price"] == 1.25
+        assert typed_table[2]["day"] == datetime.date(2000, 1, 1)
+
+        with pytest.raises(ValueError):
+            typed_table[0]["id"] = "not a number"
+
+    def test_list_methods_keep_types(self, typed_table):
+        typed_table.sort(key=lambda row: row["price"], reverse=True)
+        assert list(typed_table["id"]) == [3, 1]
+        typed_table.reverse()
+        assert list(typed_table["price"]) == [2.5, 4.0]
+        assert typed_table.data.column(1).buffer.typecode == "d"
+        assert (typed_table + typed_table).data.dtypes == typed_table.data.dtypes
+
+    def test_append_invalid_row(self, typed_table):
+        rows = [list(row) for row in typed_table]
+
+        # the columns are left unchanged when a value cannot be stored
+        with pytest.raises(ValueError):
+            typed_table.append(["5", "abc", "True", "2022-01-01", "x"])
+        with pytest.raises(ValueError):
+            typed_table.insert(0, ["5", "abc", "True", "2022-01-01", "x"])
+        with pytest.raises(ValueError):
+            typed_table.extend([["5", "abc", "True", "2022-01-01", "x"]])
+        assert [list(row) for row in typed_table] == rows
+
+    def test_extend_invalid_rows(self, typed_table):
+        rows = [list(row) for row in typed_table]
+
+        # the first column fails partway, after storing a value
+        with pytest.raises(ValueError):
+            typed_table.extend([
+                ["5", "1.5", "True", "2022-01-01", "z"],
+                ["oops", "1.5", "True", "2022-01-01", "z"],
+            ])
+        assert [len(column) for column in typed_table.data.columns] == (
+            [len(rows)] * len(typed_table.header))
+        assert [list(row) for row in typed_table] == rows
+
+        typed_table.append(["5", "1.5", "True", "2022-01-01", "z"])
+        assert typed_table[-1]["id"] == 5
+
+    def test_append_short_row(self, typed_table):
+        typed_table.append(["5", "6.5"])
+
+        # the typed columns that miss fields are no longer typed
+        assert typed_table.dtypes["id"] is int
+        assert typed_table.dtypes["price"] is float
+        assert typed_table.dtypes["active"] is str
+        assert typed_table[2]["price"] == 6.5
+        assert typed_table[2]["day"] == ""
+
+        # the values of the columns that are no longer typed are strings
+        assert typed_table[1]["day"] == "2021-12-31"
+        assert typed_table[0]["active"] == "True"
+
+        typed_table.data.extend([["6"]])
+        assert typed_table.dtypes["id"] is int
+        assert typed_table.dtypes["price"] is str
+        assert typed_table[3]["price"] == ""
+        assert list(typed_table["price"]) == ["2.5", "4.0", "6.5", ""]
+        assert typed_table.dump().endswith("\n5,6.5,,,\n6,,,,\n")
+
+    def test_infer_types_requires_columnar(self):
+        with pytest.raises(ValueError):
+            comma.load(self.SOME_CSV_STRING, infer_types=True, storage="rows")
+
+    def test_infer_types_beyond_sample(self):
+        rows = comma.classes.columns.CommaColumnarRows.from_rows(
+            [["1", "2"], ["3", "x"]])
+        rows.infer_types(sample_size=1)
+        assert rows.dtypes == [int, str]
@@ -1,14 +1,18 @@
 
 import collections
 import copy
+import gzip
 import io
+import tracemalloc
 import typing
 
 import pytest
 
 import comma.classes
 import comma.exceptions
+import comma.extras
 import comma.helpers
+import comma.index
 import comma.methods
 import comma.typing
 
@@ -91,6 +95,230 @@ class TestLoad:
         assert obj2.has_header
 
 
+class TestLoadKnownFormat:
+
+    @pytest.mark.parametrize("storage", ["rows", "columnar"])
+    def test_no_sniffing(self, storage, mocker):
+        detect_spy = mocker.spy(comma.extras, "detect_csv_type")
+
+        obj = comma.methods.load(
+            SOME_CSV_STRING,
+            dialect="excel",
+            has_header=True,
+            storage=storage)
+
+        detect_spy.assert_not_called()
+        assert obj.header == SOME_HEADER.split(",")
+        assert len(obj) == SOME_CSV_STRING_ROW_COUNT
+        assert comma.methods.dumps(obj) == SOME_CSV_STRING.replace("\n", "\r\n")
+
+    def test_header_without_header_row(self, mocker):
+        detect_spy = mocker.spy(comma.extras, "detect_csv_type")
+
+        obj = comma.methods.load(
+            SOME_CSV_STRING_NO_HEADER,
+            dialect=comma.helpers.DefaultDialect(),
+            header=SOME_HEADER.split(","))
+
+        detect_spy.assert_not_called()
+        assert obj.header == SOME_HEADER.split(",")
+        assert len(obj) == SOME_CSV_STRING_ROW_COUNT
+        assert comma.methods.dumps(obj) == SOME_CSV_STRING
+
+    def test_header_replaces_header_row(self):
+        obj = comma.methods.load(
+            SOME_CSV_STRING,
+            dialect="excel",
+            has_header=True,
+            header=SOME_OTHER_HEADER.split(","))
+
+        assert obj.header == SOME_OTHER_HEADER.split(",")
+        assert len(obj) == SOME_CSV_STRING_ROW_COUNT
+
+    def test_partial_settings_are_detected(self, mocker):
+        detect_spy = mocker.spy(comma.extras, "detect_csv_type")
+
+        # the header is still detected
+        obj = comma.methods.load(SOME_CSV_STRING, dialect="excel")
+
+        detect_spy.assert_called_once()
+        assert obj.header == SOME_HEADER.split(",")
+
+    def test_iterload(self, mocker):
+        detect_spy = mocker.spy(comma.extras, "detect_csv_type")
+
+        rows = list(comma.methods.iterload(
+            SOME_CSV_STRING_NO_HEADER,
+            dialect="excel",
+            header=SOME_HEADER.split(",")))
+
+        detect_spy.assert_not_called()
+        assert len(rows) == SOME_CSV_STRING_ROW_COUNT
+        assert rows[0]["name"] == "Person1"
+
+
+class TestIterload:
+
+    LARGE_CSV_ROW_COUNT = 200000
+    LARGE_CSV_STRING = "id,name,comment\n" + "".join(
+        "{},Person{},some comment\n".format(i, i)
+        for i in range(LARGE_CSV_ROW_COUNT))
+
+    def test_none_source(self):
+        casted_none = typing.cast(
+            comma.typing.SourceType, None)  # (purposefully) invalid cast
+        assert list(comma.methods.iterload(source=casted_none)) == []
+
+    @pytest.mark.parametrize("source", [SOME_CSV_STRING,
+                                        io.StringIO(SOME_CSV_STRING)])
+    def test_iterload_matches_load(self, source):
+
+        gen = comma.methods.iterload(source)
+
+        # rows are produced lazily
+        assert isinstance(gen, typing.Iterator)
+
+        rows = list(gen)
+        assert rows == SOME_CSV_DATA[1:]
+        assert len(rows) == SOME_CSV_STRING_ROW_COUNT
+
+    def test_iterload_shared_parent(self):
+
+        rows = list(comma.methods.iterload(SOME_CSV_STRING))
+
+        # all rows share the same parent, which has the header
+        assert all(isinstance(row, comma.classes.CommaRow) for row in rows)
+        assert all(row._parent is rows[0]._parent for row in rows)
+        assert rows[0]._parent.header == SOME_CSV_DATA[0]
+        assert rows[1]["name"] == "Person2"
+
+    @staticmethod
+    def iterload_peak_memory(source) -> int:
+        """
+        Returns the peak memory allocated while iterating over the rows
+        of `source` (and checks all the rows are read).
+        """
+        tracemalloc.start()
+        try:
+            row_count = sum(1 for _ in comma.methods.iterload(source))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert row_count == TestIterload.LARGE_CSV_ROW_COUNT
+        return peak
+
+    def test_iterload_bounded_memory(self):
+        source = io.BytesIO(self.LARGE_CSV_STRING.encode("utf-8"))
+
+        # the decoded text is never stored all at once
+        peak = self.iterload_peak_memory(source)
+        assert peak < len(self.LARGE_CSV_STRING) / 2
+
+    def test_iterload_bounded_memory_local_file(self, tmp_path, mocker):
+        path = tmp_path / "large.csv"
+        path.write_text(self.LARGE_CSV_STRING)
+        map_file_spy = mocker.spy(comma.helpers, "map_file")
+
+        # the file is read through a memory map, one chunk at a time
+        peak = self.iterload_peak_memory(str(path))
+        assert peak < len(self.LARGE_CSV_STRING) / 2
+        assert isinstance(map_file_spy.spy_return, comma.helpers.MappedFile)
+
+    def test_iterload_with_force_header(self):
+        s = SOME_CSV_STRING_NO_HEADER_AUTODETECT
+
+        rows1 = list(comma.methods.iterload(s))
+        rows2 = list(comma.methods.iterload(s, force_header=True))
+
+        assert (len(rows1) - 1) == len(rows2)
+        assert rows1[0]._parent.header is None
+        assert rows2[0]._parent.header is not None
+
+
+class TestCountHeadTail:
+
+    SOME_ROWS = [
+        [str(i), "two\nlines" if i % 4 == 0 else "one line", str(i * 3)]
+        for i in range(30)
+    ]
+    SOME_CSV_STRING = "id,comment,value\n" + "".join(
+        '{},"{}",{}\n'.format(*row) for row in SOME_ROWS)
+
+    @pytest.fixture(params=["plain", "gzip"])
+    def source(self, request, tmp_path):
+        if request.param == "plain":
+            path = str(tmp_path / "data.csv")
+            with open(path, "w", newline="") as f:
+                f.write(self.SOME_CSV_STRING)
+        else:
+            path = str(tmp_path / "data.csv.gz")
+            with gzip.open(path, "wt", newline="") as f:
+                f.write(self.SOME_CSV_STRING)
+        return path
+
+    @pytest.mark.parametrize("kwargs", [
+        dict(),
+        dict(dialect="excel", has_header=True),
+    ])
+    def test_count_rows(self, source, kwargs):
+        assert comma.methods.count_rows(source, **kwargs) == len(
+            comma.methods.load(source, **kwargs))
+
+    def test_count_rows_string(self):
+        assert comma.methods.count_rows(SOME_CSV_STRING) == \
+            SOME_CSV_STRING_ROW_COUNT
+
+    def test_count_rows_uses_index(self, tmp_path, mocker):
+        path = str(tmp_path / "data.csv")
+        with open(path, "w", newline="") as f:
+            f.write(self.SOME_CSV_STRING)
+        comma.index.open_index(path, dialect="excel", has_header=True)
+
+        spy = mocker.spy(comma.index, "_count_records")
+        assert comma.methods.count_rows(
+            path, dialect="excel", has_header=True) == len(self.SOME_ROWS)
+        spy.assert_not_called()
+
+    @pytest.mark.parametrize("n", [0, 1, 5, 30, 100])
+    def test_head(self, source, n):
+        table = comma.methods.head(source, n)
+        assert table.header == ["id", "comment", "value"]
+        assert table == self.SOME_ROWS[:n]
+        assert table[0:1] == comma.methods.load(source)[0:min(n, 1)]
+
+    @pytest.mark.parametrize("n", [0, 1, 5, 30, 100])
+    def test_tail(self, source, n):
+        table = comma.methods.tail(source, n)
+        assert table.header == ["id", "comment", "value"]
+        assert table == self.SOME_ROWS[len(self.SOME_ROWS) - n:][:n]
+
+    @pytest.mark.parametrize("function", [comma.methods.head,
+                                          comma.methods.tail])
+    def test_string_source(self, function):
+        table = function(SOME_CSV_STRING, 1)
+        assert table.header == SOME_CSV_DATA[0]
+        assert len(table) == 1
+        assert table[0]["name"] in ["Person1", "Person2"]
+
+    def test_head_and_tail_with_force_header(self, source):
+        kwargs = dict(force_header=True, dialect="excel", has_header=False)
+
+        head = comma.methods.head(source, 2, **kwargs)
+        assert head.header == ["id", "comment", "value"]
+        assert head == self.SOME_ROWS[:2]
+
+        tail = comma.methods.tail(source, 2, **kwargs)
+        assert tail.header == ["id", "comment", "value"]
+        assert tail == self.SOME_ROWS[-2:]
+
+    @pytest.mark.parametrize("function", [comma.methods.head,
+                                          comma.methods.tail])
+    def test_negative_count(self, function):
+        with pytest.raises(ValueError):
+            function(SOME_CSV_STRING, -1)
+
+
 class TestDump:
 
     def test_dump_empty(self):
@@ -169,6 +397,36 @@ class TestDump:
         assert stream.closed
         assert ret == SOME_CSV_STRING
 
+    def test_dump_to_file_with_echo(self, mocker, tmp_path):
+        obj = comma.methods.load(SOME_CSV_STRING)
+        filename = str(tmp_path / SOME_FILENAME)
+        tee_spy = mocker.spy(comma.methods, "_TeeStream")
+
+        # (by default, the file is read back rather than collected)
+        assert comma.methods.dump(obj, filename=filename) == SOME_CSV_STRING
+        tee_spy.assert_not_called()
+
+        assert comma.methods.dump(obj, filename=filename, no_echo=True) is None
+        tee_spy.assert_not_called()
+
+        ret = comma.methods.dump(obj, filename=filename, no_echo=False)
+        assert tee_spy.call_count == 1
+        assert ret == SOME_CSV_STRING
+
+        with open(filename, newline="") as stream:
+            assert stream.read() == SOME_CSV_STRING
+
+    @pytest.mark.parametrize("no_echo", [True, False])
+    def test_table_dump_to_stream(self, no_echo):
+        obj = comma.methods.load(SOME_CSV_STRING)
+
+        stream = io.StringIO()
+        ret = obj.dump(fp=stream, no_echo=no_echo)
+
+        assert stream.getvalue() == SOME_CSV_STRING
+        assert ret == (None if no_echo else SOME_CSV_STRING)
+        assert obj.dump() == SOME_CSV_STRING
+
     @pytest.mark.parametrize("no_echo", [True, False])
     def test_dump_to_steam(self, no_echo):
         obj = comma.methods.load(SOME_CSV_STRING)
@@ -224,3 +482,61 @@ class TestDump:
         assert str_manual_with_headers == SOME_CSV_STRING
         assert str_manual_with_headers == str_comma
 
+
+    def test_dump_streams_without_echo(self, mocker):
+        """
+        Checks that, when `no_echo` is set, the rows are written directly to
+        the stream, without serializing the table to a string first.
+        """
+        obj = comma.methods.load(SOME_CSV_STRING)
+        dumps_spy = mocker.spy(comma.methods, "dumps")
+
+        stream = mocker.Mock(wraps=io.StringIO())
+        ret = comma.methods.dump(obj, fp=stream, no_echo=True)
+
+        assert ret is None
+        dumps_spy.assert_not_called()
+
+        # one write per line (header and rows)
+        assert stream.write.call_count == SOME_CSV_STRING_ROW_COUNT + 1
+        assert stream.getvalue() == SOME_CSV_STRING
+
+    def test_dump_from_iterload(self):
+        """
+        Checks that the rows produced lazily by `iterload()` can be dumped
+        with their header.
+        """
+        stream = io.StringIO()
+        comma.methods.dump(
+            comma.methods.iterload(SOME_CSV_STRING),
+            fp=stream,
+            no_echo=True)
+
+        assert stream.getvalue() == SOME_CSV_STRING
+
+    def test_dump_renamed_header_with_sliced_rows(self):
+        """
+        Checks that renaming the header is also applied to rows that are
+        slices (which are serialized by field name rather than by position).
+        """
+        obj = comma.methods.load(SOME_CSV_STRING)
+        records = [obj[0], obj[1][:]]
+
+        assert (comma.methods.dump(records, header=SOME_OTHER_HEADER.split(",")) ==
+                SOME_CSV_STRING.replace(SOME_HEADER, SOME_OTHER_HEADER))
+
+    def test_dump_user_header_pads_rows(self):
+        """
+        Checks that, with a user-specified header, rows that are shorter than
+        the header are padded with empty fields.
+        """
+        records = [["a", "b", "c"], ["d"]]
+        assert (comma.methods.dump(records, header=["x", "y", "z"]) ==
+                "x,y,z\na,b,c\nd,,\n")
+
+    def test_dump_dict_records(self):
+        """
+        Checks that records that are dictionaries are serialized by field name.
+        """
+        records = [{"a": "1", "b": "2"}, {"b": "4", "a": "3"}]
+        assert comma.methods.dump(records) == "a,b\n1,2\n3,4\n"
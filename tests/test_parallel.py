@@ -0,0 +1,137 @@
+import io
+
+import pytest
+
+import comma
+import comma.helpers
+import comma.parallel
+
+
+SOME_CSV_STRING = (
+    "name,comment,age\n"
+    "Person1,\"a comment\nover two lines\",33\n"
+    "Person2,\"a \"\"quoted\"\" comment\",25\n"
+    "Person3,plain,41\n"
+) * 50
+
+
+class TestFindRecordBoundaries:
+
+    def test_boundaries_are_record_boundaries(self):
+        data = SOME_CSV_STRING.encode("utf-8")
+
+        boundaries = comma.parallel.find_record_boundaries(
+            source=io.BytesIO(data),
+            size=len(data),
+            count=8,
+            chunksize=64)
+
+        assert boundaries[0] == 0
+        assert boundaries[-1] == len(data)
+        assert boundaries == sorted(set(boundaries))
+
+        # each chunk ends at the end of a line, outside of quotes
+        for boundary in boundaries[1:-1]:
+            assert data[boundary - 1:boundary] == b"\n"
+            assert data[:boundary].count(b'"') % 2 == 0
+
+    def test_no_newline_outside_quotes(self):
+        data = b'"a\nb\nc\nd"'
+        assert comma.parallel.find_record_boundaries(
+            source=io.BytesIO(data),
+            size=len(data),
+            count=4) == [0, len(data)]
+
+    def test_no_quotechar(self):
+        data = b'"a\nb\ncd\n'
+
+        # the first newline after the middle is within (unbalanced) quotes
+        assert comma.parallel.find_record_boundaries(
+            source=io.BytesIO(data),
+            size=len(data),
+            count=2) == [0, len(data)]
+
+        # unless quotes are ignored
+        assert comma.parallel.find_record_boundaries(
+            source=io.BytesIO(data),
+            size=len(data),
+            count=2,
+            quotechar=None) == [0, 5, len(data)]
+
+
+class TestIsSplittableEncoding:
+
+    @pytest.mark.parametrize("encoding, expected", [
+        ("utf-8", True),
+        ("UTF-8-SIG", True),
+        ("ascii", True),
+        ("latin-1", True),
+        ("windows-1252", True),
+        ("utf-16", False),
+        ("iso-2022-jp", False),
+        ("shift_jis", False),
+        ("not-an-encoding", False),
+    ])
+    def test_is_splittable_encoding(self, encoding, expected):
+        assert comma.parallel.is_splittable_encoding(encoding) is expected
+
+
+class TestOpenCsvParallel:
+
+    @pytest.mark.parametrize("workers", [2, 3])
+    def test_same_as_serial(self, tmp_path, workers):
+        path = tmp_path / "data.csv"
+        path.write_bytes(SOME_CSV_STRING.encode("utf-8"))
+
+        parallel_info = comma.parallel.open_csv_parallel(
+            source=str(path),
+            workers=workers,
+            min_chunksize=256)
+        serial_info = comma.helpers.open_csv(source=str(path))
+
+        assert parallel_info["header"] == serial_info["header"]
+        assert parallel_info["rows"] == serial_info["rows"]
+        assert parallel_info["column_count"] == serial_info["column_count"]
+
+    def test_fallback_for_string_data(self, mocker):
+        open_csv_spy = mocker.spy(comma.helpers, "open_csv")
+
+        info = comma.parallel.open_csv_parallel(
+            source=SOME_CSV_STRING,
+            workers=2)
+
+        open_csv_spy.assert_called_once()
+        assert info["rows"] == comma.helpers.open_csv(SOME_CSV_STRING)["rows"]
+
+
+class TestLoadWorkers:
+
+    def test_load_workers(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_bytes(SOME_CSV_STRING.encode("utf-8"))
+
+        table = comma.load(str(path), workers=4)
+
+        table_serial = comma.load(str(path))
+
+        assert table == table_serial
+        assert table.header == table_serial.header
+        assert table[1][1] == "a comment\nover two lines"
+
+    def test_load_invalid_workers(self):
+        with pytest.raises(ValueError):
+            comma.load(SOME_CSV_STRING, workers=0)
+
+    @pytest.mark.parametrize("options", [
+        {"storage": "lazy"},
+        {"index": True},
+    ])
+    def test_load_workers_lazy(self, tmp_path, options):
+        path = tmp_path / "data.csv"
+        path.write_bytes(SOME_CSV_STRING.encode("utf-8"))
+
+        with pytest.raises(ValueError):
+            comma.load(str(path), workers=2, **options)
+
+        assert comma.load(str(path), workers=1, **options) == (
+            comma.load(str(path)))